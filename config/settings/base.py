@@ -77,6 +77,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "src.core.middleware.IdentityMapMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -100,6 +101,9 @@ TEMPLATES = [
 WSGI_APPLICATION = "config.wsgi.application"
 
 AUTH_USER_MODEL = "user.User"
+# Loads a user's cached permissions before the checks of a request
+# (src.core.mixins.PermissionPolicyMixin)
+PERMISSION_SNAPSHOT_LOADER = "src.user.services.permission_service.get_snapshot"
 
 
 # Database
@@ -113,6 +117,60 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# Lifetime (seconds) of the cached API responses (src.core.mixins.CachedResponseMixin)
+API_CACHE_TIMEOUT = env.int("API_CACHE_TIMEOUT", default=300)
+# Most items a bulk request or a list create may carry (src.core.mixins)
+API_BULK_MAX_SIZE = env.int("API_BULK_MAX_SIZE", default=100)
+
+
+# Email
+# Requests only queue emails (src.core.models.OutboundEmail); the
+# `drain_outbox` command delivers them.
+
+EMAIL_BACKEND = env.str(
+    "EMAIL_BACKEND", default="django.core.mail.backends.console.EmailBackend"
+)
+EMAIL_HOST = env.str("EMAIL_HOST", default="localhost")
+EMAIL_PORT = env.int("EMAIL_PORT", default=25)
+EMAIL_HOST_USER = env.str("EMAIL_HOST_USER", default="")
+EMAIL_HOST_PASSWORD = env.str("EMAIL_HOST_PASSWORD", default="")
+EMAIL_USE_TLS = env.bool("EMAIL_USE_TLS", default=False)
+# Implicit TLS (usually port 465); mutually exclusive with EMAIL_USE_TLS
+EMAIL_USE_SSL = env.bool("EMAIL_USE_SSL", default=False)
+EMAIL_TIMEOUT = env.int("EMAIL_TIMEOUT", default=30)
+DEFAULT_FROM_EMAIL = env.str("DEFAULT_FROM_EMAIL", default="webmaster@localhost")
+
+OUTBOX_MAX_ATTEMPTS = env.int("OUTBOX_MAX_ATTEMPTS", default=5)
+# Seconds before the first retry, doubled on every further failure
+OUTBOX_RETRY_DELAY = env.int("OUTBOX_RETRY_DELAY", default=60)
+OUTBOX_MAX_RETRY_DELAY = env.int("OUTBOX_MAX_RETRY_DELAY", default=3600)
+
+
+# Image renditions
+# Saving a new package image, cover image or avatar queues a job
+# (src.core.models.ImageRendition); the `render_images` command stores the
+# renditions next to the original and the API serves their urls.
+
+# Name: box size (pixels), cropped to fill it with "crop", fitted within otherwise
+IMAGE_RENDITIONS = {
+    "thumbnail": {"size": (160, 160), "crop": True},
+    "small": {"size": (480, 480)},
+    "large": {"size": (1280, 1280)},
+}
+IMAGE_RENDITION_FORMATS = ("webp", "jpeg")
+IMAGE_RENDITION_QUALITY = env.int("IMAGE_RENDITION_QUALITY", default=80)
+IMAGE_RENDITION_MAX_ATTEMPTS = env.int("IMAGE_RENDITION_MAX_ATTEMPTS", default=5)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -135,7 +193,7 @@ AUTH_PASSWORD_VALIDATORS = [
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "src.user.authentication.RevocableJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_PAGINATION_CLASS": "src.core.utils.pagination.CustomPagination",
@@ -176,8 +234,13 @@ SIMPLE_JWT = {
     # "SLIDING_TOKEN_LIFETIME": timedelta(minutes=120),
     # "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
     "USER_AUTHENTICATION_RULE": "src.user.rules.user_authentication_rule",
+    "TOKEN_OBTAIN_SERIALIZER": "src.user.serializers.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "src.user.serializers.RevocableTokenRefreshSerializer",
 }
 
+# Full-text search backend of the forum app (src.forum.search)
+FORUM_SEARCH_BACKEND = "src.forum.search.SQLiteSearchBackend"
+
 DEFAULT_FILTERS = (
     "icontains",
     "iexact",
@@ -212,6 +275,15 @@ USE_TZ = True
 
 MEDIA_ROOT = os.path.join(Path(__file__).resolve().parent.parent.parent, "media")
 MEDIA_URL = "/media/"
+# Uploads are stored once per content, under their SHA-256 digest
+STORAGES = {
+    "default": {
+        "BACKEND": "src.core.storage.ContentAddressedStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
 STATIC_URL = "static/"
 STATIC_ROOT = os.path.join(Path(__file__).resolve().parent.parent.parent, "static/")
 STATICFILES_DIRS = [
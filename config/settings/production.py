@@ -17,3 +17,20 @@ DATABASES = {
         "PORT": env.str("POSTGRES_PORT"),
     }
 }
+
+# Cache
+# Shared by every process through Redis; without REDIS_URL each process keeps
+# its own local memory cache (base settings).
+REDIS_URL = env.str("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+
+# Email
+EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+
+FORUM_SEARCH_BACKEND = "src.forum.search.PostgresSearchBackend"
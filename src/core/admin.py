@@ -1,7 +1,9 @@
 from django.contrib import admin
 from django.contrib.auth.models import Permission
 
-from src.core.models import AccessSupport
+from src.core.models import AccessSupport, ImageRendition, StoredFile
 
 admin.site.register(Permission)
 admin.site.register(AccessSupport)
+admin.site.register(ImageRendition)
+admin.site.register(StoredFile)
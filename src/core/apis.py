@@ -1,6 +1,7 @@
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import generics, status, viewsets
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
@@ -12,6 +13,7 @@ from src.core.serializers import (
 )
 from src.core.viewsets import ZenModelViewSet
 from src.user.models import User
+from src.user.services import permission_service
 from src.user.serializers import PermissionListSerializer
 
 
@@ -51,7 +53,12 @@ class ContentTypeListApi(generics.ListAPIView):
 
     permission_classes = [IsAuthenticated, IsAdminUser]
     serializer_class = ContentTypeSerializer
-    queryset = ContentType.objects.all()
+    queryset = ContentType.objects.prefetch_related(
+        Prefetch(
+            "permission_set",
+            queryset=Permission.objects.only("id", "codename", "content_type_id"),
+        )
+    )
     pagination_class = None
 
 
@@ -92,19 +99,11 @@ class UserPermissionApi(generics.GenericAPIView):
         """
         Get Permissions Names
         """
-        if request.user.groups.exists():
-            serializer = PermissionSerializer(
-                request.user.groups.first().permissions,
-                fields=("id", "codename"),
-                many=True,
-            )
-        else:
-            group = Group.objects.create(name=request.user)
-            request.user.groups.add(group)
-            serializer = PermissionSerializer(
-                group.permissions, fields=("id", "codename"), many=True
-            )
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        snapshot = permission_service.get_snapshot(request.user)
+        return Response(
+            [{"id": pk, "codename": codename} for pk, codename in snapshot.entries],
+            status=status.HTTP_200_OK,
+        )
 
 
 class AssignPermissionsToUserAPi(generics.GenericAPIView):
@@ -0,0 +1,284 @@
+from collections import defaultdict
+from functools import partial
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F
+from rest_framework import fields, relations, serializers
+from rest_framework.settings import api_settings
+
+# ``to_representation`` of these fields returns database values unchanged.
+IDENTITY_REPRESENTATIONS = {
+    fields.CharField.to_representation,
+    fields.IntegerField.to_representation,
+    fields.BooleanField.to_representation,
+    fields.ChoiceField.to_representation,
+    fields.ReadOnlyField.to_representation,
+    relations.PrimaryKeyRelatedField.to_representation,
+}
+PARENT_KEY = "_compiled_parent"
+
+
+def get_related(data, many, value):
+    """
+    Nested representation of the related row(s) of ``value``
+    """
+    if many:
+        return data.get(value, [])
+    return data.get(value)
+
+
+class NotCompilable(Exception):
+    """
+    The serializer has a field the compiled read path can't produce
+    """
+
+
+class CompiledSerializer:
+    """
+    Read path of a model serializer over ``values()`` rows
+
+    The serializer's fields are inspected once: the columns they read, and a
+    converter per field — none for values the database already returns in
+    their final form (ids, strings, numbers, booleans), the field's own
+    ``to_representation`` otherwise, a storage url for files. Nested
+    serializers on foreign keys and many relations are compiled too: flat
+    ones on foreign keys are read through a join in the same query, the
+    others filled with one query per relation for a whole list of rows.
+
+    ``compile`` returns ``None`` for serializers with fields it can't
+    produce (method fields, dotted sources, properties, ...), which then keep
+    using the regular serializer.
+    """
+
+    def __init__(self, serializer, model=None):
+        self.model = model or serializer.Meta.model
+        self.pk_name = self.model._meta.pk.attname
+        self.context = serializer.context
+        self.values = []
+        self.fields = []  # (name, key, converter)
+        self.relations = {}  # name: (model field, compiled serializer, many)
+        self.joins = set()  # names of the relations read through a join
+        for name, field in serializer.fields.items():
+            if not field.write_only:
+                self.add_field(name, field)
+        if self.pk_name not in self.values:
+            self.values.append(self.pk_name)
+
+    @classmethod
+    def compile(cls, serializer):
+        """
+        Compiled read path of ``serializer``, ``None`` when it has none
+        """
+        try:
+            return cls(serializer)
+        except NotCompilable:
+            return None
+
+    def get_model_field(self, source):
+        """
+        Model field read by a serializer field
+        """
+        if source == "*" or "." in source:
+            raise NotCompilable(source)
+        try:
+            return self.model._meta.get_field(source)
+        except FieldDoesNotExist as exc:
+            raise NotCompilable(source) from exc
+
+    def add_field(self, name, field):
+        """
+        Plan how to produce the value of one serializer field
+        """
+        model_field = self.get_model_field(field.source)
+
+        if isinstance(field, serializers.ListSerializer):
+            if not isinstance(field.child, serializers.ModelSerializer):
+                raise NotCompilable(name)
+            self.add_relation(name, model_field, field.child, many=True)
+        elif isinstance(field, serializers.ModelSerializer):
+            self.add_relation(name, model_field, field, many=False)
+        elif hasattr(field, "prefetch_values") and getattr(field, "serializer", None):
+            # ``ZenModelSerializeIntegerField``: nested data without context
+            kwargs = {}
+            if getattr(field, "fields", None):
+                kwargs["fields"] = field.fields
+            if getattr(field, "exclude_fields", None):
+                kwargs["exclude_fields"] = field.exclude_fields
+            self.add_relation(name, model_field, field.serializer(**kwargs), many=False)
+        elif not model_field.concrete or model_field.many_to_many:
+            raise NotCompilable(name)
+        elif hasattr(field, "prefetch_values") or (
+            type(field).to_representation in IDENTITY_REPRESENTATIONS
+        ):
+            # Primary keys of foreign keys and plain values
+            self.add_column(name, model_field.name, None)
+        elif isinstance(field, fields.DateTimeField):
+            self.add_column(name, model_field.name, self.get_datetime_converter(field))
+        elif isinstance(field, fields.FileField):
+            converter = self.get_file_converter(field, model_field)
+            self.add_column(name, model_field.name, converter)
+        elif model_field.is_relation:
+            raise NotCompilable(name)
+        else:
+            self.add_column(name, model_field.name, field.to_representation)
+
+    def add_column(self, name, key, converter):
+        """
+        Output ``key`` of a row, through ``converter`` when given
+        """
+        if key not in self.values:
+            self.values.append(key)
+        self.fields.append((name, key, converter))
+
+    def add_relation(self, name, model_field, serializer, many):
+        """
+        Output a nested serializer over a relation
+        """
+        if many:
+            if not (model_field.many_to_many or model_field.one_to_many):
+                raise NotCompilable(name)
+        elif not model_field.concrete or not model_field.is_relation:
+            raise NotCompilable(name)
+        compiled = CompiledSerializer(serializer, model_field.related_model)
+
+        if many:
+            key = self.pk_name
+        else:
+            key = model_field.name
+            if compiled.relations:
+                columns = [key]
+            else:
+                columns = [f"{key}__{column}" for column in compiled.values]
+                self.joins.add(name)
+            for column in columns:
+                if column not in self.values:
+                    self.values.append(column)
+        self.relations[name] = (model_field, compiled, many)
+        self.fields.append((name, key, None))
+
+    def get_datetime_converter(self, field):
+        """
+        ``DateTimeField.to_representation`` with the timezone resolved once
+        """
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        if output_format is None or output_format.lower() != fields.ISO_8601:
+            return field.to_representation
+        field_timezone = getattr(field, "timezone", None) or field.default_timezone()
+        if field_timezone is None:
+            return field.to_representation
+
+        def to_iso(value):
+            if value.tzinfo is None:
+                return field.to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            if value.endswith("+00:00"):
+                value = value[:-6] + "Z"
+            return value
+
+        return to_iso
+
+    def get_file_converter(self, field, model_field):
+        """
+        Url of a stored file name, as ``FileField.to_representation`` gives it
+        """
+        storage = model_field.storage
+        if not getattr(field, "use_url", True):
+            return lambda name: name or None
+        request = self.context.get("request")
+
+        def to_url(name):
+            if not name:
+                return None
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+
+        return to_url
+
+    def get_queryset(self, queryset, extra=()):
+        """
+        ``queryset`` returning the rows this serializer reads, with ``extra``
+        fields and annotations (search ranks, ...) for ordering and pagination
+        """
+        names = dict.fromkeys([*self.values, *extra, *queryset.query.annotations])
+        return queryset.prefetch_related(None).values(*names)
+
+    def get_joined_data(self, rows, model_field, compiled):
+        """
+        Representations of a relation read through a join, keyed by the
+        related primary key (set on ``rows`` as the linking value)
+        """
+        key = model_field.name
+        prefix = f"{key}__"
+        related_rows = {}
+        for row in rows:
+            pk = row[key] = row[prefix + compiled.pk_name]
+            if pk is not None and pk not in related_rows:
+                related_rows[pk] = {
+                    column: row[prefix + column] for column in compiled.values
+                }
+        return dict(zip(related_rows, compiled.represent(related_rows.values())))
+
+    def get_related_data(self, rows, model_field, compiled, many):
+        """
+        Representations of a relation for ``rows``, keyed by the row value
+        linking to them
+        """
+        if many:
+            ids = {row[self.pk_name] for row in rows}
+            if model_field.many_to_many and model_field.concrete:
+                link = model_field.related_query_name()
+            else:
+                link = model_field.field.name
+            related_rows = list(
+                compiled.model._default_manager.filter(**{f"{link}__in": ids})
+                .order_by(compiled.pk_name)
+                .values(*compiled.values, **{PARENT_KEY: F(link)})
+            )
+            data = defaultdict(list)
+            for row, item in zip(related_rows, compiled.represent(related_rows)):
+                data[row[PARENT_KEY]].append(item)
+            return data
+
+        key = model_field.name
+        ids = {row[key] for row in rows if row[key] is not None}
+        if not ids:
+            return {}
+        related_rows = list(
+            compiled.model._default_manager.filter(pk__in=ids)
+            .order_by()
+            .values(*compiled.values)
+        )
+        return {
+            row[compiled.pk_name]: item
+            for row, item in zip(related_rows, compiled.represent(related_rows))
+        }
+
+    def represent(self, rows):
+        """
+        Representations of ``values()`` rows
+        """
+        rows = list(rows)
+        related = {
+            name: (
+                self.get_joined_data(rows, model_field, compiled)
+                if name in self.joins
+                else self.get_related_data(rows, model_field, compiled, many)
+            )
+            for name, (model_field, compiled, many) in self.relations.items()
+        }
+        plan = []
+        for name, key, converter in self.fields:
+            if name in related:
+                converter = partial(get_related, related[name], self.relations[name][2])
+            plan.append((name, key, converter))
+
+        results = []
+        for row in rows:
+            item = {}
+            for name, key, converter in plan:
+                value = row[key]
+                if converter is not None and value is not None:
+                    value = converter(value)
+                item[name] = value
+            results.append(item)
+        return results
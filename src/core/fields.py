@@ -1,32 +1,111 @@
 from django.db.models import Model
 from django.utils.translation import gettext_lazy as _
-from rest_framework.fields import CharField, IntegerField
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import CharField, Field, IntegerField
 
+from .identity_map import IdentityMap, get_identity_map
 from .serializers import DynamicFieldsModelSerializer
 
 
-class ModelIdField(IntegerField):
+class BatchResolveFieldMixin:
+    """
+    Resolves written keys to model objects through the request's identity map
+    (see ``IdentityMapMiddleware``).
+
+    ``ZenListSerializer`` calls ``prefetch_values`` with the keys of every item
+    before validation, so a whole list is resolved with one ``IN`` query.
+    """
+
+    case_insensitive = False
+
+    def get_identity_map(self):
+        """
+        Active identity map, or a throwaway one outside of a scope
+        """
+        return get_identity_map() or IdentityMap()
+
+    def prefetch_values(self, values):
+        """
+        Load every valid key of ``values`` into the identity map
+        """
+        identity_map = get_identity_map()
+        if identity_map is None:
+            return
+        keys = []
+        for value in values:
+            try:
+                keys.append(super().to_internal_value(value))
+            except ValidationError:
+                continue
+        identity_map.load(self.model, keys, self.filter_by, None, self.case_insensitive)
+
+    def resolve(self, value):
+        """
+        Model object for ``value`` or ``None``
+        """
+        try:
+            return self.get_identity_map().get(
+                self.model, value, self.filter_by, None, self.case_insensitive
+            )
+        except ValueError:
+            return None
+
+
+class RenditionsField(Field):
+    """
+    Read only urls of the renditions of an image field, by size and format
+
+    Reads a renditions column (``<image_field>_renditions``) filled by the
+    ``render_images`` worker: empty until the image is rendered.
+    """
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        files = (value or {}).get("files") or {}
+        if not files:
+            return {}
+        storage = self.parent.Meta.model._meta.get_field(self.image_field).storage
+        request = self.context.get("request")
+        urls = {}
+        for spec, names in files.items():
+            urls[spec] = {}
+            for image_format, name in names.items():
+                url = storage.url(name)
+                urls[spec][image_format] = (
+                    request.build_absolute_uri(url) if request is not None else url
+                )
+        return urls
+
+
+class ModelIdField(BatchResolveFieldMixin, IntegerField):
     """
     Serializer Field for Model id field
     """
 
+    filter_by = "pk"
+
     def __init__(self, model_field: Model, **kwargs):
-        self.model_field = model_field
+        self.model_field = self.model = model_field
         kwargs["error_messages"] = {
             "model_invalid": _(f"Can't find {model_field.__name__} of given id.")
         }
         super().__init__(**kwargs)
 
     def to_internal_value(self, data):
-        if not self.model_field.objects.filter(id=data).exists():
+        data = super().to_internal_value(data)
+        if self.resolve(data) is None:
             self.fail("model_invalid")
-        return super().to_internal_value(data)
+        return data
 
     def to_representation(self, value):
-        return self.model_field.objects.filter(id=int(value)).first()
+        return self.resolve(int(value))
 
 
-class ZenModelSerializeIntegerField(IntegerField):
+class ZenModelSerializeIntegerField(BatchResolveFieldMixin, IntegerField):
     """
     Zen[Model+Serializer]IntegerField
 
@@ -57,25 +136,24 @@ class ZenModelSerializeIntegerField(IntegerField):
         super().__init__(**kwargs)
 
     def to_internal_value(self, data):
-        if not self.model.objects.filter(
-            **{f"{self.filter_by}__iexact": data}
-        ).exists():
-            self.fail("model_invalid")
         data = super().to_internal_value(data)
-        return self.model.objects.filter(**{f"{self.filter_by}__iexact": data}).first()
+        instance = self.resolve(data)
+        if instance is None:
+            self.fail("model_invalid")
+        return instance
 
     def to_representation(self, value):
         if not self.serializer:
             return value.pk
         kwargs = {}
         if self.fields:
-            kwargs["fields"]: self.fields
+            kwargs["fields"] = self.fields
         if self.exclude_fields:
-            kwargs["exclude_fields"]: self.exclude_fields
+            kwargs["exclude_fields"] = self.exclude_fields
         return self.serializer(value, **kwargs).data
 
 
-class ZenModelSerializeCharField(CharField):
+class ZenModelSerializeCharField(BatchResolveFieldMixin, CharField):
     """
     Zen[Model+Serializer]IntegerField
 
@@ -84,6 +162,8 @@ class ZenModelSerializeCharField(CharField):
     Default filtered by "id", can be customized with param: filterBy
     """
 
+    case_insensitive = True
+
     def __init__(
         self,
         model: Model,
@@ -104,14 +184,17 @@ class ZenModelSerializeCharField(CharField):
         super().__init__(**kwargs)
 
     def to_internal_value(self, data):
-        if not self.model.objects.filter(
-            **{f"{self.filter_by}__icontains": data}
-        ).exists():
-            self.fail("model_invalid")
         data = super().to_internal_value(data)
-        return self.model.objects.filter(
-            **{f"{self.filter_by}__icontains": data}
-        ).first()
+        # Exact (case-insensitive) matches are batched through the identity
+        # map; only unmatched values fall back to the unindexable icontains.
+        instance = self.resolve(data) or (
+            self.model.objects.filter(**{f"{self.filter_by}__icontains": data})
+            .order_by("pk")
+            .first()
+        )
+        if instance is None:
+            self.fail("model_invalid")
+        return instance
 
     def to_representation(self, value):
         if not self.serializer:
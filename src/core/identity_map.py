@@ -0,0 +1,156 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.exceptions import ValidationError
+from django.db.models import CharField, TextField
+from django.db.models.functions import Lower
+
+_current_identity_map = ContextVar("identity_map", default=None)
+
+_MISSING = object()
+
+
+class IdentityMap:
+    """
+    Identity Map
+
+    Keeps model objects loaded in the current scope keyed by
+    ``(model, lookup, value)`` so each object is fetched at most once.
+    Unknown keys are resolved in bulk with a single ``IN`` query.
+
+    Objects loaded through a restricted queryset are kept apart from the
+    default manager's ones by passing a ``namespace`` identifying that queryset.
+    """
+
+    def __init__(self):
+        self._objects = {}
+
+    @staticmethod
+    def _get_field(model, lookup):
+        return model._meta.pk if lookup == "pk" else model._meta.get_field(lookup)
+
+    @classmethod
+    def _is_case_insensitive(cls, model, lookup, case_insensitive):
+        """
+        Case only matters to text fields (``Lower()`` fails on other types)
+        """
+        return case_insensitive and isinstance(
+            cls._get_field(model, lookup), (CharField, TextField)
+        )
+
+    @classmethod
+    def _key(cls, model, lookup, value, case_insensitive=False, namespace=None):
+        case_insensitive = cls._is_case_insensitive(model, lookup, case_insensitive)
+        if value is not None:
+            field = cls._get_field(model, lookup)
+            try:
+                value = field.to_python(value)
+            except ValidationError as exc:
+                raise ValueError(exc.messages) from exc
+            if case_insensitive:
+                value = str(value).lower()
+        return (model._meta.label_lower, namespace, lookup, value)
+
+    def add(self, obj, lookup="pk", case_insensitive=False, namespace=None):
+        """
+        Register a loaded object under its ``lookup`` value and primary key
+        """
+        model = obj.__class__
+        value = getattr(obj, lookup)
+        self._objects.setdefault(
+            self._key(model, lookup, value, case_insensitive, namespace), obj
+        )
+        self._objects.setdefault(self._key(model, "pk", obj.pk, False, namespace), obj)
+        return obj
+
+    def load(
+        self,
+        model,
+        values,
+        lookup="pk",
+        queryset=None,
+        case_insensitive=False,
+        namespace=None,
+    ):
+        """
+        Fetch every value not yet in the map with one query
+        """
+        missing = set()
+        for value in values:
+            try:
+                key = self._key(model, lookup, value, case_insensitive, namespace)
+            except ValueError:
+                continue
+            if value is not None and key not in self._objects:
+                missing.add(key[3])
+        if not missing:
+            return
+
+        if queryset is None:
+            queryset = model._default_manager.all()
+        if self._is_case_insensitive(model, lookup, case_insensitive):
+            queryset = queryset.annotate(_identity_key=Lower(lookup)).filter(
+                _identity_key__in=missing
+            )
+        else:
+            queryset = queryset.filter(**{f"{lookup}__in": missing})
+
+        # Mirror ``.first()``: the lowest primary key wins on duplicates.
+        for obj in queryset.order_by("pk"):
+            self.add(obj, lookup, case_insensitive, namespace)
+
+        for value in missing:
+            self._objects.setdefault(
+                self._key(model, lookup, value, case_insensitive, namespace), _MISSING
+            )
+
+    def get(
+        self,
+        model,
+        value,
+        lookup="pk",
+        queryset=None,
+        case_insensitive=False,
+        namespace=None,
+    ):
+        """
+        Object for ``value``, loading it if needed; ``None`` when it doesn't exist
+
+        Raises ``ValueError`` when ``value`` isn't valid for the lookup field.
+        """
+        key = self._key(model, lookup, value, case_insensitive, namespace)
+        if key not in self._objects:
+            self.load(model, [value], lookup, queryset, case_insensitive, namespace)
+        obj = self._objects.get(key, _MISSING)
+        return None if obj is _MISSING else obj
+
+    def clear(self):
+        """
+        Forget every loaded object
+        """
+        self._objects.clear()
+
+
+def get_identity_map():
+    """
+    Identity map of the active scope, or ``None`` outside of a scope
+    """
+    return _current_identity_map.get()
+
+
+@contextmanager
+def identity_map_scope():
+    """
+    Activate an identity map, reusing the enclosing one if there is any
+    """
+    identity_map = _current_identity_map.get()
+    if identity_map is not None:
+        yield identity_map
+        return
+
+    identity_map = IdentityMap()
+    token = _current_identity_map.set(identity_map)
+    try:
+        yield identity_map
+    finally:
+        _current_identity_map.reset(token)
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from src.core.utils.outbox import drain
+
+
+class Command(BaseCommand):
+    """
+    Deliver queued outbound emails
+    """
+
+    help = (
+        "Send the due emails of the outbox in batches over a single SMTP "
+        "connection, retrying failures with exponential backoff"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--max-batches", type=int, default=None, help="Stop after this many batches"
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the outbox until interrupted",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds between polls with --loop",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, attempted = drain(options["batch_size"], options["max_batches"])
+            except OSError as exc:
+                # SMTP server unreachable: nothing was claimed, try again later.
+                if not options["loop"]:
+                    raise
+                self.stderr.write(self.style.ERROR(f"Mail server unavailable: {exc}"))
+            else:
+                if attempted or not options["loop"]:
+                    self.stdout.write(
+                        self.style.SUCCESS(f"Sent {sent} of {attempted} emails.")
+                    )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
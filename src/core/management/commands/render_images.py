@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from src.core.utils.renditions import drain
+
+
+class Command(BaseCommand):
+    """
+    Render queued image renditions
+    """
+
+    help = (
+        "Store the WebP and JPEG renditions of the new package images, cover "
+        "images and avatars next to the originals, retrying failures with "
+        "exponential backoff"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=20)
+        parser.add_argument(
+            "--max-batches", type=int, default=None, help="Stop after this many batches"
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the queue until interrupted",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds between polls with --loop",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            rendered, attempted = drain(options["batch_size"], options["max_batches"])
+            if attempted or not options["loop"]:
+                self.stdout.write(
+                    self.style.SUCCESS(f"Rendered {rendered} of {attempted} images.")
+                )
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
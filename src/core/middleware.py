@@ -0,0 +1,15 @@
+from src.core.identity_map import identity_map_scope
+
+
+class IdentityMapMiddleware:
+    """
+    Opens an identity map for the duration of each request, so related objects
+    resolved by serializer fields are loaded at most once per request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with identity_map_scope():
+            return self.get_response(request)
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.1 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_image_renditions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredFile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("size", models.PositiveBigIntegerField()),
+                ("references", models.PositiveIntegerField(default=0)),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
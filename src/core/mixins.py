@@ -1,6 +1,28 @@
+import hashlib
+from collections.abc import Mapping
+from datetime import datetime
 from functools import partial
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.utils.module_loading import import_string
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from src.core.compiled import CompiledSerializer
+from src.core.utils import response_cache
+from src.core.utils.streaming import CHUNK_SIZE, streaming_response
 
 
 class FieldPermissionSerializerMixin:
@@ -51,6 +73,17 @@ class FieldPermissionModelMixin:
         """
         return user.has_perm(perm)
 
+    @classmethod
+    def get_declared_permissions(cls):
+        """
+        Codenames of the model's ``Meta.permissions``, computed once per model
+        """
+        declared = cls.__dict__.get("_declared_permissions")
+        if declared is None:
+            declared = frozenset(dict(cls._meta.permissions))
+            cls._declared_permissions = declared
+        return declared
+
     def has_field_perm(self, user, field):
         """
         Check for each field permission
@@ -59,9 +92,10 @@ class FieldPermissionModelMixin:
             checks = self.field_permissions[field]
             if not isinstance(checks, (list, tuple)):
                 checks = [checks]
-            for i, perm in enumerate(checks):
-                if callable(perm):
-                    checks[i] = partial(perm, field=field)
+            checks = [
+                partial(perm, field=field) if callable(perm) else perm
+                for perm in checks
+            ]
 
         else:
             checks = []
@@ -79,8 +113,8 @@ class FieldPermissionModelMixin:
                         "name": field,
                     }
                 )
-                if perm_label in dict(self._meta.permissions):
-                    checks.append(self._meta.model_name + "." + perm_label)
+                if perm_label in self.get_declared_permissions():
+                    checks.append(self._meta.app_label + "." + perm_label)
 
         # No requirements means no restrictions.
         if not checks:
@@ -94,9 +128,9 @@ class FieldPermissionModelMixin:
                     return result
 
             else:
-                result = user.has_perm(
-                    perm
-                )  # Don't supply 'obj', or else infinite recursion.
+                # Don't supply 'obj', or else infinite recursion; without it
+                # the check is a lookup in the user's permission snapshot.
+                result = user.has_perm(perm)
                 if result:
                     return True
 
@@ -104,11 +138,641 @@ class FieldPermissionModelMixin:
         return False
 
 
+class QueryPlanMixin:
+    """
+    Query Plan Mixin.
+
+    Applies the ``select_related`` / ``prefetch_related`` hints declared on the
+    serializer's ``Meta`` to the view queryset, so nested representations are
+    loaded in a constant number of queries.
+    """
+
+    def get_relation_hints(self):
+        """
+        ``select_related`` and ``prefetch_related`` lookups of the serializer
+        """
+        meta = getattr(self.get_serializer_class(), "Meta", None)
+        return (
+            getattr(meta, "select_related", ()),
+            getattr(meta, "prefetch_related", ()),
+        )
+
+    def get_queryset(self):
+        """
+        Queryset with the serializer's relation hints applied.
+        """
+        queryset = super().get_queryset()
+        select_related, prefetch_related = self.get_relation_hints()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+
+class SparseFieldsMixin:
+    """
+    Sparse Fieldsets Mixin.
+
+    On reads, ``?fields=id,title`` keeps only the listed fields of the
+    representation and ``?exclude=content`` drops the listed ones. Columns
+    read by none of the remaining fields are deferred, so they are neither
+    fetched nor sent, and relations they don't show aren't joined or
+    prefetched (with ``QueryPlanMixin``). Columns the view itself needs
+    (ordering, lookup, conditional request validators) are always fetched.
+    """
+
+    fields_query_param = "fields"
+    exclude_query_param = "exclude"
+
+    def get_sparse_fields(self):
+        """
+        Requested and excluded field names, ``None`` when the full
+        representation is asked for
+        """
+        request = getattr(self, "request", None)
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        fields, exclude = (
+            {name.strip() for name in request.query_params.get(param, "").split(",")}
+            - {""}
+            for param in (self.fields_query_param, self.exclude_query_param)
+        )
+        if not fields and not exclude:
+            return None
+        return fields, exclude
+
+    def trim_fields(self, serializer):
+        """
+        Drop the fields of ``serializer`` the request doesn't ask for
+        """
+        sparse = self.get_sparse_fields()
+        if sparse is None:
+            return
+        fields, exclude = sparse
+        unknown = (fields | exclude) - set(serializer.fields)
+        if unknown:
+            raise ValidationError(
+                {
+                    self.fields_query_param: f"Unknown fields: {', '.join(sorted(unknown))}."
+                }
+            )
+        for name in list(serializer.fields):
+            if (fields and name not in fields) or name in exclude:
+                serializer.fields.pop(name)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if isinstance(serializer, serializers.ListSerializer):
+            self.trim_fields(serializer.child)
+        else:
+            self.trim_fields(serializer)
+        return serializer
+
+    def get_required_fields(self):
+        """
+        Fields the view reads besides those of the representation
+        """
+        required = {self.lookup_field}
+        for name in ("conditional_fields", "conditional_counters", "ordering"):
+            required.update(
+                field.lstrip("-") for field in getattr(self, name, None) or ()
+            )
+        ordering_fields = getattr(self, "ordering_fields", None)
+        if isinstance(ordering_fields, (list, tuple)):
+            required.update(ordering_fields)
+        return required
+
+    def get_sources(self):
+        """
+        Model fields read by the requested fields
+        """
+        return {
+            field.source.split(".")[0]
+            for field in self.get_serializer().fields.values()
+        }
+
+    def get_relation_hints(self):
+        """
+        Relation hints of the requested fields only
+        """
+        select_related, prefetch_related = super().get_relation_hints()
+        if self.get_sparse_fields() is None:
+            return select_related, prefetch_related
+        sources = self.get_sources()
+        return tuple(
+            tuple(lookup for lookup in lookups if lookup.split("__")[0] in sources)
+            for lookups in (select_related, prefetch_related)
+        )
+
+    def get_deferred_fields(self, model):
+        """
+        Columns none of the requested fields reads
+        """
+        if self.get_sparse_fields() is None:
+            return ()
+        required = self.get_required_fields() | self.get_sources()
+        return [
+            field.name
+            for field in model._meta.concrete_fields
+            if not field.is_relation
+            and not field.primary_key
+            and field.name not in required
+        ]
+
+    def get_queryset(self):
+        """
+        Queryset deferring the columns of the fields left out.
+        """
+        queryset = super().get_queryset()
+        deferred = self.get_deferred_fields(queryset.model)
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        return queryset
+
+
+class ConditionalRequestMixin:
+    """
+    Conditional GET Mixin.
+
+    Lists and details carry an ``ETag`` built from ``conditional_fields``
+    (timestamps) and ``conditional_counters`` (denormalized counters updated
+    without touching the timestamps), so a client revalidating an unchanged
+    resource gets a ``304 Not Modified`` before anything is serialized.
+
+    A list is validated with a single aggregate (``MAX`` of the timestamps,
+    ``SUM`` of the counters and ``COUNT`` of the rows) over the filtered
+    queryset, a detail with the values of its row. Details of models without
+    counters also carry a ``Last-Modified`` header; lists don't, since a
+    deleted row can't be told apart from an unchanged list by date.
+    """
+
+    conditional_fields = ("updated_at",)
+    conditional_counters = ()
+
+    def get_etag(self, values):
+        """
+        ETag of a representation built from ``values``
+        """
+        request = self.request
+        key = repr(
+            (request.get_full_path(), request.accepted_media_type, tuple(values))
+        )
+        return quote_etag(hashlib.md5(key.encode(), usedforsecurity=False).hexdigest())
+
+    def get_last_modified(self, instance):
+        """
+        Latest timestamp of ``instance``, when it dates every change of it
+        """
+        if self.conditional_counters:
+            return None
+        timestamps = [
+            value
+            for value in (getattr(instance, name) for name in self.conditional_fields)
+            if isinstance(value, datetime)
+        ]
+        return int(max(timestamps).timestamp()) if timestamps else None
+
+    def get_list_validators(self, queryset):
+        """
+        ETag and Last-Modified of a list
+        """
+        aggregates = {f"{name}__max": Max(name) for name in self.conditional_fields}
+        aggregates.update(
+            {f"{name}__sum": Sum(name) for name in self.conditional_counters}
+        )
+        aggregates["pk__count"] = Count("pk")
+        values = list(queryset.order_by().aggregate(**aggregates).values())
+        return self.get_etag(values), None
+
+    def get_object_validators(self, instance):
+        """
+        ETag and Last-Modified of a detail
+        """
+        values = [instance.pk] + [
+            getattr(instance, name)
+            for name in self.conditional_fields + self.conditional_counters
+        ]
+        return self.get_etag(values), self.get_last_modified(instance)
+
+    def get_not_modified_response(self, request, validators):
+        """
+        ``304 Not Modified`` (or ``412 Precondition Failed``) response when the
+        request's preconditions say so, else ``None``
+        """
+        etag, last_modified = validators
+        return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+    @staticmethod
+    def set_validators(response, validators):
+        """
+        Add the ETag and Last-Modified headers to ``response``
+        """
+        etag, last_modified = validators
+        if response.status_code == status.HTTP_200_OK:
+            response.headers["ETag"] = etag
+            if last_modified is not None:
+                response.headers["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """
+        List a queryset unless the client's copy is still fresh.
+        """
+        validators = self.get_list_validators(self.filter_queryset(self.get_queryset()))
+        not_modified = self.get_not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+        return self.set_validators(super().list(request, *args, **kwargs), validators)
+
+    # pylint: disable=unused-argument
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve an instance unless the client's copy is still fresh.
+        """
+        instance = self.get_object()
+        validators = self.get_object_validators(instance)
+        not_modified = self.get_not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(instance)
+        return self.set_validators(Response(serializer.data), validators)
+
+
+class CachedResponseMixin:
+    """
+    Response Cache Mixin.
+
+    Caches the data of list and detail responses (with their validators) per
+    absolute URI and accepted media type. Entries are keyed by version keys
+    bumped with ``response_cache.invalidate_responses`` whenever the model or
+    anything in its representation changes: lists by the model's list version,
+    details by the object's version, both by the model's version.
+
+    Only suited to representations which don't depend on the requesting user.
+    """
+
+    cache_timeout = None
+    cached_headers = ("ETag", "Last-Modified")
+
+    def get_cache_timeout(self):
+        """
+        Lifetime of the cached responses (``API_CACHE_TIMEOUT`` by default)
+        """
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return getattr(settings, "API_CACHE_TIMEOUT", 300)
+
+    def get_response_key(self, versions):
+        """
+        Cache key of the response to the current request
+        """
+        request = self.request
+        return response_cache.get_response_key(
+            response_cache.get_namespace(self.queryset.model),
+            versions,
+            f"{request.accepted_media_type} {request.build_absolute_uri()}",
+        )
+
+    def get_lookup_value(self):
+        """
+        Lookup value of the url as the field stores it, so ``/01/`` and
+        ``/1/`` share the object's version keys
+        """
+        value = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        opts = self.queryset.model._meta
+        field = (
+            opts.pk if self.lookup_field == "pk" else opts.get_field(self.lookup_field)
+        )
+        return field.to_python(value)
+
+    def get_cached_response(self, request, key):
+        """
+        Cached response for ``key`` (or ``304 Not Modified``), else ``None``
+        """
+        cached = cache.get(key)
+        if cached is None:
+            return None
+        data, headers = cached
+        not_modified = get_conditional_response(
+            request,
+            etag=headers.get("ETag"),
+            last_modified=parse_http_date_safe(headers.get("Last-Modified", "")),
+        )
+        if not_modified is not None:
+            return not_modified
+        return Response(data, headers=headers)
+
+    def cache_response(self, key, response):
+        """
+        Store a successful response under ``key``
+        """
+        if response.status_code == status.HTTP_200_OK:
+            headers = {
+                name: response[name]
+                for name in self.cached_headers
+                if response.has_header(name)
+            }
+            cache.set(key, (response.data, headers), self.get_cache_timeout())
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """
+        List a queryset, from the cache when possible.
+        """
+        namespace = response_cache.get_namespace(self.queryset.model)
+        key = self.get_response_key(response_cache.get_list_versions(namespace))
+        cached = self.get_cached_response(request, key)
+        if cached is not None:
+            return cached
+        return self.cache_response(key, super().list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve an instance, from the cache when possible.
+        """
+        namespace = response_cache.get_namespace(self.queryset.model)
+        try:
+            pk = self.get_lookup_value()
+        except DjangoValidationError:
+            return super().retrieve(request, *args, **kwargs)
+        key = self.get_response_key(response_cache.get_object_versions(namespace, pk))
+        cached = self.get_cached_response(request, key)
+        if cached is not None:
+            return cached
+        return self.cache_response(key, super().retrieve(request, *args, **kwargs))
+
+
+class ExportMixin:
+    """
+    NDJSON Export Mixin.
+
+    ``export`` streams the whole filtered queryset, one JSON document per
+    row, ordered by ``export_since_field`` then primary key. Rows are read as
+    dicts with ``values()`` through a chunked iterator: no model instance or
+    serializer per row, and flat memory whatever the size of the table.
+
+    ``?since=<timestamp>`` only exports rows changed at or after it, so
+    resuming from the last exported timestamp may repeat rows but never
+    misses one.
+    """
+
+    export_fields = None  # concrete fields but ``export_exclude`` by default
+    export_exclude = ()
+    export_since_field = "updated_at"
+
+    def get_export_fields(self):
+        """
+        Fields of an exported row
+        """
+        if self.export_fields is not None:
+            return self.export_fields
+        return tuple(
+            field.name
+            for field in self.get_queryset().model._meta.concrete_fields
+            if field.name not in self.export_exclude
+        )
+
+    def get_export_queryset(self):
+        """
+        Filtered queryset, narrowed by ``?since=``
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        since = self.request.query_params.get("since")
+        if since is not None:
+            try:
+                since = parse_datetime(since)
+            except ValueError:
+                since = None
+            if since is None:
+                raise ValidationError(
+                    {"since": "A valid ISO 8601 datetime is required."}
+                )
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            queryset = queryset.filter(**{f"{self.export_since_field}__gte": since})
+        return queryset.order_by(self.export_since_field, "pk")
+
+    @action(detail=False, methods=["get"])
+    def export(self, request, *args, **kwargs):
+        """
+        Stream the filtered rows as NDJSON
+        """
+        rows = (
+            self.get_export_queryset()
+            .values(*self.get_export_fields())
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+        return streaming_response(
+            rows, "ndjson", filename=self.get_queryset().model._meta.model_name
+        )
+
+
+def check_list_size(data, max_size):
+    """
+    Reject a list of more than ``max_size`` items
+    """
+    if len(data) > max_size:
+        raise ValidationError(
+            {
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f"Ensure this list has no more than {max_size} items."
+                ]
+            }
+        )
+
+
+class ZenCreateModelMixin:
+    """
+    Create Model Mixin accepting a single object or, on views setting
+    ``create_many``, a list of up to ``API_BULK_MAX_SIZE`` objects.
+    """
+
+    create_many = False
+
+    # pylint: disable=unused-argument
+    def create(self, request, *args, **kwargs):
+        """
+        Create one instance, or many when allowed and the payload is a list.
+        """
+        many = self.create_many and isinstance(request.data, list)
+        if many:
+            check_list_size(request.data, getattr(settings, "API_BULK_MAX_SIZE", 100))
+        serializer = self.get_serializer(data=request.data, many=many)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        headers = {} if many else self.get_success_headers(serializer.data)
+        return Response(
+            serializer.data, status=status.HTTP_201_CREATED, headers=headers
+        )
+
+
+class BulkModelMixin:
+    """
+    Bulk Create/Update/Delete Mixin.
+
+    ``bulk/`` takes a list of up to ``bulk_max_size`` items: ``POST``
+    creates an object per item, ``PATCH`` updates the objects whose ``id``
+    the items carry, ``DELETE`` deletes the objects of a list of ids.
+
+    Items are validated together by the serializer's list serializer (related
+    keys resolved with one query per field), saved in bulk (see
+    ``BulkListSerializer``) in one transaction and answered in order. When
+    any item is invalid nothing is saved: the response lists the errors of
+    every item, ``{}`` for the valid ones.
+
+    Bulk actions are meant for moderation and migration tools: they take
+    ``bulk_permission_classes`` (admin users by default) instead of the
+    view's permissions. ``create_many`` is turned off so lists can't be
+    created around those checks.
+    """
+
+    BULK_ACTIONS = ("bulk", "bulk_update", "bulk_destroy")
+
+    create_many = False
+    bulk_max_size = None
+    bulk_permission_classes = (IsAdminUser,)
+
+    def get_permissions(self):
+        if self.action in self.BULK_ACTIONS:
+            return [permission() for permission in self.bulk_permission_classes]
+        return super().get_permissions()
+
+    def get_bulk_max_size(self):
+        """
+        Most items of a bulk request (``API_BULK_MAX_SIZE`` by default)
+        """
+        if self.bulk_max_size is not None:
+            return self.bulk_max_size
+        return getattr(settings, "API_BULK_MAX_SIZE", 100)
+
+    def get_bulk_data(self):
+        """
+        Items of the request
+        """
+        data = self.request.data
+        if not isinstance(data, list) or not data:
+            raise ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        "Expected a non-empty list of items."
+                    ]
+                }
+            )
+        check_list_size(data, self.get_bulk_max_size())
+        return data
+
+    def get_bulk_instances(self, ids):
+        """
+        Objects of ``ids``, in the same order, fetched with one query
+        """
+        pk_field = self.get_queryset().model._meta.pk
+        keys, errors, seen = [], [], set()
+        for value in ids:
+            try:
+                key = pk_field.to_python(value) if value is not None else None
+            except DjangoValidationError:
+                key = None
+            keys.append(key)
+            if value is None:
+                errors.append({"id": ["This field is required."]})
+            elif key is None:
+                errors.append({"id": ["A valid id is required."]})
+            elif key in seen:
+                errors.append({"id": ["Duplicate id."]})
+            else:
+                errors.append({})
+            seen.add(key)
+
+        objects = self.get_queryset().in_bulk([key for key in keys if key is not None])
+        for i, key in enumerate(keys):
+            if not errors[i] and key not in objects:
+                errors[i] = {"id": ["Not found."]}
+        if any(errors):
+            raise ValidationError(errors)
+        return [objects[key] for key in keys]
+
+    def perform_bulk_destroy(self, instances):
+        """
+        Delete ``instances``
+        """
+        self.get_queryset().filter(
+            pk__in=[instance.pk for instance in instances]
+        ).delete()
+
+    # pylint: disable=unused-argument
+    @action(detail=False, methods=["post"])
+    def bulk(self, request, *args, **kwargs):
+        """
+        Create an object per item
+        """
+        serializer = self.get_serializer(data=self.get_bulk_data(), many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    # pylint: disable=unused-argument
+    @bulk.mapping.patch
+    def bulk_update(self, request, *args, **kwargs):
+        """
+        Update the object of each item's ``id``
+        """
+        data = self.get_bulk_data()
+        instances = self.get_bulk_instances(
+            [item.get("id") if isinstance(item, Mapping) else None for item in data]
+        )
+        serializer = self.get_serializer(instances, data=data, many=True, partial=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            self.perform_update(serializer)
+        return Response(serializer.data)
+
+    # pylint: disable=unused-argument
+    @bulk.mapping.delete
+    def bulk_destroy(self, request, *args, **kwargs):
+        """
+        Delete the objects of a list of ids
+        """
+        instances = self.get_bulk_instances(self.get_bulk_data())
+        ids = [instance.pk for instance in instances]
+        with transaction.atomic():
+            self.perform_bulk_destroy(instances)
+        return Response([{"id": pk} for pk in ids])
+
+
 class ZenListModelMixin:
     """
     List Model Mixin.
+
+    With ``compiled_list``, lists are read as ``values()`` rows and
+    represented by the serializer's compiled read path (see
+    ``CompiledSerializer``) when it has one.
     """
 
+    compiled_list = False
+
+    def get_compiled_serializer(self):
+        """
+        Compiled read path of the list serializer, ``None`` when not used
+        """
+        if not self.compiled_list:
+            return None
+        return CompiledSerializer.compile(self.get_serializer())
+
+    def get_ordering_names(self):
+        """
+        Fields a list may be ordered (and paginated) by
+        """
+        names = [field.lstrip("-") for field in getattr(self, "ordering", None) or ()]
+        ordering_fields = getattr(self, "ordering_fields", None)
+        if isinstance(ordering_fields, (list, tuple)):
+            names.extend(ordering_fields)
+        concrete = {
+            field.name for field in self.get_queryset().model._meta.concrete_fields
+        }
+        return [name for name in names if name in concrete]
+
     # pylint: disable=unused-argument
     def list(self, request, *args, **kwargs):
         """
@@ -116,6 +780,14 @@ class ZenListModelMixin:
         """
         queryset = self.filter_queryset(self.get_queryset())
 
+        compiled = self.get_compiled_serializer()
+        if compiled is not None:
+            queryset = compiled.get_queryset(queryset, self.get_ordering_names())
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                return self.get_paginated_response(compiled.represent(page))
+            return Response(compiled.represent(queryset))
+
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True, *args, **kwargs)
@@ -149,4 +821,17 @@ class PermissionPolicyMixin:
                 handler.__name__
             )
 
+        # Load the user's permissions once for every check of the request.
+        if request.user and request.user.is_authenticated:
+            self.load_permissions(request.user)
+
         super().check_permissions(request)
+
+    def load_permissions(self, user):
+        """
+        Warm the permissions of ``user`` with the ``PERMISSION_SNAPSHOT_LOADER``
+        callable, if one is configured
+        """
+        loader = getattr(settings, "PERMISSION_SNAPSHOT_LOADER", None)
+        if loader:
+            import_string(loader)(user)
@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.utils import timezone
 from safedelete.config import SOFT_DELETE_CASCADE
 from safedelete.models import SafeDeleteModel
 from safedelete.queryset import SafeDeleteQueryset
@@ -55,3 +57,121 @@ class ZenBaseModel(SafeDeleteModel):
         """Meta Class"""
 
         abstract = True
+
+
+class OutboundEmailStatus(models.TextChoices):
+    """
+    Outbound Email Status Choices
+    """
+
+    PENDING = "pending", "Pending"
+    SENDING = "sending", "Sending"
+    SENT = "sent", "Sent"
+    FAILED = "failed", "Failed"
+
+
+class OutboundEmail(models.Model):
+    """
+    Email queued by a request and delivered by the ``drain_outbox`` worker
+    """
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, default="")
+    from_email = models.CharField(max_length=255, blank=True, default="")
+    to = models.JSONField(default=list)
+    status = models.CharField(
+        max_length=10,
+        choices=OutboundEmailStatus.choices,
+        default=OutboundEmailStatus.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_on = models.DateTimeField(auto_now_add=True)
+    sent_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        """Meta Class"""
+
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at", "id"],
+                condition=models.Q(status__in=["pending", "sending"]),
+                name="core_outbox_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)}"
+
+
+class ImageRenditionStatus(models.TextChoices):
+    """
+    Image Rendition Status Choices
+    """
+
+    PENDING = "pending", "Pending"
+    RENDERING = "rendering", "Rendering"
+    DONE = "done", "Done"
+    SKIPPED = "skipped", "Skipped"
+    FAILED = "failed", "Failed"
+
+
+class ImageRendition(models.Model):
+    """
+    Renditions of an image field queued by a save and made by the
+    ``render_images`` worker
+
+    One job per image field: uploading another image queues it again.
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    field = models.CharField(max_length=100)
+    source = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=10,
+        choices=ImageRenditionStatus.choices,
+        default=ImageRenditionStatus.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_on = models.DateTimeField(auto_now_add=True)
+    rendered_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        """Meta Class"""
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id", "field"],
+                name="core_rendition_field_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at", "id"],
+                condition=models.Q(status__in=["pending", "rendering"]),
+                name="core_rendition_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.source} ({self.status})"
+
+
+class StoredFile(models.Model):
+    """
+    File of the content-addressed media storage and the number of references
+    to it (see ``src.core.storage.ContentAddressedStorage``)
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    size = models.PositiveBigIntegerField()
+    references = models.PositiveIntegerField(default=0)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.references})"
@@ -1,7 +1,13 @@
+from collections import defaultdict
+from collections.abc import Mapping
+
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
 from rest_framework import serializers
 
+from src.core.identity_map import get_identity_map, identity_map_scope
+from src.core.utils import bulk
+
 
 class DynamicFieldsModelSerializer(serializers.ModelSerializer):
     """
@@ -31,6 +37,95 @@ class DynamicFieldsModelSerializer(serializers.ModelSerializer):
                     self.fields.pop(field_name)
 
 
+class ZenListSerializer(serializers.ListSerializer):
+    """
+    List Serializer that resolves related keys in bulk
+
+    Before validating the items, every child field exposing ``prefetch_values``
+    receives the keys written for it across the whole list, so they are loaded
+    with one query per field into the identity map that the fields read from.
+    """
+
+    def to_internal_value(self, data):
+        with identity_map_scope():
+            if isinstance(data, list):
+                self.prefetch_related_values(data)
+            return super().to_internal_value(data)
+
+    def prefetch_related_values(self, data):
+        """
+        Load related objects referenced by all items
+        """
+        for field in self.child.fields.values():
+            if field.read_only or not hasattr(field, "prefetch_values"):
+                continue
+            values = [
+                item[field.field_name]
+                for item in data
+                if isinstance(item, Mapping) and item.get(field.field_name) is not None
+            ]
+            if values:
+                field.prefetch_values(values)
+
+    def create(self, validated_data):
+        # Nested writable serializers read their related data from
+        # ``initial_data`` and ``_save_kwargs``, which the shared child only
+        # gets when it is saved on its own.
+        if hasattr(self.child, "_get_save_kwargs"):
+            self.child._save_kwargs = defaultdict(dict)
+        instances = []
+        for initial_data, attrs in zip(self.initial_data, validated_data):
+            self.child.initial_data = initial_data
+            instances.append(self.child.create(attrs))
+        return instances
+
+
+class BulkListSerializer(ZenListSerializer):
+    """
+    List Serializer saving all its items at once
+
+    Items are created with one ``bulk_create`` and updated with one
+    ``bulk_update``; to update, pass the instances in the order of the items
+    (each item is validated against its own instance). ``save()`` and
+    signals don't run for bulk saves: override ``bulk_create`` and
+    ``bulk_update`` to keep what they maintain in sync.
+
+    Only suited to models without many-to-many fields.
+    """
+
+    def to_internal_value(self, data):
+        if self.instance is not None:
+            self._child_instances = iter(self.instance)
+        try:
+            return super().to_internal_value(data)
+        finally:
+            self.child.instance = None
+
+    def run_child_validation(self, data):
+        if self.instance is not None:
+            self.child.instance = next(self._child_instances, None)
+        return super().run_child_validation(data)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return self.bulk_create([model(**attrs) for attrs in validated_data])
+
+    def update(self, instance, validated_data):
+        return self.bulk_update(list(instance), validated_data)
+
+    def bulk_create(self, instances):
+        """
+        Insert the unsaved ``instances``
+        """
+        return self.child.Meta.model._default_manager.bulk_create(instances)
+
+    def bulk_update(self, instances, changes):
+        """
+        Apply the validated ``changes`` (one dict per instance) and save them
+        """
+        return bulk.bulk_update(instances, changes)
+
+
 class RelatedFieldMapSerializer(serializers.PrimaryKeyRelatedField):
     """
     Serializer for customizing related field
@@ -48,6 +143,54 @@ class RelatedFieldMapSerializer(serializers.PrimaryKeyRelatedField):
     def use_pk_only_optimization(self):
         return not self.serializer
 
+    def get_identity_namespace(self, queryset):
+        """
+        Identity map namespace of this field's queryset
+        """
+        if not hasattr(self, "_identity_namespace"):
+            self._identity_namespace = str(queryset.query)
+        return self._identity_namespace
+
+    def prefetch_values(self, values):
+        """
+        Load every written primary key into the identity map
+        """
+        identity_map = get_identity_map()
+        if identity_map is None:
+            return
+        if self.pk_field is not None:
+            values = [self.pk_field.to_internal_value(value) for value in values]
+        queryset = self.get_queryset()
+        identity_map.load(
+            queryset.model,
+            [value for value in values if isinstance(value, (int, str))],
+            queryset=queryset,
+            namespace=self.get_identity_namespace(queryset),
+        )
+
+    def to_internal_value(self, data):
+        identity_map = get_identity_map()
+        if identity_map is None:
+            return super().to_internal_value(data)
+
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        if isinstance(data, bool) or not isinstance(data, (int, str)):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        queryset = self.get_queryset()
+        try:
+            instance = identity_map.get(
+                queryset.model,
+                data,
+                queryset=queryset,
+                namespace=self.get_identity_namespace(queryset),
+            )
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if instance is None:
+            self.fail("does_not_exist", pk_value=data)
+        return instance
+
     def to_representation(self, value):
         if self.serializer:
             return self.serializer(value, context=self.context).data
@@ -101,8 +244,9 @@ class ContentTypeSerializer(serializers.ModelSerializer):
         """
         Get Content Type Permission
         """
+        # Reads the ``permission_set`` prefetched by the view when there is one.
         serializer = PermissionSerializer(
-            Permission.objects.filter(content_type=instance).all(),
+            instance.permission_set.all(),
             fields=("id", "codename"),
             many=True,
         )
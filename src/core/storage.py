@@ -0,0 +1,95 @@
+import hashlib
+import posixpath
+from functools import partial
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+from src.core.models import StoredFile
+
+CONTENT_PREFIX = "objects"
+# Content-addressed names never change meaning
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage keeping uploads under the SHA-256 digest of their
+    content
+
+    Identical uploads are stored once, whatever their names and upload
+    directories. ``StoredFile`` counts the references to each file: saving
+    adds one, ``delete`` drops one and removes the file with the last.
+    Uploads are hashed chunk by chunk, never read whole into memory.
+    """
+
+    def __init__(self, **kwargs):
+        # Concurrent saves of the same content write the same bytes.
+        kwargs.setdefault("allow_overwrite", True)
+        super().__init__(**kwargs)
+
+    def get_available_name(self, name, max_length=None):
+        # The name is given by the content in ``_save``.
+        return name
+
+    @staticmethod
+    def get_content_name(digest, name):
+        """
+        Storage name of content with ``digest`` uploaded as ``name``
+        """
+        extension = posixpath.splitext(name)[1].lower()
+        if len(extension) > 10 or not extension[1:].isalnum():
+            extension = ""
+        directory = posixpath.join(CONTENT_PREFIX, digest[:2], digest[2:4])
+        return posixpath.join(directory, digest + extension)
+
+    @staticmethod
+    def is_content_addressed(name):
+        """
+        Whether ``name`` was given by this storage (rather than stored before)
+        """
+        return bool(name) and name.startswith(f"{CONTENT_PREFIX}/")
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in content.chunks():
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            digest.update(chunk)
+            size += len(chunk)
+        name = self.get_content_name(digest.hexdigest(), name)
+        if not self.exists(name):
+            name = super()._save(name, content)
+        with transaction.atomic():
+            StoredFile.objects.bulk_create(
+                [StoredFile(name=name, size=size)], ignore_conflicts=True
+            )
+            StoredFile.objects.filter(name=name).update(references=F("references") + 1)
+        return name
+
+    def delete(self, name):
+        """
+        Drop one reference to a content-addressed file, removing the file
+        with the last one once committed
+
+        Other files are deleted right away.
+        """
+        if not self.is_content_addressed(name):
+            return super().delete(name)
+        with transaction.atomic():
+            StoredFile.objects.filter(name=name, references__gt=0).update(
+                references=F("references") - 1
+            )
+            removed, _ = StoredFile.objects.filter(name=name, references=0).delete()
+        if removed:
+            transaction.on_commit(partial(self.remove_unreferenced, name))
+        return None
+
+    def remove_unreferenced(self, name):
+        """
+        Remove the file of ``name`` unless it was uploaded again meanwhile
+        """
+        if not StoredFile.objects.filter(name=name).exists():
+            super().delete(name)
@@ -1,3 +1,351 @@
-from django.test import TestCase
+import base64
+import json
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import Group, Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from src.core.fields import ZenModelSerializeCharField
+from src.core.identity_map import IdentityMap, get_identity_map, identity_map_scope
+from src.core.middleware import IdentityMapMiddleware
+from src.core.models import OutboundEmail, OutboundEmailStatus, StoredFile
+from src.core.storage import IMMUTABLE_CACHE_CONTROL
+from src.core.utils import outbox
+from src.core.utils.pagination import KeysetPagination
+from src.core.utils.unique_slugify import unique_slugify
+from src.core.views import serve_media
+from src.packages.models import Package
+from src.user.models import User
+
+
+class ContentTypeListApiQueryTestCase(TestCase):
+    """
+    Query count of the content type list
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_superuser(
+                email="admin@example.com", username="admin", password="password"
+            )
+        )
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/v1/content-types")
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()
+
+    def test_query_count_is_constant(self):
+        queries, data = self.count_queries()
+        for i in range(10):
+            content_type = ContentType.objects.create(
+                app_label="extra", model=f"model{i}"
+            )
+            Permission.objects.create(
+                content_type=content_type, codename=f"view_model{i}", name=f"View {i}"
+            )
+        more_queries, more_data = self.count_queries()
+
+        self.assertEqual(len(more_data), len(data) + 10)
+        self.assertEqual(queries, more_queries)
+        self.assertEqual(queries, 2)
+        self.assertIn(
+            "view_model0",
+            [
+                permission["codename"]
+                for item in more_data
+                for permission in item["permissions"]
+            ],
+        )
+
+
+class OutboxTestCase(TestCase):
+    """
+    Queued outbound emails
+    """
+
+    def test_password_reset_is_queued(self):
+        User.objects.create_user(
+            email="user@example.com", username="user", password="pw"
+        )
+        response = APIClient().post(
+            "/api/v1/password_reset", {"email": "user@example.com"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(outbox.drain(), (1, 1))
+        self.assertEqual(mail.outbox[0].to, ["user@example.com"])
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmailStatus.SENT)
+
+    def test_failures_are_retried_later(self):
+        email = outbox.enqueue_email("Subject", "Body", ["user@example.com"])
+        connection = mail.get_connection(
+            "django.core.mail.backends.locmem.EmailBackend"
+        )
+        connection.send_messages = lambda messages: 1 / 0
+
+        self.assertEqual(outbox.drain(mail_connection=connection), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmailStatus.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertIn("ZeroDivisionError", email.last_error)
+        self.assertEqual(outbox.drain(mail_connection=connection), (0, 0))
+
+
+class UniqueSlugifyTestCase(TestCase):
+    """
+    Slug generation
+    """
+
+    def test_next_free_suffix_in_one_query(self):
+        for _ in range(5):
+            Package.objects.create(title="Django REST", version="1")
+        Package.objects.create(title="Django REST 7", version="1")
+
+        package = Package(title="Django REST", version="1")
+        with self.assertNumQueries(1):
+            unique_slugify(package, package.title)
+        self.assertEqual(package.slug, "django-rest-6")
+        package.save()
+        self.assertEqual(
+            Package.objects.create(title="Django REST", version="1").slug,
+            "django-rest-8",
+        )
+
+
+class IdentityMapTestCase(TestCase):
+    """
+    Identity map and its request scope
+    """
+
+    def setUp(self):
+        self.packages = [
+            Package.objects.create(title=title, version="1.0")
+            for title in ("django", "flask")
+        ]
+
+    def test_objects_are_loaded_once(self):
+        identity_map = IdentityMap()
+        django, flask = self.packages
+        with self.assertNumQueries(1):
+            identity_map.load(Package, [django.pk, str(django.pk), flask.pk, 0])
+        with self.assertNumQueries(0):
+            self.assertEqual(identity_map.get(Package, str(django.pk)), django)
+            self.assertEqual(identity_map.get(Package, flask.pk), flask)
+            self.assertIsNone(identity_map.get(Package, 0))
+        with self.assertRaises(ValueError):
+            identity_map.get(Package, "django")
+
+    def test_case_insensitive_lookup(self):
+        identity_map = IdentityMap()
+        with self.assertNumQueries(1):
+            package = identity_map.get(
+                Package, "DJANGO", "title", case_insensitive=True
+            )
+        self.assertEqual(package, self.packages[0])
+        # Registered under its primary key too
+        with self.assertNumQueries(0):
+            self.assertIs(identity_map.get(Package, package.pk), package)
+
+    def test_case_insensitive_lookup_of_non_text_field(self):
+        identity_map = IdentityMap()
+        package = self.packages[0]
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(
+                identity_map.get(Package, str(package.pk), "id", case_insensitive=True),
+                package,
+            )
+        self.assertNotIn("LOWER", context.captured_queries[0]["sql"])
+
+    def test_namespaces(self):
+        identity_map = IdentityMap()
+        django, flask = self.packages
+        identity_map.load(Package, [django.pk, flask.pk])
+        queryset = Package.objects.filter(title="flask")
+        with self.assertNumQueries(1):
+            self.assertIsNone(
+                identity_map.get(
+                    Package, django.pk, queryset=queryset, namespace="flask"
+                )
+            )
+        self.assertEqual(
+            identity_map.get(Package, flask.pk, queryset=queryset, namespace="flask"),
+            flask,
+        )
+
+    def test_char_field_falls_back_to_icontains(self):
+        field = ZenModelSerializeCharField(model=Package, filter_by="title")
+        with identity_map_scope():
+            field.prefetch_values(["Django", "DJANGO", "las"])
+            with self.assertNumQueries(0):
+                self.assertEqual(field.to_internal_value("django"), self.packages[0])
+            with self.assertNumQueries(1):
+                self.assertEqual(field.to_internal_value("las"), self.packages[1])
+
+    def test_middleware_scope(self):
+        scopes = []
+
+        def get_response(request):
+            scopes.append(get_identity_map())
+            with identity_map_scope() as identity_map:
+                scopes.append(identity_map)
+            return "response"
+
+        middleware = IdentityMapMiddleware(get_response)
+        self.assertEqual(middleware(RequestFactory().get("/")), "response")
+        self.assertIsNotNone(scopes[0])
+        self.assertIs(scopes[0], scopes[1])
+        self.assertIsNone(get_identity_map())
+
+    def test_related_objects_are_loaded_once_per_request(self):
+        admin = User.objects.create_user(
+            email="admin@example.com", username="admin", is_staff=True
+        )
+        group = Group.objects.create(name="moderator")
+        client = APIClient()
+        client.force_authenticate(admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                "/api/v1/assign-roles/",
+                {"user": admin.pk, "group": group.pk},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+        selects = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT")
+        ]
+        self.assertEqual(len([sql for sql in selects if 'FROM "auth_group"' in sql]), 1)
+        self.assertEqual(len([sql for sql in selects if 'FROM "user_user"' in sql]), 1)
+
+
+class KeysetPaginationTestCase(TestCase):
+    """
+    Keyset pagination cursors
+    """
+
+    def setUp(self):
+        self.ids = [
+            Package.objects.create(title=f"package-{i}", version="1.0").pk
+            for i in range(5)
+        ]
+        self.ids.reverse()
+
+    def paginate(self, url, **params):
+        paginator = KeysetPagination()
+        request = Request(RequestFactory().get(url, params))
+        page = paginator.paginate_queryset(Package.objects.all(), request)
+        return paginator, [package.pk for package in page]
+
+    def test_cursor_encoding(self):
+        paginator, page = self.paginate("/packages/", page_size=2)
+        self.assertEqual(page, self.ids[:2])
+        request = Request(RequestFactory().get(paginator.get_next_link()))
+        self.assertEqual(
+            paginator.decode_cursor(request), {"p": [self.ids[1]], "r": False}
+        )
+        self.assertIsNone(paginator.get_previous_link())
+
+    def test_next_and_previous_pages(self):
+        paginator, _ = self.paginate("/packages/", page_size=2)
+        paginator, page = self.paginate(paginator.get_next_link())
+        self.assertEqual(page, self.ids[2:4])
+        paginator, page = self.paginate(paginator.get_next_link())
+        self.assertEqual(page, self.ids[4:])
+        self.assertIsNone(paginator.get_next_link())
+
+        paginator, page = self.paginate(paginator.get_previous_link())
+        self.assertEqual(page, self.ids[2:4])
+        paginator, page = self.paginate(paginator.get_previous_link())
+        self.assertEqual(page, self.ids[:2])
+        self.assertIsNone(paginator.get_previous_link())
+
+    def test_count_on_request(self):
+        with self.assertNumQueries(1):
+            paginator, _ = self.paginate("/packages/", page_size=2)
+        self.assertIsNone(paginator.count)
+        with self.assertNumQueries(2):
+            paginator, _ = self.paginate("/packages/", page_size=2, count="true")
+        self.assertEqual(paginator.count, 5)
+
+    def test_bad_cursor(self):
+        # Not base64 JSON, no position list, a position of the wrong length or type
+        cursors = ["garbage"] + [
+            base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+            for cursor in ({"p": 1}, {"p": []}, {"p": ["x"]})
+        ]
+        for cursor in cursors:
+            with self.assertRaises(NotFound):
+                self.paginate("/packages/", cursor=cursor)
+
+
+class ContentAddressedStorageTestCase(TestCase):
+    """
+    Uploads stored once per content, with reference counting
+    """
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings = override_settings(MEDIA_ROOT=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_identical_uploads_are_stored_once(self):
+        first = Package.objects.create(
+            title="a", version="1", image=ContentFile(b"logo", name="a.PNG")
+        )
+        second = Package.objects.create(
+            title="b", version="1", cover_image=ContentFile(b"logo", name="b.png")
+        )
+        name = first.image.name
+        self.assertEqual(second.cover_image.name, name)
+        self.assertRegex(name, r"^objects/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.png$")
+        self.assertEqual(StoredFile.objects.get().references, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(StoredFile.objects.get().references, 1)
+        self.assertTrue(default_storage.exists(name))
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(StoredFile.objects.exists())
+        self.assertFalse(default_storage.exists(name))
+
+    def test_replaced_upload_is_released(self):
+        package = Package.objects.create(
+            title="a", version="1", image=ContentFile(b"old", name="a.png")
+        )
+        old = package.image.name
+        package.image = ContentFile(b"new", name="a.png")
+        with self.captureOnCommitCallbacks(execute=True):
+            package.save()
+        self.assertFalse(default_storage.exists(old))
+        self.assertEqual(StoredFile.objects.get().name, package.image.name)
+
+        # Uploading the same content again keeps the file
+        package.image = ContentFile(b"new", name="b.png")
+        with self.captureOnCommitCallbacks(execute=True):
+            package.save()
+        self.assertEqual(StoredFile.objects.get().references, 1)
+        self.assertTrue(default_storage.exists(package.image.name))
+
+    def test_content_addressed_files_are_cached_forever(self):
+        name = default_storage.save("logo.png", ContentFile(b"logo"))
+        request = RequestFactory().get(f"/media/{name}")
+        response = serve_media(request, name, document_root=self.media_root)
+        self.assertEqual(response["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
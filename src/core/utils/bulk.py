@@ -0,0 +1,44 @@
+from itertools import islice
+
+from django.utils import timezone
+
+
+def chunked(rows, size):
+    """
+    Split ``rows`` into lists of ``size`` rows
+    """
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def assign_changes(instances, changes):
+    """
+    Set each dict of ``changes`` on the instance at the same position
+
+    Returns the names of the fields to save, ``auto_now`` fields included:
+    unlike ``save()``, ``bulk_update`` doesn't stamp them.
+    """
+    fields = set()
+    for instance, attrs in zip(instances, changes):
+        for name, value in attrs.items():
+            setattr(instance, name, value)
+        fields.update(attrs)
+    if instances:
+        now = timezone.now()
+        for field in instances[0]._meta.concrete_fields:
+            if getattr(field, "auto_now", False):
+                for instance in instances:
+                    setattr(instance, field.attname, now)
+                fields.add(field.name)
+    return fields
+
+
+def bulk_update(instances, changes):
+    """
+    Apply ``changes`` to ``instances`` and save them with one ``bulk_update``
+    """
+    fields = assign_changes(instances, changes)
+    if instances and fields:
+        instances[0]._meta.default_manager.bulk_update(instances, fields)
+    return instances
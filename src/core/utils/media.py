@@ -0,0 +1,49 @@
+from functools import partial
+
+from django.db import transaction
+
+
+def release_files(storage, names):
+    """
+    Drop a reference to each content-addressed file of ``names`` once the
+    current transaction is committed
+
+    Files of other storages, or stored before content addressing, are kept.
+    """
+    if not getattr(storage, "is_content_addressed", None):
+        return
+    for name in names:
+        if storage.is_content_addressed(name):
+            transaction.on_commit(partial(storage.delete, name))
+
+
+def release_instance_files(instance, fields):
+    """
+    Drop the references of a deleted instance to the files of its ``fields``
+    """
+    for field in fields:
+        file = getattr(instance, field)
+        release_files(file.storage, [file.name])
+
+
+def release_replaced_files(instance, fields):
+    """
+    Drop the references to the files an instance about to be saved replaces
+    with new uploads
+
+    Only saves uploading a file over a stored one look up the previous name,
+    with one query.
+    """
+    uploaded = [
+        field
+        for field in fields
+        if getattr(instance, field) and not getattr(instance, field)._committed
+    ]
+    if not uploaded or instance._state.adding or instance.pk is None:
+        return
+    previous = (
+        type(instance)._base_manager.filter(pk=instance.pk).values(*uploaded).first()
+    )
+    for field in uploaded:
+        if previous and previous[field]:
+            release_files(getattr(instance, field).storage, [previous[field]])
@@ -0,0 +1,129 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from src.core.models import OutboundEmail, OutboundEmailStatus
+
+DUE_STATUSES = (OutboundEmailStatus.PENDING, OutboundEmailStatus.SENDING)
+
+
+def get_setting(name, default):
+    """
+    Outbox setting (``OUTBOX_<name>``)
+    """
+    return getattr(settings, f"OUTBOX_{name}", default)
+
+
+def enqueue_email(subject, body, to, from_email=None, html_body=""):
+    """
+    Queue an email for the ``drain_outbox`` worker
+    """
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body or "",
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+    )
+
+
+def get_retry_delay(attempts):
+    """
+    Exponential backoff before the next attempt
+    """
+    delay = get_setting("RETRY_DELAY", 60) * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, get_setting("MAX_RETRY_DELAY", 3600)))
+
+
+def claim_batch(batch_size):
+    """
+    Lease due emails to this worker
+
+    Claimed emails are marked ``sending`` until their lease expires, so a
+    worker dying mid-batch only delays them. On databases supporting it, rows
+    locked by another worker are skipped.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = OutboundEmail.objects.filter(
+            status__in=DUE_STATUSES, next_attempt_at__lte=now
+        ).order_by("next_attempt_at", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        emails = list(queryset[:batch_size])
+        OutboundEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            status=OutboundEmailStatus.SENDING,
+            next_attempt_at=now + timedelta(seconds=get_setting("LEASE", 300)),
+        )
+    return emails
+
+
+def build_message(email, mail_connection):
+    """
+    Email message of a queued email
+    """
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or None,
+        to=email.to,
+        connection=mail_connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def deliver(emails, mail_connection):
+    """
+    Send ``emails`` over an open connection and record the outcome of each
+
+    Returns the number of emails sent.
+    """
+    max_attempts = get_setting("MAX_ATTEMPTS", 5)
+    sent = 0
+    for email in emails:
+        email.attempts += 1
+        try:
+            build_message(email, mail_connection).send()
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            # Reconnect for the next email in case the connection broke.
+            mail_connection.close()
+            email.last_error = f"{exc.__class__.__name__}: {exc}"
+            if email.attempts >= max_attempts:
+                email.status = OutboundEmailStatus.FAILED
+            else:
+                email.status = OutboundEmailStatus.PENDING
+                email.next_attempt_at = timezone.now() + get_retry_delay(email.attempts)
+        else:
+            email.status = OutboundEmailStatus.SENT
+            email.sent_on = timezone.now()
+            email.last_error = ""
+            sent += 1
+    OutboundEmail.objects.bulk_update(
+        emails, ["status", "attempts", "last_error", "next_attempt_at", "sent_on"]
+    )
+    return sent
+
+
+def drain(batch_size=100, max_batches=None, mail_connection=None):
+    """
+    Deliver due emails batch by batch over one reused connection until none
+    is left (or ``max_batches`` were processed)
+
+    Returns the numbers of emails sent and attempted.
+    """
+    mail_connection = mail_connection or get_connection()
+    sent = attempted = batches = 0
+    with mail_connection:
+        while max_batches is None or batches < max_batches:
+            emails = claim_batch(batch_size)
+            if not emails:
+                break
+            sent += deliver(emails, mail_connection)
+            attempted += len(emails)
+            batches += 1
+    return sent, attempted
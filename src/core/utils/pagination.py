@@ -1,5 +1,17 @@
+import base64
+import contextlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F, Q
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class CustomPagination(pagination.PageNumberPagination):
@@ -20,3 +32,229 @@ class CustomPagination(pagination.PageNumberPagination):
                 "results": data,
             }
         )
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Keyset (cursor) Pagination
+
+    Pages are addressed by an opaque cursor holding the ordering values of the
+    last (or first) row of the previous page, so every page is fetched with an
+    indexed range query instead of an OFFSET scan. The ordering is taken from
+    the first filter backend of the view providing one (search relevance, an
+    ordering filter), else ``view.ordering``; a primary key tie-breaker is
+    always appended.
+
+    ``count`` is only computed when the client asks for it with ``?count=true``.
+    """
+
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-pk",)
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.nullable = self.get_nullable(queryset)
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ("1", "true"):
+            self.count = queryset.count()
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor["r"])
+
+        queryset = queryset.order_by(*self.get_order_by(reverse))
+        try:
+            if cursor is not None:
+                keyset = self.get_keyset_filter(cursor["p"], reverse)
+                queryset = queryset.filter(keyset)
+            results = list(queryset[: self.page_size + 1])
+        except (DjangoValidationError, TypeError, ValueError) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = cursor is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return self.page
+
+    def get_page_size(self, request):
+        """
+        Page size, optionally overridden with ``?page_size=``
+        """
+        if self.page_size_query_param:
+            with contextlib.suppress(KeyError, ValueError):
+                page_size = int(request.query_params[self.page_size_query_param])
+                if page_size > 0:
+                    return min(page_size, self.max_page_size)
+        return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Ordering fields with a trailing primary key tie-breaker
+        """
+        ordering = getattr(view, "ordering", None) or self.ordering
+        for backend in getattr(view, "filter_backends", ()):
+            if hasattr(backend, "get_ordering"):
+                backend_ordering = backend().get_ordering(request, queryset, view)
+                if backend_ordering:
+                    ordering = backend_ordering
+                    break
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        ordering = tuple(ordering)
+
+        pk_name = queryset.model._meta.pk.name
+        ordering = tuple(
+            field.replace("pk", pk_name) if field.lstrip("-") == "pk" else field
+            for field in ordering
+        )
+        if not any(field.lstrip("-") == pk_name for field in ordering):
+            descending = ordering[-1].startswith("-") if ordering else True
+            ordering += (f"-{pk_name}" if descending else pk_name,)
+        return ordering
+
+    def get_nullable(self, queryset):
+        """
+        Ordering fields that may hold NULLs
+        """
+        nullable = set()
+        for field in self.ordering:
+            name = field.lstrip("-")
+            with contextlib.suppress(FieldDoesNotExist):
+                if queryset.model._meta.get_field(name).null:
+                    nullable.add(name)
+        return nullable
+
+    def get_order_by(self, reverse=False):
+        """
+        Ordering expressions; NULLs are sorted last (first when walking
+        backwards), non nullable fields keep a plain ordering so they match
+        their indexes.
+        """
+        order_by = []
+        for field in self.ordering:
+            descending = field.startswith("-") != reverse
+            name = field.lstrip("-")
+            nulls = {}
+            if name in self.nullable:
+                nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+            if descending:
+                order_by.append(F(name).desc(**nulls))
+            else:
+                order_by.append(F(name).asc(**nulls))
+        return order_by
+
+    def get_keyset_filter(self, position, reverse=False):
+        """
+        Rows strictly after ``position`` in the (possibly reversed) ordering
+
+        ``(a, b) > (x, y)`` is expanded to ``a >= x AND (a > x OR (a = x AND
+        b > y))`` so the leading field bounds an index range scan.
+        """
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        keyset = Q(pk__in=[])
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") != reverse else "gt"
+            if value is None:
+                # NULLs are last going forward and first going backward.
+                after = Q(**{f"{name}__isnull": False}) if reverse else Q(pk__in=[])
+                same = Q(**{f"{name}__isnull": True})
+            else:
+                after = Q(**{f"{name}__{lookup}": value})
+                if name in self.nullable and not reverse:
+                    after |= Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+            keyset |= equal & after
+            equal &= same
+
+        name, value = self.ordering[0].lstrip("-"), position[0]
+        if value is not None and name not in self.nullable:
+            lookup = "lte" if self.ordering[0].startswith("-") != reverse else "gte"
+            keyset &= Q(**{f"{name}__{lookup}": value})
+        return keyset
+
+    def get_position(self, instance):
+        """
+        Ordering values of a row (model instance or ``values()`` dict)
+        """
+        position = []
+        for field in self.ordering:
+            name = field.lstrip("-")
+            value = (
+                instance[name]
+                if isinstance(instance, dict)
+                else getattr(instance, name)
+            )
+            if isinstance(value, (datetime, date)):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = str(value)
+            position.append(value)
+        return position
+
+    def encode_cursor(self, position, reverse):
+        """
+        Opaque cursor url for the given position
+        """
+        payload = json.dumps({"p": position, "r": int(reverse)}, separators=(",", ":"))
+        encoded = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        """
+        Decode the ``cursor`` query param
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if not isinstance(cursor["p"], list):
+                raise TypeError
+            cursor["r"] = bool(cursor.get("r"))
+        except (TypeError, ValueError, KeyError) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+        return cursor
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "pagination": {
+                    "next": self.get_next_link(),
+                    "previous": self.get_previous_link(),
+                    "count": self.count,
+                    "page_size": self.page_size,
+                },
+                "results": data,
+            }
+        )
@@ -0,0 +1,406 @@
+import hashlib
+import io
+import posixpath
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import JSONObject
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from src.core.models import ImageRendition, ImageRenditionStatus
+from src.core.utils.media import release_files
+from src.core.utils.response_cache import invalidate_responses
+
+DUE_STATUSES = (ImageRenditionStatus.PENDING, ImageRenditionStatus.RENDERING)
+DEFAULT_SPECS = {
+    "thumbnail": {"size": (160, 160), "crop": True},
+    "small": {"size": (480, 480)},
+    "large": {"size": (1280, 1280)},
+}
+PIL_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+# Sources which will never render, retrying them is pointless
+INVALID_IMAGE_ERRORS = (UnidentifiedImageError, Image.DecompressionBombError)
+
+
+def get_setting(name, default):
+    """
+    Rendition setting (``IMAGE_RENDITION_<name>``)
+    """
+    return getattr(settings, f"IMAGE_RENDITION_{name}", default)
+
+
+def get_specs():
+    """
+    Rendition sizes by name (``IMAGE_RENDITIONS``)
+    """
+    return getattr(settings, "IMAGE_RENDITIONS", DEFAULT_SPECS)
+
+
+def get_column(field):
+    """
+    Column holding the renditions of the image ``field``
+    """
+    return f"{field}_renditions"
+
+
+def get_rendition_names(renditions):
+    """
+    Storage names of the files of a renditions column value
+    """
+    files = (renditions or {}).get("files") or {}
+    return [name for names in files.values() for name in names.values()]
+
+
+def release_renditions(instance, fields, renditions=None):
+    """
+    Drop the references to the rendition files of the image ``fields``
+    (read from ``renditions`` by column when given, from ``instance``
+    otherwise)
+    """
+    for field in fields:
+        column = get_column(field)
+        value = (renditions or {}).get(column, getattr(instance, column, None))
+        storage = instance._meta.get_field(field).storage
+        release_files(storage, get_rendition_names(value))
+
+
+def queue_renditions(instance, fields, update_fields=None):
+    """
+    Queue the renditions of the image ``fields`` of a saved instance
+
+    Fields whose image changed (or whose renditions are still missing) get a
+    job, and their renditions column is reset to the new source with no
+    files, so the previous image's renditions are never served for it (and
+    are released). Saves leaving the images as rendered run no query.
+    """
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields]
+    queued, changes = [], {}
+    for field in fields:
+        name = getattr(instance, field).name or ""
+        column = get_column(field)
+        renditions = getattr(instance, column) or {}
+        if not name:
+            if renditions:
+                changes[column] = {}
+            continue
+        if renditions.get("source") != name:
+            changes[column] = {"source": name, "files": {}}
+        elif renditions.get("files"):
+            continue
+        queued.append((field, name))
+
+    if changes:
+        queryset = type(instance)._base_manager.filter(pk=instance.pk)
+        stale = [column for column in changes if getattr(instance, column)]
+        if stale:
+            # Renditions of the previous images, as stored
+            release_renditions(
+                instance,
+                [column.removesuffix("_renditions") for column in stale],
+                queryset.values(*stale).first(),
+            )
+        for column, value in changes.items():
+            setattr(instance, column, value)
+        queryset.update(**changes)
+    if queued:
+        content_type = ContentType.objects.get_for_model(instance)
+        ImageRendition.objects.bulk_create(
+            [
+                ImageRendition(
+                    content_type=content_type,
+                    object_id=instance.pk,
+                    field=field,
+                    source=name,
+                )
+                for field, name in queued
+            ],
+            update_conflicts=True,
+            unique_fields=("content_type", "object_id", "field"),
+            update_fields=(
+                "source",
+                "status",
+                "attempts",
+                "last_error",
+                "next_attempt_at",
+            ),
+        )
+    return len(queued)
+
+
+def queue_existing_images(apps, app_label, model_name, fields):
+    """
+    Queue the renditions of the images stored before renditions existed, with
+    the historical models of a data migration
+    """
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Rendition = apps.get_model("core", "ImageRendition")
+    Model = apps.get_model(app_label, model_name)
+    content_type, _ = ContentType.objects.get_or_create(
+        app_label=app_label, model=model_name
+    )
+    for field in fields:
+        rows = Model._base_manager.exclude(**{field: ""}).exclude(**{field: None})
+        Rendition.objects.bulk_create(
+            (
+                Rendition(
+                    content_type_id=content_type.pk,
+                    object_id=pk,
+                    field=field,
+                    source=name,
+                )
+                for pk, name in rows.values_list("pk", field).iterator()
+            ),
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        rows.update(
+            **{get_column(field): JSONObject(source=F(field), files=JSONObject())}
+        )
+
+
+def get_retry_delay(attempts):
+    """
+    Exponential backoff before the next attempt
+    """
+    delay = get_setting("RETRY_DELAY", 60) * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, get_setting("MAX_RETRY_DELAY", 3600)))
+
+
+def claim_batch(batch_size):
+    """
+    Lease due jobs to this worker
+
+    Claimed jobs are marked ``rendering`` until their lease expires, so a
+    worker dying mid-batch only delays them. On databases supporting it, rows
+    locked by another worker are skipped.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = ImageRendition.objects.filter(
+            status__in=DUE_STATUSES, next_attempt_at__lte=now
+        ).order_by("next_attempt_at", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        jobs = list(queryset[:batch_size])
+        ImageRendition.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=ImageRenditionStatus.RENDERING,
+            next_attempt_at=now + timedelta(seconds=get_setting("LEASE", 300)),
+        )
+    return jobs
+
+
+def get_current_sources(jobs):
+    """
+    Current image of the field of each job, one query per model and field
+    """
+    ids = {}
+    for job in jobs:
+        ids.setdefault((job.content_type_id, job.field), set()).add(job.object_id)
+    sources = {}
+    for (content_type_id, field), object_ids in ids.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        for pk, name in model._base_manager.filter(pk__in=object_ids).values_list(
+            "pk", field
+        ):
+            sources[(content_type_id, field, pk)] = name
+    return sources
+
+
+def get_rendition_name(source, digest, spec, image_format):
+    """
+    Storage name of a rendition, next to its source
+
+    Named after the hash of the source's content and of the rendition's
+    parameters: identical uploads share their renditions, and a name is
+    never reused for other pixels, so rendition urls can be cached forever.
+    (The content-addressed storage names the file after its own content.)
+    """
+    directory = posixpath.dirname(source)
+    return posixpath.join(directory, "renditions", f"{digest}-{spec}.{image_format}")
+
+
+def open_image(data, specs):
+    """
+    Decoded source image, upright, in ``RGB`` or ``RGBA``
+
+    JPEG sources are decoded at the smallest scale still covering the largest
+    rendition, which is much faster than decoding them full-size.
+    """
+    image = Image.open(io.BytesIO(data))
+    largest = max(max(spec["size"]) for spec in specs.values())
+    image.draft("RGB", (largest, largest))
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    mode = "RGBA" if has_alpha else "RGB"
+    return image if image.mode == mode else image.convert(mode)
+
+
+def render(image, spec, image_format, quality):
+    """
+    Encoded rendition of ``image``: cropped to ``size`` with ``crop``,
+    fitted within it otherwise (never enlarged)
+    """
+    size = tuple(spec["size"])
+    if spec.get("crop"):
+        image = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+    else:
+        image = image.copy()
+        image.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    options = {"quality": quality}
+    if image_format == "jpeg":
+        if image.mode == "RGBA":
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        options.update(optimize=True, progressive=True)
+    buffer = io.BytesIO()
+    image.save(buffer, PIL_FORMATS[image_format], **options)
+    return buffer.getvalue()
+
+
+def render_source(source, storage):
+    """
+    Store the renditions of the ``source`` image
+
+    Renditions already in storage under their name (same content, same
+    parameters) aren't rendered again; the content-addressed storage names
+    them after their own content instead, and stores each one once. Returns
+    their names by spec and format. Files stored before a failure are
+    released.
+    """
+    specs = get_specs()
+    image_formats = get_setting("FORMATS", ("webp", "jpeg"))
+    quality = get_setting("QUALITY", 80)
+    with storage.open(source, "rb") as stream:
+        data = stream.read()
+    content = hashlib.sha256(data)
+    image = None
+    files = {}
+    saved = []
+    try:
+        for spec_name, spec in specs.items():
+            files[spec_name] = {}
+            for image_format in image_formats:
+                digest = content.copy()
+                parameters = (tuple(spec["size"]), bool(spec.get("crop")), quality)
+                digest.update(repr((*parameters, image_format)).encode())
+                name = get_rendition_name(
+                    source, digest.hexdigest()[:32], spec_name, image_format
+                )
+                if not storage.exists(name):
+                    if image is None:
+                        image = open_image(data, specs)
+                    rendition = render(image, spec, image_format, quality)
+                    name = storage.save(name, ContentFile(rendition))
+                    saved.append(name)
+                files[spec_name][image_format] = name
+    except Exception:
+        release_files(storage, saved)
+        raise
+    return files
+
+
+def save_renditions(model, job, files):
+    """
+    Record the renditions of a job, unless its image changed meanwhile
+
+    The renditions the column held before (an earlier rendering of the same
+    image) are released, and so are the new ones when they can't be recorded.
+    """
+    column = get_column(job.field)
+    storage = model._meta.get_field(job.field).storage
+    changes = {column: {"source": job.source, "files": files}}
+    now = timezone.now()
+    for field in model._meta.concrete_fields:
+        if getattr(field, "auto_now", False):
+            changes[field.attname] = now
+    queryset = model._base_manager.filter(pk=job.object_id, **{job.field: job.source})
+    with transaction.atomic():
+        previous = queryset.values_list(column, flat=True).first()
+        updated = queryset.update(**changes)
+        if updated:
+            release_files(storage, get_rendition_names(previous))
+        else:
+            release_files(storage, get_rendition_names(changes[column]))
+    if updated:
+        invalidate_responses(model, [job.object_id])
+    return updated
+
+
+def record_outcome(job):
+    """
+    Save the outcome of a job, unless a save queued another image meanwhile
+    """
+    ImageRendition.objects.filter(pk=job.pk, source=job.source).update(
+        status=job.status,
+        attempts=job.attempts,
+        last_error=job.last_error,
+        next_attempt_at=job.next_attempt_at,
+        rendered_on=job.rendered_on,
+    )
+
+
+def process(jobs):
+    """
+    Render claimed jobs and record the outcome of each
+
+    Jobs whose image was replaced or deleted since they were queued are
+    skipped. Returns the number of jobs rendered.
+    """
+    max_attempts = get_setting("MAX_ATTEMPTS", 5)
+    sources = get_current_sources(jobs)
+    rendered = 0
+    for job in jobs:
+        job.attempts += 1
+        model = ContentType.objects.get_for_id(job.content_type_id).model_class()
+        if sources.get((job.content_type_id, job.field, job.object_id)) != job.source:
+            job.status = ImageRenditionStatus.SKIPPED
+            record_outcome(job)
+            continue
+        try:
+            storage = model._meta.get_field(job.field).storage
+            files = render_source(job.source, storage)
+        except INVALID_IMAGE_ERRORS as exc:
+            job.status = ImageRenditionStatus.FAILED
+            job.last_error = f"{exc.__class__.__name__}: {exc}"
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            job.last_error = f"{exc.__class__.__name__}: {exc}"
+            if job.attempts >= max_attempts:
+                job.status = ImageRenditionStatus.FAILED
+            else:
+                job.status = ImageRenditionStatus.PENDING
+                job.next_attempt_at = timezone.now() + get_retry_delay(job.attempts)
+        else:
+            if save_renditions(model, job, files):
+                job.status = ImageRenditionStatus.DONE
+                rendered += 1
+            else:
+                job.status = ImageRenditionStatus.SKIPPED
+            job.rendered_on = timezone.now()
+            job.last_error = ""
+        record_outcome(job)
+    return rendered
+
+
+def drain(batch_size=20, max_batches=None):
+    """
+    Render due jobs batch by batch until none is left (or ``max_batches``
+    were processed)
+
+    Returns the numbers of jobs rendered and attempted.
+    """
+    rendered = attempted = batches = 0
+    while max_batches is None or batches < max_batches:
+        jobs = claim_batch(batch_size)
+        if not jobs:
+            break
+        rendered += process(jobs)
+        attempted += len(jobs)
+        batches += 1
+    return rendered, attempted
@@ -0,0 +1,76 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+
+VERSION_KEY = "version:{}"
+RESPONSE_KEY = "response:{}:{}:{}"
+
+
+def get_namespace(model):
+    """
+    Cache namespace of the responses of ``model``
+    """
+    return model._meta.label_lower
+
+
+def get_versions(*names):
+    """
+    Current versions of the ``names`` version keys
+
+    A missing (never set or evicted) version starts from the current time so
+    it can't collide with the versions of entries cached before it was lost.
+    """
+    keys = [VERSION_KEY.format(name) for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*names):
+    """
+    Invalidate every entry cached under the ``names`` version keys
+    """
+    for name in names:
+        key = VERSION_KEY.format(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_response_key(namespace, versions, uri):
+    """
+    Cache key of the response to ``uri`` under the given ``versions``
+    """
+    digest = hashlib.md5(uri.encode(), usedforsecurity=False).hexdigest()
+    return RESPONSE_KEY.format(namespace, ".".join(map(str, versions)), digest)
+
+
+def get_list_versions(namespace):
+    """
+    Version keys of the list responses of ``namespace``
+    """
+    return get_versions(namespace, f"{namespace}:list")
+
+
+def get_object_versions(namespace, pk):
+    """
+    Version keys of the detail response of one object of ``namespace``
+    """
+    return get_versions(namespace, f"{namespace}:{pk}")
+
+
+def invalidate_responses(model, pks=None):
+    """
+    Drop the cached lists of ``model`` and the details of the objects ``pks``
+    (every object by default)
+    """
+    namespace = get_namespace(model)
+    if pks is None:
+        bump_versions(namespace)
+        return
+    bump_versions(f"{namespace}:list", *(f"{namespace}:{pk}" for pk in pks))
@@ -0,0 +1,142 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+# Rows fetched per round trip (server-side cursor on PostgreSQL)
+CHUNK_SIZE = 2000
+# Bytes (roughly) handed to the server per write
+BUFFER_SIZE = 64 * 1024
+
+OUTPUT_FORMATS = {
+    "json": ("application/json", "json"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+class Echo:
+    """
+    File-like object returning what is written, for ``csv.writer``
+    """
+
+    def write(self, value):
+        return value
+
+
+def stream_json(rows):
+    """
+    JSON array of ``rows``, one row per chunk
+    """
+    separator = "["
+    for row in rows:
+        yield f"{separator}{encoder.encode(row)}"
+        separator = ",\n"
+    yield "[]" if separator == "[" else "]"
+
+
+def stream_ndjson(rows):
+    """
+    One JSON document per line
+    """
+    for row in rows:
+        yield f"{encoder.encode(row)}\n"
+
+
+def flatten(row, prefix=""):
+    """
+    Flat dict of a row, nested dicts becoming ``parent.child`` columns
+    """
+    flat = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (list, tuple)):
+            flat[f"{prefix}{key}"] = encoder.encode(value)
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def get_serializer_fields(serializer, prefix=""):
+    """
+    Flat column names of the output of ``serializer``
+    """
+    fields = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.Serializer):
+            fields.extend(get_serializer_fields(field, f"{prefix}{name}."))
+        else:
+            fields.append(f"{prefix}{name}")
+    return fields
+
+
+def stream_csv(rows, fields=None):
+    """
+    CSV of ``rows`` with a header line
+
+    Columns are ``fields``, or those of the first row when not given.
+    """
+    writer = None
+    for row in rows:
+        row = flatten(row)
+        if writer is None:
+            writer = csv.DictWriter(
+                Echo(), fieldnames=fields or list(row), extrasaction="ignore"
+            )
+            yield writer.writeheader()
+        yield writer.writerow(row)
+    if writer is None and fields:
+        yield csv.DictWriter(Echo(), fieldnames=fields).writeheader()
+
+
+def buffered(content, size=BUFFER_SIZE):
+    """
+    Join the small strings of ``content`` into chunks of about ``size``
+    """
+    parts, length = [], 0
+    for part in content:
+        parts.append(part)
+        length += len(part)
+        if length >= size:
+            yield "".join(parts)
+            parts, length = [], 0
+    if parts:
+        yield "".join(parts)
+
+
+def get_output_format(request, default="json"):
+    """
+    Output format asked with ``?output=``
+    """
+    output = request.query_params.get("output", default)
+    if output not in OUTPUT_FORMATS:
+        raise ValidationError({"output": f"Choose one of {', '.join(OUTPUT_FORMATS)}."})
+    return output
+
+
+def streaming_response(rows, output, filename=None, fields=None):
+    """
+    Response streaming ``rows`` (dicts) as ``output``, without holding them in memory
+    """
+    content_type, extension = OUTPUT_FORMATS[output]
+    if output == "csv":
+        content = stream_csv(rows, fields)
+    elif output == "ndjson":
+        content = stream_ndjson(rows)
+    else:
+        content = stream_json(rows)
+    response = StreamingHttpResponse(
+        buffered(content), content_type=f"{content_type}; charset=utf-8"
+    )
+    if filename:
+        response["Content-Disposition"] = (
+            f'attachment; filename="{filename}.{extension}"'
+        )
+    return response
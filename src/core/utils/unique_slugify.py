@@ -1,7 +1,14 @@
 import re
+from collections import Counter
 
+from django.db import IntegrityError, transaction
 from django.template.defaultfilters import slugify
 
+# Longest suffix (separator and counter) the slug of a single query accounts for
+MAX_SUFFIX_LENGTH = 8
+# Saves attempted when concurrent inserts keep taking the generated value
+MAX_SAVE_ATTEMPTS = 3
+
 
 def unique_slugify(
     instance, value, slug_field_name="slug", queryset=None, slug_separator="-"
@@ -14,19 +21,11 @@ def unique_slugify(
 
     ``queryset`` usually doesn't need to be explicitly provided - it'll default
     to using the ``.all()`` queryset from the model's default manager.
+
+    The slugs already taken are fetched with one query whatever their number.
     """
     slug_field = instance._meta.get_field(slug_field_name)
 
-    slug = getattr(instance, slug_field.attname)
-    slug_len = slug_field.max_length
-
-    # Sort out the initial slug, limiting its length if necessary.
-    slug = slugify(value)
-    if slug_len:
-        slug = slug[:slug_len]
-    slug = _slug_strip(slug, slug_separator)
-    original_slug = slug
-
     # Create the queryset if one wasn't explicitly provided and exclude the
     # current instance from the queryset.
     if queryset is None:
@@ -34,10 +33,72 @@ def unique_slugify(
     if instance.pk:
         queryset = queryset.exclude(pk=instance.pk)
 
+    slug = get_unique_slugs(
+        queryset, [value], slug_field_name, slug_field.max_length, slug_separator
+    )[0]
+    setattr(instance, slug_field.attname, slug)
+
+
+def get_unique_slugs(
+    queryset, values, slug_field_name="slug", slug_len=None, slug_separator="-"
+):
+    """
+    Unique slugs of ``values``, unique among themselves too
+
+    Slugs of ``queryset`` are fetched with one query per distinct slug stem:
+    taken ``foo`` and ``foo-2`` give ``foo-3``. With several stems, the slugs
+    themselves are looked up first with one query, and suffixes only for the
+    stems whose slug is taken or repeated.
+    """
+    bases = []
+    for value in values:
+        slug = slugify(value or "")
+        if slug_len:
+            slug = slug[:slug_len]
+        slug = _slug_strip(slug, slug_separator)
+        stem = slug or slug_separator
+        if slug_len and len(slug) + MAX_SUFFIX_LENGTH > slug_len:
+            stem = slug[: slug_len - MAX_SUFFIX_LENGTH]
+        bases.append((slug, stem))
+
+    taken = set()
+    stems = {stem for _, stem in bases}
+    if len(stems) > 1:
+        taken.update(
+            queryset.filter(**{f"{slug_field_name}__in": {slug for slug, _ in bases}})
+            .order_by()
+            .values_list(slug_field_name, flat=True)
+        )
+        counts = Counter(slug for slug, _ in bases)
+        stems = {
+            stem
+            for slug, stem in bases
+            if not slug or slug in taken or counts[slug] > 1
+        }
+    for stem in stems:
+        taken.update(
+            queryset.filter(**{f"{slug_field_name}__startswith": stem})
+            .order_by()
+            .values_list(slug_field_name, flat=True)
+        )
+
+    slugs = []
+    for slug, _ in bases:
+        slug = _get_free_slug(slug, taken, slug_len, slug_separator)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def _get_free_slug(original_slug, taken, slug_len, slug_separator):
+    """
+    First of ``original_slug``, ``original_slug-2``, ``-3``, ... not in ``taken``
+    """
+    slug = original_slug
     # Find a unique slug. If one matches, at '-2' to the end and try again
     # (then '-3', etc).
     next = 2
-    while not slug or queryset.filter(**{slug_field_name: slug}):
+    while not slug or slug in taken:
         slug = original_slug
         end = "%s%s" % (slug_separator, next)
         if slug_len and len(slug) + len(end) > slug_len:
@@ -45,8 +106,44 @@ def unique_slugify(
             slug = _slug_strip(slug, slug_separator)
         slug = "%s%s" % (slug, end)
         next += 1
+    return slug
 
-    setattr(instance, slug_field.attname, slug)
+
+def generate_unique_values(generate, queryset, field_name, count=1, taken=None):
+    """
+    ``count`` values of ``generate()`` missing from ``queryset`` and ``taken``
+
+    Candidates are checked with one query per round instead of one per value;
+    with random values a single round is all but certain.
+    """
+    taken = set() if taken is None else taken
+    values = []
+    while len(values) < count:
+        candidates = {generate() for _ in range(count - len(values))} - taken
+        candidates -= set(
+            queryset.filter(**{f"{field_name}__in": candidates})
+            .order_by()
+            .values_list(field_name, flat=True)
+        )
+        values.extend(candidates)
+        taken |= candidates
+    return values
+
+
+def save_unique(save, generate, attempts=MAX_SAVE_ATTEMPTS):
+    """
+    Call ``generate()`` then ``save()``, generating again when a concurrent
+    insert took the generated value first (``IntegrityError``)
+    """
+    for attempt in range(attempts):
+        generate()
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            if attempt == attempts - 1:
+                raise
+    return None
 
 
 def _slug_strip(value, separator="-"):
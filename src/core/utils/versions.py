@@ -0,0 +1,55 @@
+from packaging.version import InvalidVersion, Version
+
+# Digits of every number of a version key
+KEY_DIGITS = 9
+KEY_MAX_LENGTH = 255
+PRE_RELEASE_PHASES = {"a": "1", "b": "2", "rc": "3"}
+
+
+def _number(value):
+    if value >= 10**KEY_DIGITS:
+        raise ValueError(value)
+    return str(value).zfill(KEY_DIGITS)
+
+
+def get_version_key(version):
+    """
+    String sorting like the PEP 440 ``version`` (``packaging.version``), for
+    indexed ordering and range lookups
+
+    Only digits are used, at fixed positions, so any collation sorts keys the
+    same way. Release numbers (trailing zeros dropped) are each prefixed with
+    ``1`` and followed by ``0``, so ``1.2`` sorts before ``1.2.1``; then come
+    the pre-release, post-release and development parts. Local labels
+    (``+ubuntu1``) are ignored.
+
+    Versions which can't be parsed, or with numbers of more than
+    ``KEY_DIGITS`` digits, give ``""`` and sort first.
+    """
+    try:
+        parsed = Version(str(version))
+    except InvalidVersion:
+        return ""
+
+    release = list(parsed.release)
+    while release and release[-1] == 0:
+        release.pop()
+    zero = _number(0)
+    try:
+        parts = [_number(parsed.epoch)]
+        parts.extend(f"1{_number(number)}" for number in release)
+        parts.append("0")
+        if parsed.pre is not None:
+            parts.append(PRE_RELEASE_PHASES[parsed.pre[0]] + _number(parsed.pre[1]))
+        elif parsed.post is None and parsed.dev is not None:
+            # 1.0.dev1 comes before 1.0a1
+            parts.append(f"0{zero}")
+        else:
+            parts.append(f"4{zero}")
+        parts.append(f"0{zero}" if parsed.post is None else f"1{_number(parsed.post)}")
+        parts.append(f"1{zero}" if parsed.dev is None else f"0{_number(parsed.dev)}")
+    except ValueError:
+        return ""
+
+    key = "".join(parts)
+    return key if len(key) <= KEY_MAX_LENGTH else ""
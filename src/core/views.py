@@ -1,3 +1,16 @@
-from django.shortcuts import render
+from django.core.files.storage import default_storage
+from django.views.static import serve
 
-# Create your views here.
+from src.core.storage import IMMUTABLE_CACHE_CONTROL
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """
+    ``django.views.static.serve`` with far-future cache headers on
+    content-addressed files, whose names never change meaning
+    """
+    response = serve(request, path, document_root, show_indexes)
+    is_content_addressed = getattr(default_storage, "is_content_addressed", None)
+    if is_content_addressed is not None and is_content_addressed(path):
+        response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
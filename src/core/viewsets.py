@@ -1,18 +1,30 @@
 from rest_framework import mixins
 from rest_framework.viewsets import GenericViewSet
 
-from src.core.mixins import ZenListModelMixin
+from src.core.mixins import (
+    QueryPlanMixin,
+    SparseFieldsMixin,
+    ZenCreateModelMixin,
+    ZenListModelMixin,
+)
 
 
 class ZenModelViewSet(
+    ZenCreateModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
     mixins.DestroyModelMixin,
     ZenListModelMixin,
+    SparseFieldsMixin,
+    QueryPlanMixin,
     GenericViewSet,
 ):
     """
     A viewset that provides default `create()`, `retrieve()`, `update()`,
     `partial_update()`, `destroy()` and `list()` actions.
+
+    Relation hints declared on the serializer's ``Meta`` (``select_related``,
+    ``prefetch_related``) are applied to the queryset, and reads accept sparse
+    fieldsets (``?fields=`` / ``?exclude=``).
     """
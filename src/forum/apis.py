@@ -1,11 +1,22 @@
-from rest_framework import viewsets
-from rest_framework.filters import SearchFilter
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.response import Response
 
+from src.core.mixins import BulkModelMixin, ConditionalRequestMixin, ExportMixin
+from src.core.utils.pagination import KeysetPagination
+from src.core.viewsets import ZenModelViewSet
+from src.user.authentication import StatelessJWTAuthentication
+
+from .search import FullTextSearchFilter
+from .services import bulk_service, thread_service
 from .serializers import PostSerializer, CommentSerializer
 from .models import Post, Comment
 
 
-class PostAPISet(viewsets.ModelViewSet):
+class PostAPISet(BulkModelMixin, ExportMixin, ConditionalRequestMixin, ZenModelViewSet):
     """
     Model View Set for Post
     """
@@ -13,13 +24,27 @@ class PostAPISet(viewsets.ModelViewSet):
     serializer_class = PostSerializer
     queryset = Post.objects.all()
     permission_classes = []
+    authentication_classes = (StatelessJWTAuthentication, SessionAuthentication)
     lookup_field = "pk"
     http_method_names = ("get", "post", "patch", "delete")
-    filter_backends = (SearchFilter,)
-    search_fields = ("title",)
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter, OrderingFilter)
+    filterset_fields = ("package", "is_published", "author")
+    search_fields = ("title", "content")
+    ordering_fields = ("created_at", "comment_count", "last_commented_at")
+    pagination_class = KeysetPagination
+    compiled_list = True
+    ordering = ("-created_at", "-id")
+    conditional_fields = ("updated_at", "last_commented_at")
+    conditional_counters = ("comment_count",)
+    export_exclude = ("search_vector",)
+
+    def perform_bulk_destroy(self, instances):
+        bulk_service.delete(Post.objects.filter(pk__in=[post.pk for post in instances]))
 
 
-class CommentAPISet(viewsets.ModelViewSet):
+class CommentAPISet(
+    BulkModelMixin, ExportMixin, ConditionalRequestMixin, ZenModelViewSet
+):
     """
     Model View Set for Comment
     """
@@ -27,7 +52,72 @@ class CommentAPISet(viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     queryset = Comment.objects.all()
     permission_classes = []
+    authentication_classes = (StatelessJWTAuthentication, SessionAuthentication)
     lookup_field = "pk"
     http_method_names = ("get", "post", "patch", "delete")
-    filter_backends = (SearchFilter,)
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter)
+    filterset_fields = ("post", "author")
     search_fields = ("content",)
+    pagination_class = KeysetPagination
+    compiled_list = True
+    ordering = ("-created_at", "-id")
+    export_exclude = ("search_vector",)
+
+    def perform_bulk_destroy(self, instances):
+        bulk_service.delete(
+            Comment.objects.filter(pk__in=[comment.pk for comment in instances])
+        )
+
+    def get_depth(self):
+        """
+        Number of reply levels requested with ``?depth=`` (all by default)
+        """
+        depth = self.request.query_params.get("depth")
+        if depth is None:
+            return None
+        try:
+            depth = int(depth)
+        except ValueError:
+            raise ValidationError({"depth": "A valid integer is required."})
+        if depth < 0:
+            raise ValidationError(
+                {"depth": "Ensure this value is greater than or equal to 0."}
+            )
+        return depth
+
+    def get_tree(self, comments):
+        """
+        ``comments`` nested with their replies
+        """
+        comments = list(comments)
+        replies = list(thread_service.get_descendants(comments, self.get_depth()))
+        rows = comments + replies
+        data = self.get_serializer(rows, many=True).data
+        return thread_service.build_tree(rows, data)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        filter_backends=(DjangoFilterBackend,),
+        filterset_fields=("post",),
+        ordering=("id",),
+    )
+    def thread(self, request, *args, **kwargs):
+        """
+        Root comments of ``?post=``, page by page, each nested with its
+        replies down to ``?depth=`` levels
+        """
+        if "post" not in request.query_params:
+            raise ValidationError({"post": "This query parameter is required."})
+        roots = self.filter_queryset(self.get_queryset()).filter(parent__isnull=True)
+        page = self.paginate_queryset(roots)
+        if page is None:
+            return Response(self.get_tree(roots.order_by("id")))
+        return self.get_paginated_response(self.get_tree(page))
+
+    @action(detail=True, methods=["get"])
+    def subtree(self, request, *args, **kwargs):
+        """
+        A comment nested with its replies down to ``?depth=`` levels
+        """
+        return Response(self.get_tree([self.get_object()])[0])
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ForumConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "src.forum"
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel,unused-import
+        from src.forum import signals  # noqa: F401
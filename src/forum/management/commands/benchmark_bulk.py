@@ -0,0 +1,139 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from src.forum.models import Post
+from src.packages.models import Package
+from src.user.models import User
+
+
+class Rollback(Exception):
+    """
+    Discard the benchmark's rows
+    """
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the bulk endpoints of posts and comments
+    """
+
+    help = (
+        "Create, update and delete posts and comments with one request per "
+        "object, then with bulk requests, rolling everything back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--objects", type=int, default=100)
+
+    def timed(self, requests):
+        """
+        Seconds taken by ``requests`` (callables), checking their statuses
+        """
+        started = time.perf_counter()
+        for request in requests:
+            response = request()
+            if response.status_code >= 400:
+                raise CommandError(
+                    f"{response.status_code}: {response.content[:200]!r}"
+                )
+        return time.perf_counter() - started
+
+    def measure(self, client, name, url, items):
+        """
+        Time one request per item against one bulk request per action
+        """
+        single, bulk = {}, {}
+
+        created = []
+        single["create"] = self.timed(
+            lambda item=item: self.keep(created, client.post(url, item, format="json"))
+            for item in items
+        )
+        single["update"] = self.timed(
+            lambda pk=pk: client.patch(
+                f"{url}{pk}/", {"content": "Updated"}, format="json"
+            )
+            for pk in created
+        )
+        single["delete"] = self.timed(
+            lambda pk=pk: client.delete(f"{url}{pk}/") for pk in created
+        )
+
+        created = []
+        bulk["create"] = self.timed(
+            [
+                lambda: self.keep(
+                    created, client.post(f"{url}bulk/", items, format="json")
+                )
+            ]
+        )
+        changes = [{"id": pk, "content": "Updated"} for pk in created]
+        bulk["update"] = self.timed(
+            [lambda: client.patch(f"{url}bulk/", changes, format="json")]
+        )
+        bulk["delete"] = self.timed(
+            [lambda: client.delete(f"{url}bulk/", created, format="json")]
+        )
+
+        for action in ("create", "update", "delete"):
+            self.stdout.write(
+                f"{name} {action}: {len(items)} requests {single[action]:.2f}s, "
+                f"bulk {bulk[action]:.2f}s ({single[action] / bulk[action]:.1f}x)"
+            )
+
+    @staticmethod
+    def keep(created, response):
+        """
+        Collect the ids of the objects a response created
+        """
+        if response.status_code == 201:
+            data = response.json()
+            items = data if isinstance(data, list) else [data]
+            created.extend(item["id"] for item in items)
+        return response
+
+    def handle(self, *args, **options):
+        count = options["objects"]
+        client = APIClient()
+        try:
+            # Requests are made in process, from the test client's host
+            with override_settings(ALLOWED_HOSTS=["testserver"]), transaction.atomic():
+                author = User.objects.create_user(email="benchmark@benchmark.invalid")
+                package = Package.objects.create(title="benchmark", version="1.0")
+                post = Post.objects.create(
+                    title="Benchmark", content="Content", author=author, package=package
+                )
+                self.measure(
+                    client,
+                    "posts",
+                    "/api/v1/posts/",
+                    [
+                        {
+                            "title": f"Post {i}",
+                            "content": "Content",
+                            "author": author.pk,
+                            "package": package.pk,
+                        }
+                        for i in range(count)
+                    ],
+                )
+                self.measure(
+                    client,
+                    "comments",
+                    "/api/v1/comments/",
+                    [
+                        {
+                            "post": post.pk,
+                            "author": author.pk,
+                            "content": f"Comment {i}",
+                        }
+                        for i in range(count)
+                    ],
+                )
+                raise Rollback
+        except Rollback:
+            pass
@@ -0,0 +1,108 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from src.core.compiled import CompiledSerializer
+from src.forum.models import Comment, Post
+from src.forum.serializers import CommentSerializer, PostSerializer
+from src.packages.models import Package, PackageSocial, Registry
+from src.packages.serializers import PackageSerializer
+from src.user.models import User
+
+
+class Rollback(Exception):
+    """
+    Discard the benchmark's rows
+    """
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the compiled read path of the list serializers
+    """
+
+    help = (
+        "Serialize generated packages, posts and comments with the regular "
+        "serializers and their compiled read path, rolling everything back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument(
+            "--socials", type=int, default=2, help="Socials per package"
+        )
+
+    def create_rows(self, rows, socials):
+        author = User.objects.create_user(email="benchmark@benchmark.invalid")
+        registry = Registry.objects.create(
+            title="benchmark", link="https://example.com"
+        )
+        packages = Package.objects.bulk_create(
+            Package(
+                title=f"Package {i}",
+                slug=f"benchmark-{i}",
+                version="1.0",
+                registry=registry,
+            )
+            for i in range(rows)
+        )
+        links = PackageSocial.objects.bulk_create(
+            PackageSocial(link=f"https://example.com/{i}") for i in range(socials)
+        )
+        Package.socials.through.objects.bulk_create(
+            Package.socials.through(package=package, packagesocial=social)
+            for package in packages
+            for social in links
+        )
+        posts = Post.objects.bulk_create(
+            Post(
+                title=f"Post {i}",
+                slug=f"benchmark-{i}",
+                content="Content",
+                author=author,
+                package=package,
+            )
+            for i, package in enumerate(packages)
+        )
+        Comment.objects.bulk_create(
+            Comment(post=post, author=author, content="Comment") for post in posts
+        )
+
+    def measure(self, name, serializer_class, queryset):
+        started = time.perf_counter()
+        regular = serializer_class(queryset.all(), many=True).data
+        regular_time = time.perf_counter() - started
+
+        compiled = CompiledSerializer.compile(serializer_class())
+        if compiled is None:
+            raise CommandError(
+                f"{serializer_class.__name__} has no compiled read path."
+            )
+        started = time.perf_counter()
+        data = compiled.represent(compiled.get_queryset(queryset.all()))
+        compiled_time = time.perf_counter() - started
+
+        if [dict(item) for item in regular] != data:
+            raise CommandError(f"{name}: the representations differ.")
+        self.stdout.write(
+            f"{name}: serializer {regular_time:.2f}s, compiled {compiled_time:.2f}s "
+            f"({regular_time / compiled_time:.1f}x)"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.create_rows(options["rows"], options["socials"])
+                self.measure(
+                    "packages",
+                    PackageSerializer,
+                    Package.objects.select_related(
+                        "registry", "latest_version"
+                    ).prefetch_related("socials"),
+                )
+                self.measure("posts", PostSerializer, Post.objects.all())
+                self.measure("comments", CommentSerializer, Comment.objects.all())
+                raise Rollback
+        except Rollback:
+            pass
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from src.forum.services.explain_service import explain_access_paths
+
+
+class Command(BaseCommand):
+    """
+    Explain the listing queries of the forum and package APIs
+    """
+
+    help = (
+        "Print the EXPLAIN plan of every forum and package listing query and "
+        "fail when one of them scans a whole table or sorts its rows"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths", nargs="*", help="Access paths to explain (all by default)"
+        )
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument(
+            "--verbose-plans", action="store_true", help="Print every plan"
+        )
+
+    def handle(self, *args, **options):
+        plans = explain_access_paths(options["paths"], options["page_size"])
+        if not plans:
+            raise CommandError("No access path to explain.")
+
+        self.stdout.write(f"Database: {connection.vendor}")
+        for plan in plans:
+            if plan.ok:
+                status = self.style.SUCCESS("index")
+            elif plan.full_scans:
+                status = self.style.ERROR(f"full scan of {', '.join(plan.full_scans)}")
+            else:
+                status = self.style.WARNING("sort")
+            self.stdout.write(f"{plan.name:<32} {status}")
+            if options["verbose_plans"] or not plan.ok:
+                self.stdout.write(f"  {plan.sql}")
+                for line in plan.plan.splitlines():
+                    self.stdout.write(f"    {line}")
+
+        failing = [plan.name for plan in plans if not plan.ok]
+        if failing:
+            raise CommandError(f"Unindexed access paths: {', '.join(failing)}")
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from src.forum.services.counter_service import (
+    rebuild_package_counters,
+    rebuild_post_counters,
+)
+
+
+class Command(BaseCommand):
+    """
+    Rebuild denormalized forum counters
+    """
+
+    help = "Recompute Post.comment_count, Post.last_commented_at and Package.post_count"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            posts = rebuild_post_counters()
+            packages = rebuild_package_counters()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt counters of {posts} posts and {packages} packages."
+            )
+        )
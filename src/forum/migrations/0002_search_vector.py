@@ -0,0 +1,67 @@
+# Generated by Django 5.1.1 on 2026-10-18 14:10
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_FIELDS = {
+    "forum_post": ("title", "content"),
+    "forum_comment": ("content",),
+}
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, fields in SEARCH_FIELDS.items():
+        columns = ", ".join(f'"{field}"' for field in fields)
+        if vendor == "sqlite":
+            schema_editor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS "{table}_fts" USING fts5({columns})'
+            )
+            schema_editor.execute(
+                f'INSERT INTO "{table}_fts" (rowid, {columns}) '
+                f'SELECT "id", {columns} FROM "{table}"'
+            )
+        elif vendor == "postgresql":
+            vector = " || ".join(
+                f"setweight(to_tsvector('english', coalesce(\"{field}\", '')), '{weight}')"
+                for field, weight in zip(fields, "ABCD")
+            )
+            schema_editor.execute(f'UPDATE "{table}" SET "search_vector" = {vector}')
+            schema_editor.execute(
+                f'CREATE INDEX "{table}_search_vector_gin" '
+                f'ON "{table}" USING gin ("search_vector")'
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table in SEARCH_FIELDS:
+        if vendor == "sqlite":
+            schema_editor.execute(f'DROP TABLE IF EXISTS "{table}_fts"')
+        elif vendor == "postgresql":
+            schema_editor.execute(f'DROP INDEX IF EXISTS "{table}_search_vector_gin"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
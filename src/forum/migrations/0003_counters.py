@@ -0,0 +1,62 @@
+# Generated by Django 5.1.1 on 2026-10-18 14:10
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(queryset, group_by):
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .values(group_by)
+            .annotate(total=Count("pk"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def populate_counters(apps, schema_editor):
+    Post = apps.get_model("forum", "Post")
+    Comment = apps.get_model("forum", "Comment")
+    Package = apps.get_model("packages", "Package")
+
+    comments = Comment.objects.filter(post=OuterRef("pk"))
+    Post.objects.update(
+        comment_count=count_subquery(comments, "post"),
+        last_commented_at=Subquery(
+            comments.order_by()
+            .values("post")
+            .annotate(latest=Max("created_at"))
+            .values("latest")
+        ),
+    )
+    Package.objects.update(
+        post_count=count_subquery(
+            Post.objects.filter(package=OuterRef("pk")), "package"
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0002_search_vector"),
+        ("packages", "0003_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="last_commented_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
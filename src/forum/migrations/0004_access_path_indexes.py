@@ -0,0 +1,69 @@
+# Generated by Django 5.1.1 on 2026-10-18 14:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def sort_nulls_last(apps, schema_editor):
+    # PostgreSQL puts NULLs first in DESC indexes while hot threads are listed
+    # with ``last_commented_at DESC NULLS LAST``; rebuild the index to match.
+    # SQLite can't declare NULL ordering on an index and sorts NULLs the way
+    # the plain index does.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS "forum_post_last_comment_idx"')
+    schema_editor.execute(
+        'CREATE INDEX "forum_post_last_comment_idx" ON "forum_post" '
+        '("last_commented_at" DESC NULLS LAST, "id" DESC)'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0003_counters"),
+        ("packages", "0004_access_path_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="forum_comment_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "created_at", "id"], name="forum_comment_post_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="forum_post_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["package", "-created_at", "-id"], name="forum_post_package_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["package", "-created_at", "-id"],
+                name="forum_post_published_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["-last_commented_at", "-id"], name="forum_post_last_comment_idx"
+            ),
+        ),
+        migrations.RunPython(sort_nulls_last, migrations.RunPython.noop),
+    ]
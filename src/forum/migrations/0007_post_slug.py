@@ -0,0 +1,40 @@
+# Generated by Django 5.1.1 on 2026-10-18 14:40
+
+from django.db import migrations, models
+
+from src.core.utils.unique_slugify import get_unique_slugs
+
+
+def populate_slugs(apps, schema_editor):
+    Model = apps.get_model("forum", "post")
+    posts = list(Model.objects.only("pk", "title").order_by("pk"))
+    slugs = get_unique_slugs(
+        Model.objects.none(), [post.title for post in posts], slug_len=255
+    )
+    for post, slug in zip(posts, slugs):
+        post.slug = slug
+    Model.objects.bulk_update(posts, ["slug"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0006_comment_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="slug",
+            field=models.SlugField(
+                db_index=False, default="", editable=False, max_length=255
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="post",
+            name="slug",
+            field=models.SlugField(editable=False, max_length=255, unique=True),
+        ),
+    ]
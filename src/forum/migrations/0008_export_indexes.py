@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-18 14:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0007_post_slug"),
+        ("packages", "0006_package_slug"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["updated_at", "id"], name="forum_comment_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["updated_at", "id"], name="forum_post_updated_idx"
+            ),
+        ),
+    ]
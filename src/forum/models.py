@@ -1,27 +1,137 @@
-from django.db import models
+from functools import partial
 
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.utils.http import int_to_base36
+
+from src.core.utils.unique_slugify import save_unique, unique_slugify
 from src.user.models import User
 from src.packages.models import Package
 
 
 class Post(models.Model):
     title = models.CharField(max_length=200)
+    slug = models.SlugField(max_length=255, unique=True, editable=False)
     content = models.TextField()
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     package = models.ForeignKey(Package, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_published = models.BooleanField(default=True)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    last_commented_at = models.DateTimeField(null=True, blank=True, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        """
+        Meta Class
+        """
+
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="forum_post_created_idx"),
+            models.Index(
+                fields=["package", "-created_at", "-id"],
+                name="forum_post_package_idx",
+            ),
+            models.Index(
+                fields=["package", "-created_at", "-id"],
+                condition=models.Q(is_published=True),
+                name="forum_post_published_idx",
+            ),
+            models.Index(
+                fields=["-last_commented_at", "-id"],
+                name="forum_post_last_comment_idx",
+            ),
+            models.Index(fields=["updated_at", "id"], name="forum_post_updated_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        save = partial(super().save, *args, **kwargs)
+        if self.slug:
+            return save()
+        return save_unique(save, partial(unique_slugify, self, self.title))
+
 
 class Comment(models.Model):
+    """
+    Comment of a post, threaded through a materialized path
+
+    ``path`` is the chain of the comment's ancestors' primary keys followed by
+    its own, each as a fixed width base36 segment ending with ``/``; sorting by
+    path lists a thread depth first and the subtree of a comment is the range
+    of paths starting with its own.
+    """
+
+    PATH_SEGMENT_WIDTH = 7
+    PATH_SEPARATOR = "/"
+    PATH_MAX_LENGTH = 255
+    MAX_DEPTH = PATH_MAX_LENGTH // (PATH_SEGMENT_WIDTH + len(PATH_SEPARATOR))
+
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
     author = models.ForeignKey(User, on_delete=models.CASCADE)
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="replies",
+    )
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    path = models.CharField(max_length=PATH_MAX_LENGTH, editable=False, default="")
+    depth = models.PositiveSmallIntegerField(editable=False, default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        """
+        Meta Class
+        """
+
+        indexes = [
+            models.Index(
+                fields=["-created_at", "-id"], name="forum_comment_created_idx"
+            ),
+            models.Index(
+                fields=["post", "created_at", "id"], name="forum_comment_post_idx"
+            ),
+            models.Index(fields=["post", "path"], name="forum_comment_thread_idx"),
+            models.Index(
+                fields=["post", "id"],
+                condition=models.Q(parent__isnull=True),
+                name="forum_comment_root_idx",
+            ),
+            models.Index(fields=["updated_at", "id"], name="forum_comment_updated_idx"),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author.username} on {self.post.title}"
+
+    @classmethod
+    def get_path_segment(cls, pk):
+        """
+        Path segment of the comment with primary key ``pk``
+        """
+        return int_to_base36(pk).zfill(cls.PATH_SEGMENT_WIDTH) + cls.PATH_SEPARATOR
+
+    @classmethod
+    def get_subtree_end(cls, path):
+        """
+        Upper bound of the paths below ``path``
+        """
+        return path + "~"
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if adding and self.parent_id:
+            self.depth = self.parent.depth + 1
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding and not self.path:
+                # The path ends with the primary key, only known once inserted.
+                parent_path = self.parent.path if self.parent_id else ""
+                self.path = parent_path + self.get_path_segment(self.pk)
+                Comment.objects.filter(pk=self.pk).update(path=self.path)
@@ -0,0 +1,267 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+# Indexed text fields per model, most relevant first (ranked A, B, C, D).
+SEARCH_FIELDS = {
+    "forum.post": ("title", "content"),
+    "forum.comment": ("content",),
+}
+
+SEARCH_RANK = "search_rank"
+
+
+def group_by_model(instances):
+    """
+    Primary keys of ``instances`` per model
+    """
+    pks = defaultdict(list)
+    for instance in instances:
+        pks[instance.__class__].append(instance.pk)
+    return pks
+
+
+def get_search_fields(model):
+    """
+    Indexed text fields of ``model``
+    """
+    return SEARCH_FIELDS.get(model._meta.label_lower, ())
+
+
+class BaseSearchBackend:
+    """
+    Full-text Search Backend
+
+    ``search`` filters a queryset down to the rows matching ``term`` and
+    annotates them with a ``search_rank`` (higher is better); ``index`` and
+    ``remove`` keep the backend's index in sync with a saved or deleted row.
+    """
+
+    vendor = None
+
+    def is_available(self):
+        """
+        Whether the backend can run on the default database
+        """
+        return self.vendor is None or connection.vendor == self.vendor
+
+    def search(self, queryset, term):
+        """
+        Rows of ``queryset`` matching ``term``
+        """
+        raise NotImplementedError
+
+    def index(self, instance):
+        """
+        Index (or re-index) ``instance``
+        """
+
+    def remove(self, instance):
+        """
+        Drop ``instance`` from the index
+        """
+
+    def index_many(self, instances):
+        """
+        Index (or re-index) ``instances``
+        """
+        for instance in instances:
+            self.index(instance)
+
+    def remove_many(self, instances):
+        """
+        Drop ``instances`` from the index
+        """
+        for instance in instances:
+            self.remove(instance)
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    PostgreSQL ``tsvector`` backend
+
+    Rows store a weighted ``search_vector`` (GIN indexed), matched with
+    ``websearch_to_tsquery`` and ranked with ``ts_rank``.
+    """
+
+    vendor = "postgresql"
+    config = "english"
+
+    def get_vector(self, model):
+        """
+        Weighted search vector expression of ``model``
+        """
+        vector = None
+        for field, weight in zip(get_search_fields(model), "ABCD"):
+            field_vector = SearchVector(field, weight=weight, config=self.config)
+            vector = field_vector if vector is None else vector + field_vector
+        return vector
+
+    def search(self, queryset, term):
+        query = SearchQuery(term, config=self.config, search_type="websearch")
+        return queryset.filter(search_vector=query).annotate(
+            **{SEARCH_RANK: SearchRank(F("search_vector"), query)}
+        )
+
+    def index(self, instance):
+        model = instance.__class__
+        model._default_manager.filter(pk=instance.pk).update(
+            search_vector=self.get_vector(model)
+        )
+
+    def index_many(self, instances):
+        for model, pks in group_by_model(instances).items():
+            model._default_manager.filter(pk__in=pks).update(
+                search_vector=self.get_vector(model)
+            )
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    SQLite FTS5 backend
+
+    Each indexed model has a ``<db_table>_fts`` FTS5 virtual table whose rowid
+    is the row's primary key; matches are ranked with bm25.
+    """
+
+    vendor = "sqlite"
+
+    @staticmethod
+    def get_table(model):
+        """
+        FTS5 table of ``model``
+        """
+        return f"{model._meta.db_table}_fts"
+
+    @staticmethod
+    def get_match(term):
+        """
+        FTS5 query matching every word of ``term``
+        """
+        words = term.split()
+        return " ".join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+    def search(self, queryset, term):
+        model = queryset.model
+        table = self.get_table(model)
+        match = self.get_match(term)
+        if not match:
+            return queryset
+        rank = RawSQL(
+            f'SELECT -"{table}".rank FROM "{table}" '
+            f'WHERE "{table}" MATCH %s AND "{table}".rowid = '
+            f'"{model._meta.db_table}"."{model._meta.pk.column}"',
+            (match,),
+            output_field=FloatField(),
+        )
+        return queryset.filter(
+            pk__in=RawSQL(
+                f'SELECT rowid FROM "{table}" WHERE "{table}" MATCH %s', (match,)
+            )
+        ).annotate(**{SEARCH_RANK: rank})
+
+    def index(self, instance):
+        model = instance.__class__
+        table = self.get_table(model)
+        fields = get_search_fields(model)
+        columns = ", ".join(f'"{field}"' for field in fields)
+        placeholders = ", ".join(["%s"] * len(fields))
+        values = [getattr(instance, field) or "" for field in fields]
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM "{table}" WHERE rowid = %s', (instance.pk,))
+            cursor.execute(
+                f'INSERT INTO "{table}" (rowid, {columns}) VALUES (%s, {placeholders})',
+                (instance.pk, *values),
+            )
+
+    def remove(self, instance):
+        table = self.get_table(instance.__class__)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM "{table}" WHERE rowid = %s', (instance.pk,))
+
+    def index_many(self, instances):
+        # One prepared statement per table, run for every row
+        by_model = defaultdict(list)
+        for instance in instances:
+            by_model[instance.__class__].append(instance)
+        for model, rows in by_model.items():
+            table = self.get_table(model)
+            fields = get_search_fields(model)
+            columns = ", ".join(f'"{field}"' for field in fields)
+            placeholders = ", ".join(["%s"] * len(fields))
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f'DELETE FROM "{table}" WHERE rowid = %s',
+                    [(row.pk,) for row in rows],
+                )
+                cursor.executemany(
+                    f'INSERT INTO "{table}" (rowid, {columns}) VALUES (%s, {placeholders})',
+                    [
+                        (row.pk, *(getattr(row, field) or "" for field in fields))
+                        for row in rows
+                    ],
+                )
+
+    def remove_many(self, instances):
+        for model, pks in group_by_model(instances).items():
+            table = self.get_table(model)
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f'DELETE FROM "{table}" WHERE rowid = %s', [(pk,) for pk in pks]
+                )
+
+
+def get_search_backend():
+    """
+    Configured search backend (``FORUM_SEARCH_BACKEND``), if it can run on the
+    default database
+    """
+    backend_path = getattr(settings, "FORUM_SEARCH_BACKEND", None)
+    if not backend_path:
+        return None
+    backend = import_string(backend_path)()
+    return backend if backend.is_available() else None
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    ``?search=`` filter backed by the configured full-text search backend
+
+    Falls back to the ``icontains`` lookups of ``SearchFilter`` when no backend
+    is available. Results are ordered by relevance unless the view is ordered
+    explicitly.
+    """
+
+    def get_search_term(self, request):
+        """
+        Search term of the request
+        """
+        return " ".join(self.get_search_terms(request))
+
+    def filter_queryset(self, request, queryset, view):
+        term = self.get_search_term(request)
+        backend = get_search_backend()
+        if not term or backend is None or not get_search_fields(queryset.model):
+            return super().filter_queryset(request, queryset, view)
+        return backend.search(queryset, term)
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Relevance ordering while searching
+        """
+        if api_settings.ORDERING_PARAM in request.query_params:
+            return None
+        if (
+            self.get_search_term(request)
+            and get_search_fields(queryset.model)
+            and get_search_backend() is not None
+        ):
+            return (f"-{SEARCH_RANK}",)
+        return None
@@ -1,6 +1,44 @@
 from rest_framework import serializers
 
+from src.core.serializers import BulkListSerializer, RelatedFieldMapSerializer
 from src.forum.models import Post, Comment
+from src.forum.services import bulk_service
+from src.packages.models import Package
+from src.user.models import User
+
+
+class PostListSerializer(BulkListSerializer):
+    """
+    List Serializer saving posts in bulk
+    """
+
+    def bulk_create(self, instances):
+        return bulk_service.create_posts(instances)
+
+    def bulk_update(self, instances, changes):
+        return bulk_service.update_posts(instances, changes)
+
+
+class CommentListSerializer(BulkListSerializer):
+    """
+    List Serializer saving comments in bulk
+    """
+
+    def to_internal_value(self, data):
+        if self.instance is not None:
+            # Comments with replies can't move, looked up once for all items.
+            self.replied_ids = set(
+                Comment.objects.filter(
+                    parent__in=[comment.pk for comment in self.instance]
+                ).values_list("parent_id", flat=True)
+            )
+        return super().to_internal_value(data)
+
+    def bulk_create(self, instances):
+        return bulk_service.create_comments(instances)
+
+    def bulk_update(self, instances, changes):
+        return bulk_service.update_comments(instances, changes)
 
 
 class PostSerializer(serializers.ModelSerializer):
@@ -8,13 +46,17 @@ class PostSerializer(serializers.ModelSerializer):
     Serializer for Post
     """
 
+    author = RelatedFieldMapSerializer(queryset=User.objects.all())
+    package = RelatedFieldMapSerializer(queryset=Package.objects.all())
+
     class Meta:
         """
         Meta Class
         """
 
         model = Post
-        fields = "__all__"
+        exclude = ("search_vector",)
+        list_serializer_class = PostListSerializer
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -22,10 +64,58 @@ class CommentSerializer(serializers.ModelSerializer):
     Serializer for Comment
     """
 
+    post = RelatedFieldMapSerializer(queryset=Post.objects.all())
+    author = RelatedFieldMapSerializer(queryset=User.objects.all())
+    parent = RelatedFieldMapSerializer(
+        queryset=Comment.objects.all(), required=False, allow_null=True
+    )
+
     class Meta:
         """
         Meta Class
         """
 
         model = Comment
-        fields = "__all__"
+        exclude = ("search_vector",)
+        list_serializer_class = CommentListSerializer
+
+    def has_replies(self, instance):
+        """
+        Whether ``instance`` has replies, known upfront in bulk updates
+        """
+        replied_ids = getattr(self.parent, "replied_ids", None)
+        if replied_ids is not None:
+            return instance.pk in replied_ids
+        return instance.replies.exists()
+
+    def validate(self, attrs):
+        instance = self.instance
+        post = attrs.get("post")
+        parent = attrs.get("parent")
+
+        # Compared by keys: bulk updates validate many comments at once.
+        if instance is not None:
+            if "parent" in attrs and getattr(parent, "pk", None) != instance.parent_id:
+                raise serializers.ValidationError(
+                    {"parent": "A comment can't be moved to another thread."}
+                )
+            if (
+                post is not None
+                and post.pk != instance.post_id
+                and (instance.parent_id or self.has_replies(instance))
+            ):
+                raise serializers.ValidationError(
+                    {"post": "A threaded comment can't be moved to another post."}
+                )
+            return attrs
+
+        if parent is not None:
+            if parent.post_id != post.pk:
+                raise serializers.ValidationError(
+                    {"parent": "The parent comment belongs to another post."}
+                )
+            if parent.depth + 1 >= Comment.MAX_DEPTH:
+                raise serializers.ValidationError(
+                    {"parent": "The thread is too deep to reply to this comment."}
+                )
+        return attrs
@@ -0,0 +1,171 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.db import connection
+
+from src.core.utils import bulk
+from src.core.utils.unique_slugify import get_unique_slugs, save_unique
+from src.forum.models import Comment, Post
+from src.forum.search import get_search_backend
+from src.forum.services import counter_service
+
+_deferred_deletions = ContextVar("deferred_deletions", default=None)
+
+
+@contextmanager
+def defer_deletions():
+    """
+    Collect the posts and comments deleted in the block (cascades included)
+    instead of syncing the counters and the search index row by row
+    """
+    deleted = {}
+    token = _deferred_deletions.set(deleted)
+    try:
+        yield deleted
+    finally:
+        _deferred_deletions.reset(token)
+
+
+def defer_deletion(instance):
+    """
+    Collect a deleted ``instance`` when deletions are deferred
+    """
+    deleted = _deferred_deletions.get()
+    if deleted is None:
+        return False
+    deleted[(instance.__class__, instance.pk)] = instance
+    return True
+
+
+def index_documents(instances):
+    """
+    (Re-)index ``instances`` in the full-text index
+    """
+    backend = get_search_backend()
+    if backend is not None and instances:
+        backend.index_many(instances)
+
+
+def get_moved(previous, current):
+    """
+    Keys left or joined by the rows whose key changed from ``previous``
+    to ``current``
+    """
+    moved = set()
+    for old, new in zip(previous, current):
+        if old != new:
+            moved.update((old, new))
+    return moved
+
+
+def set_unique_slugs(posts):
+    """
+    Give ``posts`` unique slugs of their titles
+    """
+    slugs = get_unique_slugs(
+        Post.objects.all(),
+        [post.title for post in posts],
+        slug_len=Post._meta.get_field("slug").max_length,
+    )
+    for post, slug in zip(posts, slugs):
+        post.slug = slug
+
+
+def create_posts(posts):
+    """
+    Insert ``posts`` with one query, then count them on their packages and
+    index them as their ``save()`` and signals would
+    """
+    if not posts:
+        return posts
+    save_unique(
+        partial(Post.objects.bulk_create, posts), partial(set_unique_slugs, posts)
+    )
+    counter_service.rebuild_package_counters({post.package_id for post in posts})
+    index_documents(posts)
+    return posts
+
+
+def update_posts(posts, changes):
+    """
+    Apply ``changes`` (one dict per post) with one query, then recount the
+    packages posts moved between and re-index the posts
+    """
+    previous = [post.package_id for post in posts]
+    bulk.bulk_update(posts, changes)
+    package_ids = get_moved(previous, [post.package_id for post in posts])
+    if package_ids:
+        counter_service.rebuild_package_counters(package_ids)
+    index_documents(posts)
+    return posts
+
+
+def create_comments(comments):
+    """
+    Insert ``comments`` with one query, then set their paths, count them on
+    their posts and index them as their ``save()`` and signals would
+    """
+    if not comments:
+        return comments
+    if not connection.features.can_return_rows_from_bulk_insert:
+        # Paths end with primary keys, unknown after a bulk insert here.
+        for comment in comments:
+            comment.save()
+        return comments
+
+    for comment in comments:
+        if comment.parent_id:
+            comment.depth = comment.parent.depth + 1
+    Comment.objects.bulk_create(comments)
+    for comment in comments:
+        parent_path = comment.parent.path if comment.parent_id else ""
+        comment.path = parent_path + Comment.get_path_segment(comment.pk)
+    Comment.objects.bulk_update(comments, ["path"])
+    counter_service.rebuild_post_counters({comment.post_id for comment in comments})
+    index_documents(comments)
+    return comments
+
+
+def update_comments(comments, changes):
+    """
+    Apply ``changes`` (one dict per comment) with one query, then recount the
+    posts comments moved between and re-index the comments
+    """
+    previous = [comment.post_id for comment in comments]
+    bulk.bulk_update(comments, changes)
+    post_ids = get_moved(previous, [comment.post_id for comment in comments])
+    if post_ids:
+        counter_service.rebuild_post_counters(post_ids)
+    index_documents(comments)
+    return comments
+
+
+def delete(queryset):
+    """
+    Delete the posts or comments of ``queryset`` with their cascades, then
+    sync the counters and the search index once for all of them
+    """
+    with defer_deletions() as deleted:
+        queryset.delete()
+    # ``delete()`` clears the primary keys once the signals are sent.
+    for (_, pk), instance in deleted.items():
+        instance.pk = pk
+    deleted = list(deleted.values())
+
+    backend = get_search_backend()
+    if backend is not None and deleted:
+        backend.remove_many(deleted)
+
+    post_ids = {instance.pk for instance in deleted if isinstance(instance, Post)}
+    commented_ids = {
+        instance.post_id for instance in deleted if isinstance(instance, Comment)
+    }
+    if commented_ids - post_ids:
+        counter_service.rebuild_post_counters(commented_ids - post_ids)
+    package_ids = {
+        instance.package_id for instance in deleted if isinstance(instance, Post)
+    }
+    if package_ids:
+        counter_service.rebuild_package_counters(package_ids)
+    return deleted
@@ -0,0 +1,142 @@
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Now
+
+from src.core.utils.response_cache import invalidate_responses
+from src.forum.models import Comment, Post
+from src.packages.models import Package
+
+# ``update()`` skips ``auto_now``: counter updates set ``updated_at`` themselves
+# so ``?since=`` exports and conditional requests see them.
+
+
+def _count_subquery(queryset, group_by):
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .values(group_by)
+            .annotate(total=Count("pk"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def comment_added(comment: Comment):
+    """
+    Count a new comment on its post
+    """
+    Post.objects.filter(pk=comment.post_id).update(
+        comment_count=F("comment_count") + 1,
+        last_commented_at=comment.created_at,
+        updated_at=Now(),
+    )
+
+
+def comment_removed(comment: Comment):
+    """
+    Uncount a deleted comment from its post
+    """
+    Post.objects.filter(pk=comment.post_id).update(
+        comment_count=Greatest(F("comment_count") - 1, Value(0)),
+        last_commented_at=Subquery(
+            Comment.objects.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(latest=Max("created_at"))
+            .values("latest")
+        ),
+        updated_at=Now(),
+    )
+
+
+def get_stored_value(instance, attname, update_fields=None):
+    """
+    Value of ``attname`` stored for an instance about to be updated, ``None``
+    for new instances and saves leaving it alone
+    """
+    if instance._state.adding or instance.pk is None:
+        return None
+    if update_fields is not None and attname.removesuffix("_id") not in update_fields:
+        return None
+    return (
+        type(instance)
+        ._base_manager.filter(pk=instance.pk)
+        .values_list(attname, flat=True)
+        .first()
+    )
+
+
+def comment_moved(comment: Comment, previous_post_id):
+    """
+    Recount the posts a comment moved between
+    """
+    rebuild_post_counters([previous_post_id, comment.post_id])
+
+
+def post_added(post: Post):
+    """
+    Count a new post on its package
+    """
+    Package.objects.filter(pk=post.package_id).update(
+        post_count=F("post_count") + 1, updated_at=Now()
+    )
+    invalidate_responses(Package, [post.package_id])
+
+
+def post_removed(post: Post):
+    """
+    Uncount a deleted post from its package
+    """
+    Package.objects.filter(pk=post.package_id).update(
+        post_count=Greatest(F("post_count") - 1, Value(0)), updated_at=Now()
+    )
+    invalidate_responses(Package, [post.package_id])
+
+
+def post_moved(post: Post, previous_package_id):
+    """
+    Recount the packages a post moved between
+    """
+    rebuild_package_counters([previous_package_id, post.package_id])
+
+
+def rebuild_post_counters(post_ids=None):
+    """
+    Recompute ``comment_count`` and ``last_commented_at`` of the given posts
+    (all posts by default) with one UPDATE
+    """
+    posts = (
+        Post.objects.all() if post_ids is None else Post.objects.filter(pk__in=post_ids)
+    )
+    comments = Comment.objects.filter(post=OuterRef("pk"))
+    return posts.update(
+        comment_count=_count_subquery(comments, "post"),
+        last_commented_at=Subquery(
+            comments.order_by()
+            .values("post")
+            .annotate(latest=Max("created_at"))
+            .values("latest")
+        ),
+        updated_at=Now(),
+    )
+
+
+def rebuild_package_counters(package_ids=None):
+    """
+    Recompute ``post_count`` of the given packages (all packages by default)
+    with one UPDATE
+    """
+    packages = (
+        Package.objects.all()
+        if package_ids is None
+        else Package.objects.filter(pk__in=package_ids)
+    )
+    updated = packages.update(
+        post_count=_count_subquery(
+            Post.objects.filter(package=OuterRef("pk")), "package"
+        ),
+        updated_at=Now(),
+    )
+    invalidate_responses(Package, package_ids)
+    return updated
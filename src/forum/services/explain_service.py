@@ -0,0 +1,230 @@
+import re
+from dataclasses import dataclass, field
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from src.core.utils.pagination import KeysetPagination
+from src.forum.models import Comment, Post
+from src.forum.services.thread_service import get_descendants
+from src.packages.models import Package, Registry
+from src.packages.services.version_service import get_versions
+
+# Plan nodes reading a whole table, per database vendor.
+FULL_SCAN_PATTERNS = {
+    "sqlite": re.compile(r"\bSCAN (?!.*\bUSING\b)(\w+)"),
+    "postgresql": re.compile(r"\bSeq Scan on (\w+)"),
+}
+
+# Plan nodes sorting the rows instead of reading them in index order.
+SORT_PATTERNS = {
+    "sqlite": re.compile(r"\bUSE TEMP B-TREE FOR (?:ORDER BY|RIGHT PART OF ORDER BY)"),
+    "postgresql": re.compile(r"^\s*(?:->\s*)?(?:Incremental )?Sort\b", re.MULTILINE),
+}
+
+
+@dataclass
+class AccessPath:
+    """
+    A query the API runs on every page of a listing
+    """
+
+    name: str
+    build: object
+    vendors: tuple = ()
+
+    def supports(self, vendor):
+        """
+        Whether the path can be indexed on ``vendor``
+        """
+        return not self.vendors or vendor in self.vendors
+
+
+@dataclass
+class Plan:
+    """
+    Query plan of an access path
+    """
+
+    name: str
+    sql: str
+    plan: str
+    full_scans: list = field(default_factory=list)
+    sorted_rows: bool = False
+
+    @property
+    def ok(self):
+        """
+        Whether the path is served by indexes only
+        """
+        return not self.full_scans and not self.sorted_rows
+
+
+def _keyset_page(queryset, ordering, position):
+    paginator = KeysetPagination()
+    paginator.ordering = ordering
+    paginator.nullable = paginator.get_nullable(queryset)
+    return queryset.filter(paginator.get_keyset_filter(position)).order_by(
+        *paginator.get_order_by()
+    )
+
+
+def get_access_paths(page_size=20):
+    """
+    Listing queries of the forum and package APIs
+    """
+    now = timezone.now()
+    return [
+        AccessPath(
+            "posts",
+            lambda: Post.objects.order_by("-created_at", "-id")[:page_size],
+        ),
+        AccessPath(
+            "posts_after_cursor",
+            lambda: _keyset_page(Post.objects.all(), ("-created_at", "-id"), [now, 1])[
+                :page_size
+            ],
+        ),
+        AccessPath(
+            "posts_of_package",
+            lambda: Post.objects.filter(package=1, is_published=True).order_by(
+                "-created_at", "-id"
+            )[:page_size],
+        ),
+        AccessPath(
+            "posts_of_package_after_cursor",
+            lambda: _keyset_page(
+                Post.objects.filter(package=1, is_published=True),
+                ("-created_at", "-id"),
+                [now, 1],
+            )[:page_size],
+        ),
+        AccessPath(
+            "posts_of_package_any_state",
+            lambda: Post.objects.filter(package=1).order_by("-created_at", "-id")[
+                :page_size
+            ],
+        ),
+        AccessPath(
+            "hot_threads",
+            lambda: Post.objects.order_by(
+                F("last_commented_at").desc(nulls_last=True), "-id"
+            )[:page_size],
+        ),
+        AccessPath(
+            "posts_changed_since",
+            lambda: Post.objects.filter(updated_at__gte=now).order_by(
+                "updated_at", "id"
+            )[:page_size],
+        ),
+        AccessPath(
+            "comments",
+            lambda: Comment.objects.order_by("-created_at", "-id")[:page_size],
+        ),
+        AccessPath(
+            "comments_changed_since",
+            lambda: Comment.objects.filter(updated_at__gte=now).order_by(
+                "updated_at", "id"
+            )[:page_size],
+        ),
+        AccessPath(
+            "comments_of_post",
+            lambda: Comment.objects.filter(post=1).order_by("created_at", "id")[
+                :page_size
+            ],
+        ),
+        AccessPath(
+            "comments_of_post_after_cursor",
+            lambda: _keyset_page(
+                Comment.objects.filter(post=1), ("created_at", "id"), [now, 1]
+            )[:page_size],
+        ),
+        AccessPath(
+            "comment_thread_roots",
+            lambda: Comment.objects.filter(post=1, parent__isnull=True).order_by("id")[
+                :page_size
+            ],
+        ),
+        AccessPath(
+            "comment_thread_replies",
+            lambda: get_descendants(
+                [
+                    Comment(post_id=1, path=Comment.get_path_segment(1)),
+                    Comment(post_id=1, path=Comment.get_path_segment(page_size)),
+                ],
+                depth=3,
+            ),
+        ),
+        AccessPath(
+            "packages_by_posts",
+            lambda: Package.objects.order_by("-post_count", "-id")[:page_size],
+        ),
+        AccessPath(
+            "package_by_title",
+            lambda: Package.objects.filter(title="django"),
+        ),
+        AccessPath(
+            "registry_by_title",
+            lambda: Registry.objects.filter(title="pypi"),
+        ),
+        AccessPath(
+            "package_versions_in_range",
+            lambda: get_versions(1, "1.0", "2.0").order_by("-version_key", "-id")[
+                :page_size
+            ],
+        ),
+        # Substring searches need the trigram indexes only PostgreSQL has.
+        AccessPath(
+            "package_title_search",
+            lambda: Package.objects.filter(title__icontains="django"),
+            vendors=("postgresql",),
+        ),
+        AccessPath(
+            "registry_title_search",
+            lambda: Registry.objects.filter(title__icontains="pypi"),
+            vendors=("postgresql",),
+        ),
+    ]
+
+
+def explain(queryset):
+    """
+    Plan of ``queryset`` on the default database
+
+    Sequential scans are disabled on PostgreSQL so the plan shows whether an
+    index *can* serve the query, whatever the size of the tables.
+    """
+    vendor = connection.vendor
+    with transaction.atomic():
+        if vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+
+    full_scan_pattern = FULL_SCAN_PATTERNS.get(vendor)
+    sort_pattern = SORT_PATTERNS.get(vendor)
+    return Plan(
+        name="",
+        sql=str(queryset.query),
+        plan=plan,
+        full_scans=full_scan_pattern.findall(plan) if full_scan_pattern else [],
+        sorted_rows=bool(sort_pattern and sort_pattern.search(plan)),
+    )
+
+
+def explain_access_paths(names=None, page_size=20):
+    """
+    Plans of the listing queries (all of them by default) supported by the
+    default database
+    """
+    plans = []
+    for path in get_access_paths(page_size):
+        if names and path.name not in names:
+            continue
+        if not path.supports(connection.vendor):
+            continue
+        plan = explain(path.build())
+        plan.name = path.name
+        plans.append(plan)
+    return plans
@@ -0,0 +1,38 @@
+from src.forum.models import Comment
+
+
+def get_descendants(comments, depth=None):
+    """
+    Replies below ``comments`` (consecutive siblings in path order), down to
+    ``depth`` levels below them, with one range query over the thread index
+    """
+    if not comments:
+        return Comment.objects.none()
+    first, last = comments[0], comments[-1]
+    queryset = Comment.objects.filter(
+        post_id=first.post_id,
+        path__gt=first.path,
+        path__lt=Comment.get_subtree_end(last.path),
+        depth__gt=first.depth,
+    )
+    if depth is not None:
+        queryset = queryset.filter(depth__lte=first.depth + depth)
+    return queryset.order_by("path")
+
+
+def build_tree(comments, data, replies_key="replies"):
+    """
+    Nest the serialized ``data`` of ``comments`` (roots first, then their
+    replies in path order) under their parents
+    """
+    nodes = {}
+    roots = []
+    for comment, item in zip(comments, data):
+        item[replies_key] = []
+        nodes[comment.pk] = item
+        parent = nodes.get(comment.parent_id)
+        if parent is None:
+            roots.append(item)
+        else:
+            parent[replies_key].append(item)
+    return roots
@@ -0,0 +1,96 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from src.forum.models import Comment, Post
+from src.forum.search import get_search_backend
+from src.forum.services import bulk_service, counter_service
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def index_search_document(sender, instance, **kwargs):
+    """
+    Keep the full-text index in sync with saved posts and comments
+    """
+    backend = get_search_backend()
+    if backend is not None:
+        backend.index(instance)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def remove_search_document(sender, instance, **kwargs):
+    """
+    Drop deleted posts and comments from the full-text index
+    """
+    if bulk_service.defer_deletion(instance):
+        return
+    backend = get_search_backend()
+    if backend is not None:
+        backend.remove(instance)
+
+
+@receiver(pre_save, sender=Comment)
+def remember_commented_post(sender, instance, update_fields=None, **kwargs):
+    """
+    Post of a comment about to be updated, to recount it if the comment moves
+    """
+    instance._stored_post_id = counter_service.get_stored_value(
+        instance, "post_id", update_fields
+    )
+
+
+@receiver(post_save, sender=Comment)
+def count_added_comment(sender, instance, created, **kwargs):
+    """
+    Maintain the comment counters of the commented post
+    """
+    if created:
+        counter_service.comment_added(instance)
+        return
+    previous = instance.__dict__.pop("_stored_post_id", None)
+    if previous is not None and previous != instance.post_id:
+        counter_service.comment_moved(instance, previous)
+
+
+@receiver(post_delete, sender=Comment)
+def count_removed_comment(sender, instance, **kwargs):
+    """
+    Maintain the comment counters of the commented post
+    """
+    if bulk_service.defer_deletion(instance):
+        return
+    counter_service.comment_removed(instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_package(sender, instance, update_fields=None, **kwargs):
+    """
+    Package of a post about to be updated, to recount it if the post moves
+    """
+    instance._stored_package_id = counter_service.get_stored_value(
+        instance, "package_id", update_fields
+    )
+
+
+@receiver(post_save, sender=Post)
+def count_added_post(sender, instance, created, **kwargs):
+    """
+    Maintain the post counter of the package
+    """
+    if created:
+        counter_service.post_added(instance)
+        return
+    previous = instance.__dict__.pop("_stored_package_id", None)
+    if previous is not None and previous != instance.package_id:
+        counter_service.post_moved(instance, previous)
+
+
+@receiver(post_delete, sender=Post)
+def count_removed_post(sender, instance, **kwargs):
+    """
+    Maintain the post counter of the package
+    """
+    if bulk_service.defer_deletion(instance):
+        return
+    counter_service.post_removed(instance)
@@ -1,3 +1,798 @@
-from django.test import TestCase
+import json
+from unittest import skipUnless
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from src.forum.models import Comment, Post
+from src.forum.search import (
+    PostgresSearchBackend,
+    SQLiteSearchBackend,
+    get_search_backend,
+)
+from src.forum.services import counter_service, thread_service
+from src.forum.services.explain_service import explain_access_paths
+from src.packages.models import Package
+from src.user.models import User
+
+
+class AccessPathIndexTestCase(TestCase):
+    """
+    Listing queries are served by indexes
+    """
+
+    def test_no_full_scan(self):
+        for plan in explain_access_paths():
+            with self.subTest(plan.name):
+                self.assertEqual(plan.full_scans, [], plan.plan)
+                self.assertFalse(plan.sorted_rows, plan.plan)
+
+
+class ExportTestCase(TestCase):
+    """
+    NDJSON exports
+    """
+
+    def setUp(self):
+        author = User.objects.create_user(email="user@example.com", username="user")
+        package = Package.objects.create(title="django", version="5.1")
+        self.posts = [
+            Post.objects.create(
+                title=f"Post {i}", content="", author=author, package=package
+            )
+            for i in range(3)
+        ]
+        Comment.objects.create(post=self.posts[0], author=author, content="First")
+
+    def export(self, url, queries=1, **params):
+        with self.assertNumQueries(queries):
+            response = APIClient().get(url, params)
+            content = b"".join(response.streaming_content).decode()
+        self.assertEqual(
+            response["Content-Type"], "application/x-ndjson; charset=utf-8"
+        )
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_export_posts(self):
+        rows = self.export("/api/v1/posts/export/")
+        # The first post was last changed by its comment.
+        self.assertEqual(
+            [row["id"] for row in rows],
+            [post.pk for post in self.posts[1:] + self.posts[:1]],
+        )
+        self.assertEqual(rows[-1]["comment_count"], 1)
+        self.assertNotIn("search_vector", rows[0])
+
+    def test_export_since(self):
+        since = timezone.now()
+        Post.objects.filter(pk=self.posts[1].pk).update(updated_at=timezone.now())
+        rows = self.export("/api/v1/posts/export/", since=since.isoformat())
+        self.assertEqual([row["id"] for row in rows], [self.posts[1].pk])
+
+    def test_export_since_counter_change(self):
+        since = timezone.now()
+        Comment.objects.create(
+            post=self.posts[2], author=self.posts[2].author, content=""
+        )
+        rows = self.export("/api/v1/posts/export/", since=since.isoformat())
+        self.assertEqual([row["id"] for row in rows], [self.posts[2].pk])
+        self.assertEqual(rows[0]["comment_count"], 1)
+
+    def test_export_comments(self):
+        # The post filter checks the post exists first.
+        rows = self.export("/api/v1/comments/export/", queries=2, post=self.posts[0].pk)
+        self.assertEqual([row["content"] for row in rows], ["First"])
+
+
+class SparseFieldsTestCase(TestCase):
+    """
+    Sparse fieldsets
+    """
+
+    def setUp(self):
+        author = User.objects.create_user(email="user@example.com", username="user")
+        package = Package.objects.create(title="django", version="5.1")
+        self.post = Post.objects.create(
+            title="Post", content="Long content", author=author, package=package
+        )
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = APIClient().get(url)
+        sql = [query["sql"] for query in context.captured_queries]
+        return response, [query for query in sql if '"forum_post"."id"' in query]
+
+    def test_list_fields(self):
+        response, queries = self.get("/api/v1/posts/?fields=id,title")
+        self.assertEqual(
+            response.json()["results"], [{"id": self.post.pk, "title": "Post"}]
+        )
+        self.assertNotIn('"forum_post"."content"', queries[-1])
+
+    def test_detail_exclude(self):
+        response, queries = self.get(f"/api/v1/posts/{self.post.pk}/?exclude=content")
+        self.assertNotIn("content", response.json())
+        self.assertIn("title", response.json())
+        self.assertNotIn('"forum_post"."content"', queries[-1])
+
+    def test_unknown_fields(self):
+        response, _ = self.get("/api/v1/posts/?fields=id,nope")
+        self.assertEqual(response.status_code, 400)
+
+
+class SearchTestCase(TestCase):
+    """
+    Full-text search backends and index sync
+    """
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email="user@example.com", username="user"
+        )
+        self.package = Package.objects.create(title="django", version="5.1")
+        self.client = APIClient()
+
+    def search(self, url, term):
+        response = self.client.get(url, {"search": term})
+        return [row["id"] for row in response.json()["results"]]
+
+    def create_post(self, title, content):
+        return Post.objects.create(
+            title=title, content=content, author=self.author, package=self.package
+        )
+
+    @skipUnless(connection.vendor == "sqlite", "FTS5 backend")
+    def test_fts5_index_sync(self):
+        self.assertIsInstance(get_search_backend(), SQLiteSearchBackend)
+        post = self.create_post("Async views", "Running Django views on asyncio")
+        self.assertEqual(self.search("/api/v1/posts/", "asyncio"), [post.pk])
+        # Every word has to match, in any order
+        self.assertEqual(self.search("/api/v1/posts/", "views running"), [post.pk])
+        self.assertEqual(self.search("/api/v1/posts/", "asyncio trio"), [])
+
+        post.content = "Running Django views on trio"
+        post.save()
+        self.assertEqual(self.search("/api/v1/posts/", "asyncio"), [])
+        self.assertEqual(self.search("/api/v1/posts/", "trio"), [post.pk])
+
+        comment = Comment.objects.create(
+            post=post, author=self.author, content="Use trio"
+        )
+        self.assertEqual(self.search("/api/v1/comments/", "trio"), [comment.pk])
+
+        post.delete()
+        self.assertEqual(self.search("/api/v1/posts/", "trio"), [])
+        self.assertEqual(self.search("/api/v1/comments/", "trio"), [])
+
+    def test_best_matches_first(self):
+        # Newer posts come first when ranks are equal.
+        best = self.create_post("Django forms", "Django form fields and Django widgets")
+        other = self.create_post("Forms", "Django form fields and widgets")
+        self.assertEqual(self.search("/api/v1/posts/", "django"), [best.pk, other.pk])
+
+    def test_quoted_terms(self):
+        post = self.create_post('The "select" tag', "Forms")
+        self.assertEqual(self.search("/api/v1/posts/", '"select'), [post.pk])
+
+    @override_settings(FORUM_SEARCH_BACKEND=None)
+    def test_fallback_without_backend(self):
+        post = self.create_post("Async views", "Running Django views on asyncio")
+        self.assertIsNone(get_search_backend())
+        self.assertEqual(self.search("/api/v1/posts/", "asyncio"), [post.pk])
+
+    @skipUnless(connection.vendor == "postgresql", "tsvector backend")
+    @override_settings(FORUM_SEARCH_BACKEND="src.forum.search.PostgresSearchBackend")
+    def test_tsvector_index_sync(self):
+        self.assertIsInstance(get_search_backend(), PostgresSearchBackend)
+        post = self.create_post("Async views", "Running Django views on asyncio")
+        self.assertEqual(self.search("/api/v1/posts/", "asyncio"), [post.pk])
+
+        post.content = "Running Django views on trio"
+        post.save()
+        self.assertEqual(self.search("/api/v1/posts/", "asyncio"), [])
+        self.assertEqual(self.search("/api/v1/posts/", "trio"), [post.pk])
+
+        other = self.create_post("Django 5.1", "What is new")
+        self.assertEqual(self.search("/api/v1/posts/", "django"), [other.pk, post.pk])
+
+        post.delete()
+        self.assertEqual(self.search("/api/v1/posts/", "trio"), [])
+
+    def test_tsvector_backend_needs_postgres(self):
+        backend = PostgresSearchBackend()
+        self.assertEqual(backend.is_available(), connection.vendor == "postgresql")
+        with override_settings(
+            FORUM_SEARCH_BACKEND="src.forum.search.PostgresSearchBackend"
+        ):
+            self.assertEqual(
+                get_search_backend() is not None, connection.vendor == "postgresql"
+            )
+
+
+class PaginationTestCase(TestCase):
+    """
+    Keyset pagination of posts
+    """
+
+    def setUp(self):
+        author = User.objects.create_user(email="user@example.com", username="user")
+        package = Package.objects.create(title="django", version="5.1")
+        self.posts = [
+            Post.objects.create(
+                title=f"Post {i}", content="Content", author=author, package=package
+            )
+            for i in range(7)
+        ]
+        self.client = APIClient()
+
+    def walk(self, url, **params):
+        """
+        Ids of every page, following the next links then the previous links back
+        """
+        response = self.client.get(url, {"page_size": 3, **params}).json()
+        pages = [[post["id"] for post in response["results"]]]
+        while response["pagination"]["next"]:
+            response = self.client.get(response["pagination"]["next"]).json()
+            pages.append([post["id"] for post in response["results"]])
+        backward = [pages[-1]]
+        while response["pagination"]["previous"]:
+            response = self.client.get(response["pagination"]["previous"]).json()
+            backward.insert(0, [post["id"] for post in response["results"]])
+        self.assertEqual(backward, pages)
+        return [post_id for page in pages for post_id in page]
+
+    def test_walk_all_pages(self):
+        # Same created_at for some posts: ties are broken by id.
+        Post.objects.filter(pk__in=[post.pk for post in self.posts[2:5]]).update(
+            created_at=self.posts[2].created_at
+        )
+        ids = self.walk("/api/v1/posts/")
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(
+            ids,
+            list(
+                Post.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+            ),
+        )
+
+    def test_count(self):
+        response = self.client.get("/api/v1/posts/", {"page_size": 3})
+        self.assertIsNone(response.json()["pagination"]["count"])
+        response = self.client.get("/api/v1/posts/", {"page_size": 3, "count": "true"})
+        self.assertEqual(response.json()["pagination"]["count"], 7)
+
+    def test_bad_cursor(self):
+        response = self.client.get("/api/v1/posts/", {"cursor": "garbage"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_nullable_ordering(self):
+        # Posts without comments have no last_commented_at and come last.
+        now = timezone.now()
+        for post, hours in zip(self.posts, (1, 3, 3, 2)):
+            Post.objects.filter(pk=post.pk).update(
+                last_commented_at=now - timezone.timedelta(hours=hours)
+            )
+        ids = self.walk("/api/v1/posts/", ordering="-last_commented_at")
+        commented = [
+            self.posts[0].pk,
+            self.posts[3].pk,
+            self.posts[2].pk,
+            self.posts[1].pk,
+        ]
+        uncommented = sorted((post.pk for post in self.posts[4:]), reverse=True)
+        self.assertEqual(ids, commented + uncommented)
+
+        ids = self.walk("/api/v1/posts/", ordering="last_commented_at")
+        self.assertEqual(ids, commented[::-1] + uncommented[::-1])
+
+    def test_search_rank_ordering(self):
+        # Same length, more matches ranks higher; equal ranks are ordered by id.
+        matches = (1, 2, 2, 3, 3, 3, 0)
+        for post, count in zip(self.posts, matches):
+            post.content = " ".join(["django"] * count + ["flask"] * (3 - count))
+            post.save()
+        ids = self.walk("/api/v1/posts/", search="django")
+        expected = sorted(
+            ((count, post.pk) for post, count in zip(self.posts, matches) if count),
+            reverse=True,
+        )
+        self.assertEqual(ids, [post_id for _, post_id in expected])
+
+
+class BulkTestCase(TestCase):
+    """
+    Bulk create, update and delete of posts and comments
+    """
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email="user@example.com", username="user"
+        )
+        self.packages = [
+            Package.objects.create(title=title, version="1.0")
+            for title in ("django", "flask")
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(
+                email="admin@example.com", username="admin", is_staff=True
+            )
+        )
+
+    def create_posts(self, count, queries=None):
+        items = [
+            {
+                "title": "Post",
+                "content": "Content",
+                "author": self.author.pk,
+                "package": self.packages[0].pk,
+            }
+            for _ in range(count)
+        ]
+        if queries is None:
+            return self.client.post("/api/v1/posts/bulk/", items, format="json")
+        with self.assertNumQueries(queries):
+            return self.client.post("/api/v1/posts/bulk/", items, format="json")
+
+    def test_create_posts(self):
+        # Authors, packages, slugs, insert, package counters and search index
+        # (plus savepoints), whatever the number of posts
+        response = self.create_posts(5, queries=11)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [post["slug"] for post in response.json()],
+            ["post", "post-2", "post-3", "post-4", "post-5"],
+        )
+        self.assertEqual(Package.objects.get(pk=self.packages[0].pk).post_count, 5)
+
+    def test_invalid_items_save_nothing(self):
+        item = {"title": "Post", "content": "Content", "author": self.author.pk}
+        items = [{**item, "package": 0}, {**item, "package": self.packages[0].pk}]
+        response = self.client.post("/api/v1/posts/bulk/", items, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("package", response.json()[0])
+        self.assertEqual(response.json()[1], {})
+        self.assertFalse(Post.objects.exists())
+
+    def test_admin_only(self):
+        item = {
+            "title": "Post",
+            "content": "Content",
+            "author": self.author.pk,
+            "package": self.packages[0].pk,
+        }
+        client = APIClient()
+        for method in ("post", "patch", "delete"):
+            response = getattr(client, method)(
+                "/api/v1/posts/bulk/", [item], format="json"
+            )
+            self.assertEqual(response.status_code, 401)
+        client.force_authenticate(self.author)
+        response = client.post("/api/v1/comments/bulk/", [item], format="json")
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Post.objects.exists())
+
+    def test_list_create_is_refused(self):
+        # Lists go through bulk/ and its checks only.
+        item = {
+            "title": "Post",
+            "content": "Content",
+            "author": self.author.pk,
+            "package": self.packages[0].pk,
+        }
+        for client in (APIClient(), self.client):
+            response = client.post("/api/v1/posts/", [item] * 3, format="json")
+            self.assertEqual(response.status_code, 400)
+            response = client.post(
+                "/api/v1/comments/",
+                [{"post": 0, "author": self.author.pk, "content": "Hi"}],
+                format="json",
+            )
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(Post.objects.exists())
+
+    def test_max_size(self):
+        with self.settings(API_BULK_MAX_SIZE=2):
+            response = self.create_posts(3)
+        self.assertEqual(response.status_code, 400)
+
+    def test_update_posts(self):
+        ids = [post["id"] for post in self.create_posts(2).json()]
+        changes = [
+            {"id": ids[0], "package": self.packages[1].pk},
+            {"id": ids[1], "title": "Renamed"},
+        ]
+        response = self.client.patch("/api/v1/posts/bulk/", changes, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[1]["title"], "Renamed")
+        self.assertEqual(
+            [
+                Package.objects.get(pk=package.pk).post_count
+                for package in self.packages
+            ],
+            [1, 1],
+        )
+
+        response = self.client.patch("/api/v1/posts/bulk/", [{"id": 0}], format="json")
+        self.assertEqual(response.json(), [{"id": ["Not found."]}])
+
+    def test_comments(self):
+        post_id = self.create_posts(1).json()[0]["id"]
+        roots = self.client.post(
+            "/api/v1/comments/bulk/",
+            [{"post": post_id, "author": self.author.pk, "content": "Root"}] * 2,
+            format="json",
+        ).json()
+        replies = self.client.post(
+            "/api/v1/comments/bulk/",
+            [
+                {
+                    "post": post_id,
+                    "author": self.author.pk,
+                    "content": "Reply",
+                    "parent": root["id"],
+                }
+                for root in roots
+            ],
+            format="json",
+        ).json()
+        self.assertEqual(
+            replies[0]["path"],
+            roots[0]["path"] + Comment.get_path_segment(replies[0]["id"]),
+        )
+        self.assertEqual(replies[0]["depth"], 1)
+        self.assertEqual(Post.objects.get(pk=post_id).comment_count, 4)
+
+        # Deleting a root deletes its reply too.
+        response = self.client.delete(
+            "/api/v1/comments/bulk/", [roots[0]["id"]], format="json"
+        )
+        self.assertEqual(response.json(), [{"id": roots[0]["id"]}])
+        self.assertEqual(Post.objects.get(pk=post_id).comment_count, 2)
+        response = self.client.get("/api/v1/comments/", {"search": "reply"})
+        self.assertEqual(
+            [comment["id"] for comment in response.json()["results"]],
+            [replies[1]["id"]],
+        )
+
+    def test_move_comments(self):
+        source, target = [post["id"] for post in self.create_posts(2).json()]
+        roots = self.client.post(
+            "/api/v1/comments/bulk/",
+            [{"post": source, "author": self.author.pk, "content": "Root"}] * 4,
+            format="json",
+        ).json()
+        self.client.post(
+            "/api/v1/comments/bulk/",
+            [
+                {
+                    "post": source,
+                    "author": self.author.pk,
+                    "content": "Reply",
+                    "parent": roots[0]["id"],
+                }
+            ],
+            format="json",
+        )
+
+        # Replies are looked up once, whatever the number of comments.
+        queries = []
+        for moved in (roots[1:2], roots[2:]):
+            changes = [{"id": root["id"], "post": target} for root in moved]
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.patch(
+                    "/api/v1/comments/bulk/", changes, format="json"
+                )
+            self.assertEqual(response.status_code, 200)
+            queries.append(len(context))
+        self.assertEqual(queries[0], queries[1])
+
+        response = self.client.patch(
+            "/api/v1/comments/bulk/",
+            [{"id": roots[0]["id"], "post": target}],
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("post", response.json()[0])
+
+    def test_delete_posts(self):
+        ids = [post["id"] for post in self.create_posts(3).json()]
+        response = self.client.delete("/api/v1/posts/bulk/", ids[:2], format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(Post.objects.values_list("pk", flat=True)), ids[2:])
+        self.assertEqual(Package.objects.get(pk=self.packages[0].pk).post_count, 1)
+
+
+class ConditionalRequestTestCase(TestCase):
+    """
+    ETag and Last-Modified validators of posts and comments
+    """
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email="user@example.com", username="user"
+        )
+        package = Package.objects.create(title="django", version="5.1")
+        self.posts = [
+            Post.objects.create(
+                title=title, content="", author=self.author, package=package
+            )
+            for title in ("First", "Second")
+        ]
+        self.client = APIClient()
+
+    def get_etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.headers["ETag"]
+
+    def test_not_modified(self):
+        response = self.client.get("/api/v1/posts/")
+        self.assertNotIn("Last-Modified", response.headers)
+        # Validated with one aggregate, nothing serialized
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                "/api/v1/posts/", HTTP_IF_NONE_MATCH=response.headers["ETag"]
+            )
+        self.assertEqual(response.status_code, 304)
+
+        url = f"/api/v1/posts/{self.posts[0].pk}/"
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=self.get_etag(url))
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_changes_with_comments(self):
+        list_etag = self.get_etag("/api/v1/posts/")
+        url = f"/api/v1/posts/{self.posts[0].pk}/"
+        detail_etag = self.get_etag(url)
+
+        comment = Comment.objects.create(
+            post=self.posts[0], author=self.author, content="Hi"
+        )
+        self.assertNotEqual(self.get_etag("/api/v1/posts/"), list_etag)
+        self.assertNotEqual(self.get_etag(url), detail_etag)
+
+        list_etag = self.get_etag("/api/v1/posts/")
+        detail_etag = self.get_etag(url)
+        comment.delete()
+        self.assertNotEqual(self.get_etag("/api/v1/posts/"), list_etag)
+        self.assertNotEqual(self.get_etag(url), detail_etag)
+
+    def test_etag_changes_after_delete(self):
+        etag = self.get_etag("/api/v1/posts/")
+        # The oldest post carries neither the latest timestamp nor a counter.
+        self.posts[0].delete()
+        self.assertNotEqual(self.get_etag("/api/v1/posts/"), etag)
+
+    def test_etag_depends_on_the_query(self):
+        self.assertNotEqual(
+            self.get_etag("/api/v1/posts/"), self.get_etag("/api/v1/posts/?page_size=1")
+        )
+
+    def test_last_modified(self):
+        comment = Comment.objects.create(
+            post=self.posts[0], author=self.author, content="Hi"
+        )
+        url = f"/api/v1/comments/{comment.pk}/"
+        response = self.client.get(url)
+        last_modified = response.headers["Last-Modified"]
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        Comment.objects.filter(pk=comment.pk).update(
+            updated_at=comment.updated_at + timezone.timedelta(seconds=1)
+        )
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+
+
+class ThreadTestCase(TestCase):
+    """
+    Materialized path threads
+    """
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email="user@example.com", username="user"
+        )
+        package = Package.objects.create(title="django", version="5.1")
+        self.post, other_post = [
+            Post.objects.create(
+                title=title, content="", author=self.author, package=package
+            )
+            for title in ("Post", "Other")
+        ]
+        self.a = self.reply(None, "a")
+        self.a1 = self.reply(self.a, "a1")
+        self.a1x = self.reply(self.a1, "a1x")
+        self.a2 = self.reply(self.a, "a2")
+        self.b = self.reply(None, "b")
+        self.b1 = self.reply(self.b, "b1")
+        Comment.objects.create(post=other_post, author=self.author, content="other")
+        self.client = APIClient()
+
+    def reply(self, parent, content):
+        return Comment.objects.create(
+            post=self.post, author=self.author, parent=parent, content=content
+        )
+
+    def get_tree(self, node):
+        return {node["content"]: [self.get_tree(reply) for reply in node["replies"]]}
+
+    def test_path_and_depth(self):
+        self.assertEqual(self.a.path, Comment.get_path_segment(self.a.pk))
+        self.assertEqual(self.a.depth, 0)
+        self.assertEqual(
+            Comment.objects.get(pk=self.a1x.pk).path,
+            self.a.path
+            + Comment.get_path_segment(self.a1.pk)
+            + Comment.get_path_segment(self.a1x.pk),
+        )
+        self.assertEqual(self.a1x.depth, 2)
+
+    def test_subtree_range_query(self):
+        with self.assertNumQueries(1):
+            replies = list(thread_service.get_descendants([self.a]))
+        self.assertEqual(replies, [self.a1, self.a1x, self.a2])
+        replies = thread_service.get_descendants([self.a, self.b], depth=1)
+        self.assertEqual(list(replies), [self.a1, self.a2, self.b1])
+
+    def test_thread(self):
+        response = self.client.get("/api/v1/comments/thread/", {"post": self.post.pk})
+        self.assertEqual(
+            [self.get_tree(root) for root in response.json()["results"]],
+            [
+                {"a": [{"a1": [{"a1x": []}]}, {"a2": []}]},
+                {"b": [{"b1": []}]},
+            ],
+        )
+
+        response = self.client.get(
+            "/api/v1/comments/thread/",
+            {"post": self.post.pk, "depth": 1, "page_size": 1},
+        )
+        self.assertEqual(
+            [self.get_tree(root) for root in response.json()["results"]],
+            [{"a": [{"a1": []}, {"a2": []}]}],
+        )
+        response = self.client.get(response.json()["pagination"]["next"])
+        self.assertEqual(
+            [self.get_tree(root) for root in response.json()["results"]],
+            [{"b": [{"b1": []}]}],
+        )
+
+    def test_invalid_thread_params(self):
+        response = self.client.get("/api/v1/comments/thread/")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("post", response.json())
+        for depth in ("-1", "deep"):
+            response = self.client.get(
+                "/api/v1/comments/thread/", {"post": self.post.pk, "depth": depth}
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("depth", response.json())
+
+    def test_subtree(self):
+        response = self.client.get(f"/api/v1/comments/{self.a1.pk}/subtree/")
+        self.assertEqual(self.get_tree(response.json()), {"a1": [{"a1x": []}]})
+        response = self.client.get(
+            f"/api/v1/comments/{self.a.pk}/subtree/", {"depth": 0}
+        )
+        self.assertEqual(self.get_tree(response.json()), {"a": []})
+
+    def test_max_depth(self):
+        Comment.objects.filter(pk=self.a1x.pk).update(depth=Comment.MAX_DEPTH - 1)
+        item = {"post": self.post.pk, "author": self.author.pk, "content": "Too deep"}
+        response = self.client.post(
+            "/api/v1/comments/", {**item, "parent": self.a1x.pk}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("parent", response.json())
+
+        response = self.client.post(
+            "/api/v1/comments/", {**item, "parent": self.a1.pk}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["depth"], 2)
+
+
+class CounterTestCase(TestCase):
+    """
+    Denormalized post and comment counters
+    """
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email="user@example.com", username="user"
+        )
+        self.packages = [
+            Package.objects.create(title=title, version="1.0")
+            for title in ("django", "flask")
+        ]
+        self.posts = [
+            Post.objects.create(
+                title=f"Post {i}",
+                content="",
+                author=self.author,
+                package=self.packages[0],
+            )
+            for i in range(3)
+        ]
+        self.comments = [
+            Comment.objects.create(
+                post=self.posts[0], author=self.author, content=f"{i}"
+            )
+            for i in range(2)
+        ]
+        self.client = APIClient()
+
+    def get_counts(self):
+        return (
+            [
+                Package.objects.get(pk=package.pk).post_count
+                for package in self.packages
+            ],
+            [Post.objects.get(pk=post.pk).comment_count for post in self.posts[:2]],
+        )
+
+    def test_created_and_deleted(self):
+        self.assertEqual(self.get_counts(), ([3, 0], [2, 0]))
+        self.assertEqual(
+            Post.objects.get(pk=self.posts[0].pk).last_commented_at,
+            Comment.objects.get(pk=self.comments[1].pk).created_at,
+        )
+        self.comments[1].delete()
+        self.posts[2].delete()
+        self.assertEqual(self.get_counts(), ([2, 0], [1, 0]))
+        self.assertEqual(
+            Post.objects.get(pk=self.posts[0].pk).last_commented_at,
+            Comment.objects.get(pk=self.comments[0].pk).created_at,
+        )
+
+    def test_moved_post(self):
+        response = self.client.patch(
+            f"/api/v1/posts/{self.posts[0].pk}/",
+            {"package": self.packages[1].pk},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_counts()[0], [2, 1])
+
+        # Moving it back recounts both packages again
+        post = Post.objects.get(pk=self.posts[0].pk)
+        post.package = self.packages[0]
+        post.save()
+        self.assertEqual(self.get_counts()[0], [3, 0])
+
+    def test_moved_comment(self):
+        response = self.client.patch(
+            f"/api/v1/comments/{self.comments[1].pk}/",
+            {"post": self.posts[1].pk},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_counts()[1], [1, 1])
+        posts = Post.objects.in_bulk([post.pk for post in self.posts[:2]])
+        comments = Comment.objects.in_bulk([comment.pk for comment in self.comments])
+        self.assertEqual(
+            posts[self.posts[0].pk].last_commented_at,
+            comments[self.comments[0].pk].created_at,
+        )
+        self.assertEqual(
+            posts[self.posts[1].pk].last_commented_at,
+            comments[self.comments[1].pk].created_at,
+        )
+
+    def test_rebuild_counters(self):
+        Post.objects.update(comment_count=7, last_commented_at=None)
+        Package.objects.update(post_count=7)
+        self.assertEqual(counter_service.rebuild_post_counters([self.posts[0].pk]), 1)
+        self.assertEqual(counter_service.rebuild_package_counters(), 2)
+        self.assertEqual(self.get_counts(), ([3, 0], [2, 7]))
+        self.assertIsNotNone(Post.objects.get(pk=self.posts[0].pk).last_commented_at)
+        counter_service.rebuild_post_counters()
+        self.assertEqual(self.get_counts()[1], [2, 0])
@@ -1,8 +1,9 @@
 from django.contrib import admin
 
 
-from .models import Package, PackageSocial, Registry
+from .models import Package, PackageSocial, PackageVersion, Registry
 
 admin.site.register(Registry)
 admin.site.register(PackageSocial)
 admin.site.register(Package)
+admin.site.register(PackageVersion)
@@ -1,11 +1,23 @@
-from rest_framework import viewsets
-from rest_framework.filters import SearchFilter
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 
-from .serializers import PackageSerializer
+from src.core.mixins import CachedResponseMixin, ConditionalRequestMixin
+from src.core.utils.pagination import KeysetPagination
+from src.core.utils.versions import get_version_key
+from src.core.viewsets import ZenModelViewSet
+from src.user.authentication import StatelessJWTAuthentication
+
+from .serializers import PackageSerializer, PackageVersionSerializer
+from .services import version_service
+from .services.ingest_service import ingest_packages
 from .models import Package
 
 
-class PackageAPISet(viewsets.ModelViewSet):
+class PackageAPISet(CachedResponseMixin, ConditionalRequestMixin, ZenModelViewSet):
     """
     Model View Set for Packages
     """
@@ -13,7 +25,64 @@ class PackageAPISet(viewsets.ModelViewSet):
     serializer_class = PackageSerializer
     queryset = Package.objects.all()
     permission_classes = []
+    authentication_classes = (StatelessJWTAuthentication, SessionAuthentication)
     lookup_field = "pk"
     http_method_names = ("get", "post", "patch", "delete")
-    filter_backends = (SearchFilter,)
+    filter_backends = (SearchFilter, OrderingFilter)
     search_fields = ("title", "registry__title")
+    ordering_fields = ("id", "title", "post_count")
+    pagination_class = KeysetPagination
+    compiled_list = True
+    # Packages sharing registries are resolved together
+    create_many = True
+    ordering = ("-id",)
+    conditional_counters = ("post_count",)
+
+    # pylint: disable=unused-argument
+    @action(
+        detail=True,
+        methods=["get"],
+        filter_backends=(),
+        ordering=("-version_key", "-id"),
+    )
+    def versions(self, request, *args, **kwargs):
+        """
+        Releases of the package, highest first, within ``?min_version=`` and
+        ``?max_version=`` (both included)
+        """
+        bounds = {}
+        for name in ("min_version", "max_version"):
+            value = request.query_params.get(name)
+            if value is not None:
+                if not get_version_key(value):
+                    raise ValidationError(
+                        {name: "A valid PEP 440 version is required."}
+                    )
+                bounds[name] = value
+        versions = version_service.get_versions(self.get_object(), **bounds)
+        page = self.paginate_queryset(versions)
+        return self.get_paginated_response(
+            PackageVersionSerializer(page, many=True).data
+        )
+
+    # pylint: disable=unused-argument
+    @action(detail=False, methods=["post"], permission_classes=(IsAdminUser,))
+    def ingest(self, request, *args, **kwargs):
+        """
+        Upsert packages from the JSON lines feed of the request body, read as
+        a stream, with the throughput of every batch
+        """
+        batches = []
+        result = ingest_packages(
+            request.stream or (),
+            progress=lambda batch, _: batches.append(batch.as_dict()),
+        )
+        return Response(
+            {
+                **result.as_dict(),
+                "errors": [
+                    {"line": line, "reason": reason} for line, reason in result.skipped
+                ],
+                "batches": batches,
+            }
+        )
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PackagesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "src.packages"
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel,unused-import
+        from src.packages import signals  # noqa: F401
@@ -0,0 +1,49 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from src.packages.services.ingest_service import ingest_packages
+
+
+class Command(BaseCommand):
+    """
+    Ingest packages from a registry feed
+    """
+
+    help = (
+        "Upsert packages from a JSON lines feed (one object per line: registry, "
+        "title, version, description and socials), keyed on registry and title"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="JSON lines file, - for stdin")
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Rows upserted per transaction"
+        )
+
+    def progress(self, batch, result):
+        """
+        Throughput of one batch and the running totals
+        """
+        self.stdout.write(
+            f"{batch.rows} packages ({batch.created} created, {batch.updated} updated, "
+            f"{len(batch.skipped)} skipped) in {batch.seconds:.2f}s "
+            f"({batch.rate:.0f} packages/s), {result.rows} so far"
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if path == "-":
+            result = ingest_packages(sys.stdin, options["batch_size"], self.progress)
+        else:
+            with open(path, encoding="utf-8") as stream:
+                result = ingest_packages(stream, options["batch_size"], self.progress)
+        for line, reason in result.skipped:
+            self.stderr.write(f"Skipped line {line}: {reason}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Ingested {result.rows} packages ({result.created} created, "
+                f"{result.updated} updated) in {result.seconds:.1f}s "
+                f"({result.rate:.0f} packages/s)."
+            )
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("packages", "0002_package_cover_image_package_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="package",
+            name="post_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
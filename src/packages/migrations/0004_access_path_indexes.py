@@ -0,0 +1,59 @@
+# Generated by Django 5.1.1 on 2026-10-18 14:12
+
+from django.db import migrations, models
+
+TRIGRAM_INDEXES = {
+    "packages_package_title_trgm": "packages_package",
+    "packages_registry_title_trgm": "packages_registry",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # `title__icontains` renders as UPPER("title"::text) LIKE UPPER(...) on
+    # PostgreSQL, which only a trigram index on the same expression can serve.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX "{name}" ON "{table}" '
+            f'USING gin (UPPER("title"::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("packages", "0003_counters"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="package",
+            name="title",
+            field=models.CharField(
+                blank=True, db_index=True, max_length=255, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="registry",
+            name="title",
+            field=models.CharField(
+                blank=True, db_index=True, max_length=255, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="package",
+            index=models.Index(
+                fields=["-post_count", "-id"], name="packages_package_posts_idx"
+            ),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.1 on 2026-10-18 14:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("packages", "0004_access_path_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="package",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
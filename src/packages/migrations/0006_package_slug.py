@@ -0,0 +1,42 @@
+# Generated by Django 5.1.1 on 2026-10-18 14:40
+
+from django.db import migrations, models
+
+from src.core.utils.unique_slugify import get_unique_slugs
+
+
+def populate_slugs(apps, schema_editor):
+    Model = apps.get_model("packages", "package")
+    packages = list(Model.objects.only("pk", "title").order_by("pk"))
+    slugs = get_unique_slugs(
+        Model.objects.none(),
+        [package.title or "package" for package in packages],
+        slug_len=255,
+    )
+    for package, slug in zip(packages, slugs):
+        package.slug = slug
+    Model.objects.bulk_update(packages, ["slug"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("packages", "0005_package_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="package",
+            name="slug",
+            field=models.SlugField(
+                db_index=False, default="", editable=False, max_length=255
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="package",
+            name="slug",
+            field=models.SlugField(editable=False, max_length=255, unique=True),
+        ),
+    ]
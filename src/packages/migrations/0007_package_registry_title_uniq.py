@@ -0,0 +1,49 @@
+# Generated by Django 5.1.1 on 2026-10-18 14:55
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def rename_duplicate_titles(apps, schema_editor):
+    """
+    Suffix the titles shared within a registry with the package ids, all but
+    the oldest package's, so the constraint can be added without losing any
+    package (or their posts)
+    """
+    Package = apps.get_model("packages", "package")
+    max_length = Package._meta.get_field("title").max_length
+    duplicates = (
+        Package.objects.exclude(registry=None)
+        .exclude(title=None)
+        .values("registry_id", "title")
+        .annotate(total=Count("pk"))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        packages = Package.objects.filter(
+            registry_id=duplicate["registry_id"], title=duplicate["title"]
+        ).order_by("pk")
+        renamed = []
+        for package in packages[1:]:
+            suffix = f" #{package.pk}"
+            package.title = package.title[: max_length - len(suffix)] + suffix
+            renamed.append(package)
+        Package.objects.bulk_update(renamed, ["title"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("packages", "0006_package_slug"),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicate_titles, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="package",
+            constraint=models.UniqueConstraint(
+                fields=("registry", "title"),
+                name="packages_package_registry_title_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.1.1 on 2026-10-18 14:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+from src.core.utils.versions import get_version_key
+
+
+def record_current_versions(apps, schema_editor):
+    Package = apps.get_model("packages", "package")
+    PackageVersion = apps.get_model("packages", "packageversion")
+    PackageVersion.objects.bulk_create(
+        (
+            PackageVersion(
+                package_id=pk, version=version, version_key=get_version_key(version)
+            )
+            for pk, version in Package.objects.values_list("pk", "version").iterator()
+        ),
+        batch_size=1000,
+    )
+    Package.objects.update(
+        latest_version=Subquery(
+            PackageVersion.objects.filter(package=OuterRef("pk")).values("pk")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("packages", "0007_package_registry_title_uniq"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PackageVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.CharField(max_length=100)),
+                (
+                    "version_key",
+                    models.CharField(default="", editable=False, max_length=255),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "package",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="versions",
+                        to="packages.package",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="package",
+            name="latest_version",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="packages.packageversion",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="packageversion",
+            index=models.Index(
+                fields=["package", "version_key", "id"], name="packages_version_key_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="packageversion",
+            constraint=models.UniqueConstraint(
+                fields=("package", "version"), name="packages_version_package_uniq"
+            ),
+        ),
+        migrations.RunPython(record_current_versions, migrations.RunPython.noop),
+    ]
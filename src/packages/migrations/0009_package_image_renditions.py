@@ -0,0 +1,32 @@
+# Generated by Django 5.1.1 on 2026-10-18 15:06
+
+from django.db import migrations, models
+
+from src.core.utils.renditions import queue_existing_images
+
+
+def queue_package_images(apps, schema_editor):
+    queue_existing_images(apps, "packages", "package", ("image", "cover_image"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("packages", "0008_package_versions"),
+        ("core", "0003_image_renditions"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="package",
+            name="cover_image_renditions",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="package",
+            name="image_renditions",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(queue_package_images, migrations.RunPython.noop),
+    ]
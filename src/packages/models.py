@@ -1,9 +1,14 @@
+from functools import partial
+
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from src.core.utils.unique_slugify import save_unique, unique_slugify
+from src.core.utils.versions import get_version_key
+
 
 class Registry(models.Model):
-    title = models.CharField(max_length=255, null=True, blank=True)
+    title = models.CharField(max_length=255, null=True, blank=True, db_index=True)
     link = models.TextField(null=True, blank=True)
     logo = models.ImageField(upload_to="registry/", null=True, blank=True)
 
@@ -29,10 +34,87 @@ class PackageSocial(models.Model):
 
 
 class Package(models.Model):
-    title = models.CharField(max_length=255, null=True, blank=True)
+    title = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    slug = models.SlugField(max_length=255, unique=True, editable=False)
     description = models.TextField(null=True, blank=True)
     registry = models.ForeignKey(Registry, on_delete=models.SET_NULL, null=True)
     version = models.CharField(max_length=100)
     socials = models.ManyToManyField(PackageSocial)
+    latest_version = models.ForeignKey(
+        "PackageVersion",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+    )
     image = models.ImageField(upload_to="package_images/", null=True, blank=True)
     cover_image = models.ImageField(upload_to="cover_images/", null=True, blank=True)
+    # Made off the request by the ``render_images`` worker
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    cover_image_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """
+        Meta Class
+        """
+
+        indexes = [
+            models.Index(
+                fields=["-post_count", "-id"], name="packages_package_posts_idx"
+            ),
+        ]
+        constraints = [
+            # Key of the packages ingested from registry feeds
+            models.UniqueConstraint(
+                fields=["registry", "title"],
+                name="packages_package_registry_title_uniq",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        save = partial(super().save, *args, **kwargs)
+        if self.slug:
+            return save()
+        return save_unique(save, partial(unique_slugify, self, self.title or "package"))
+
+
+class PackageVersion(models.Model):
+    """
+    Release of a package
+
+    ``version_key`` (see ``get_version_key``) sorts like the parsed version,
+    so a package's latest release and version ranges are index lookups.
+    """
+
+    package = models.ForeignKey(
+        Package, on_delete=models.CASCADE, related_name="versions"
+    )
+    version = models.CharField(max_length=100)
+    version_key = models.CharField(max_length=255, editable=False, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        """
+        Meta Class
+        """
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["package", "version"], name="packages_version_package_uniq"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["package", "version_key", "id"], name="packages_version_key_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return self.version
+
+    def save(self, *args, **kwargs):
+        self.version_key = get_version_key(self.version)
+        return super().save(*args, **kwargs)
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from drf_writable_nested import WritableNestedModelSerializer
 
-from .models import Package, Registry, PackageSocial
-from src.core.fields import ZenModelSerializeIntegerField
+from .models import Package, PackageVersion, Registry, PackageSocial
+from src.core.fields import RenditionsField, ZenModelSerializeIntegerField
+from src.core.serializers import ZenListSerializer
 
 
 class RegistrySerializer(serializers.ModelSerializer):
@@ -33,6 +34,20 @@ class PackageSocialSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class PackageVersionSerializer(serializers.ModelSerializer):
+    """ "
+    Serializer for Package Version
+    """
+
+    class Meta:
+        """
+        Meta Class
+        """
+
+        model = PackageVersion
+        fields = ("id", "version", "created_at")
+
+
 class PackageSerializer(WritableNestedModelSerializer):
     """ "
     Serializer for Package
@@ -42,6 +57,9 @@ class PackageSerializer(WritableNestedModelSerializer):
         model=Registry, serializer=RegistrySerializer
     )
     socials = PackageSocialSerializer(many=True)
+    latest_version = PackageVersionSerializer(read_only=True)
+    image_renditions = RenditionsField(image_field="image")
+    cover_image_renditions = RenditionsField(image_field="cover_image")
 
     class Meta:
         """
@@ -50,3 +68,24 @@ class PackageSerializer(WritableNestedModelSerializer):
 
         model = Package
         fields = "__all__"
+        # The (registry, title) constraint keys ingested packages; both fields
+        # stay optional and are only checked together in ``validate``.
+        validators = []
+        list_serializer_class = ZenListSerializer
+        select_related = ("registry", "latest_version")
+        prefetch_related = ("socials",)
+
+    def validate(self, attrs):
+        registry = attrs.get("registry", getattr(self.instance, "registry", None))
+        title = attrs.get("title", getattr(self.instance, "title", None))
+        if registry is not None and title is not None:
+            packages = Package.objects.filter(registry=registry, title=title)
+            if self.instance is not None:
+                packages = packages.exclude(pk=self.instance.pk)
+            if packages.exists():
+                raise serializers.ValidationError(
+                    {
+                        "title": "A package with this title already exists in the registry."
+                    }
+                )
+        return super().validate(attrs)
@@ -0,0 +1,313 @@
+import json
+import time
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+
+from src.core.utils.bulk import chunked
+from src.core.utils.response_cache import invalidate_responses
+from src.core.utils.unique_slugify import get_unique_slugs, save_unique
+from src.packages.models import Package, PackageSocial, Registry, Social
+from src.packages.services import version_service
+
+# Package fields a feed row overwrites on an existing package
+UPDATE_FIELDS = ("description", "version", "updated_at")
+MAX_LENGTHS = {"registry": 255, "title": 255, "version": 100}
+
+
+@dataclass
+class IngestResult:
+    """
+    Outcome of an ingestion, or of one batch of it
+    """
+
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    skipped: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rate(self):
+        """
+        Rows ingested per second
+        """
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def update(self, other):
+        """
+        Add the outcome of one batch
+        """
+        self.rows += other.rows
+        self.created += other.created
+        self.updated += other.updated
+        self.skipped.extend(other.skipped)
+        self.seconds += other.seconds
+
+    def as_dict(self):
+        """
+        Summary of the result
+        """
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "skipped": len(self.skipped),
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rate),
+        }
+
+
+def read_feed(lines):
+    """
+    Stream the ``(line number, row)`` pairs of a JSON lines feed
+
+    Lines which aren't JSON objects give their error message instead of a row.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield number, f"invalid JSON: {exc}"
+            continue
+        yield number, row if isinstance(row, dict) else "not a JSON object"
+
+
+def clean_socials(socials):
+    """
+    Distinct ``(social, link)`` pairs of a row, ``None`` when invalid
+    """
+    pairs = {}
+    for social in socials:
+        if not isinstance(social, dict) or not social.get("link"):
+            return None
+        kind = social.get("social") or Social.WEBSITE
+        if kind not in Social.values:
+            return None
+        pairs[(kind, str(social["link"]))] = None
+    return list(pairs)
+
+
+def clean_row(row):
+    """
+    Normalized row, or the reason it can't be ingested
+    """
+    values = {}
+    for name, max_length in MAX_LENGTHS.items():
+        value = str(row.get(name) or "").strip()
+        if not value:
+            return f"missing {name}"
+        if len(value) > max_length:
+            return f"{name} too long"
+        values[name] = value
+    values["description"] = row.get("description")
+    if "socials" in row:
+        socials = clean_socials(row["socials"] or [])
+        if socials is None:
+            return "invalid socials"
+        values["socials"] = socials
+    return values
+
+
+def clean_rows(rows):
+    """
+    Normalize ``(line, row)`` pairs, keeping the last row of each
+    ``(registry, title)`` key
+
+    Returns the kept rows and the skipped ``(line, reason)`` pairs.
+    """
+    kept, skipped = {}, []
+    for line, row in rows:
+        row = clean_row(row) if isinstance(row, dict) else row
+        if isinstance(row, str):
+            skipped.append((line, row))
+        else:
+            key = (row["registry"], row["title"])
+            kept.pop(key, None)
+            kept[key] = row
+    return list(kept.values()), skipped
+
+
+class Ingestion:
+    """
+    Upserts packages from feed rows, batch by batch
+
+    Each batch runs a fixed number of queries whatever its size: registries,
+    socials and existing packages are looked up with one query each, missing
+    ones inserted with one ``bulk_create``, packages upserted on
+    ``(registry, title)`` with one ``INSERT ... ON CONFLICT DO UPDATE``,
+    their socials links diffed and written in bulk, and their versions
+    added to their history.
+
+    Needs a database returning the primary keys of bulk inserts (PostgreSQL,
+    SQLite 3.35+).
+    """
+
+    def __init__(self):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise ImproperlyConfigured(
+                "Package ingestion needs primary keys returned by bulk inserts."
+            )
+        self.registries = {}  # title: pk, kept across batches
+
+    def get_registries(self, titles):
+        """
+        Primary keys of the registries of ``titles``, created when missing
+        """
+        missing = set(titles) - set(self.registries)
+        if missing:
+            for pk, title in (
+                Registry.objects.filter(title__in=missing)
+                .order_by("-pk")
+                .values_list("pk", "title")
+            ):
+                self.registries[title] = pk  # the lowest pk wins
+            missing -= set(self.registries)
+        if missing:
+            created = Registry.objects.bulk_create(
+                Registry(title=title) for title in sorted(missing)
+            )
+            self.registries.update(
+                (registry.title, registry.pk) for registry in created
+            )
+        return self.registries
+
+    def get_socials(self, pairs):
+        """
+        Primary keys of the ``(social, link)`` pairs, created when missing
+        """
+        socials = {}
+        for pk, kind, link in (
+            PackageSocial.objects.filter(link__in={link for _, link in pairs})
+            .order_by("-pk")
+            .values_list("pk", "social", "link")
+        ):
+            socials[(kind, link)] = pk  # the lowest pk wins
+        missing = [pair for pair in pairs if pair not in socials]
+        if missing:
+            created = PackageSocial.objects.bulk_create(
+                PackageSocial(social=kind, link=link) for kind, link in missing
+            )
+            socials.update(
+                ((social.social, social.link), social.pk) for social in created
+            )
+        return socials
+
+    def upsert_packages(self, rows, registries):
+        """
+        Insert or update the packages of ``rows``
+
+        Returns the packages, in the order of the rows, and how many are new.
+        """
+        keys = [(registries[row["registry"]], row["title"]) for row in rows]
+        existing = {
+            (registry_id, title): slug
+            for registry_id, title, slug in Package.objects.filter(
+                registry_id__in={registry_id for registry_id, _ in keys},
+                title__in={title for _, title in keys},
+            ).values_list("registry_id", "title", "slug")
+        }
+        packages = [
+            Package(
+                registry_id=registry_id,
+                title=title,
+                slug=existing.get((registry_id, title), ""),
+                version=row["version"],
+                description=row["description"],
+            )
+            for (registry_id, title), row in zip(keys, rows)
+        ]
+        new = [package for package in packages if not package.slug]
+
+        def set_slugs():
+            slugs = get_unique_slugs(
+                Package.objects.all(), [package.title for package in new], slug_len=255
+            )
+            for package, slug in zip(new, slugs):
+                package.slug = slug
+
+        def upsert():
+            return Package.objects.bulk_create(
+                packages,
+                update_conflicts=True,
+                unique_fields=("registry", "title"),
+                update_fields=UPDATE_FIELDS,
+            )
+
+        save_unique(upsert, set_slugs)
+        return packages, len(new)
+
+    @staticmethod
+    def set_socials(packages, rows, socials):
+        """
+        Make the socials of each package those of its row (when it has some)
+        """
+        through = Package.socials.through
+        wanted = {
+            package.pk: {socials[pair] for pair in row["socials"]}
+            for package, row in zip(packages, rows)
+            if "socials" in row
+        }
+        if not wanted:
+            return
+        current = {}
+        stale = []
+        for pk, package_id, social_id in through.objects.filter(
+            package_id__in=wanted
+        ).values_list("pk", "package_id", "packagesocial_id"):
+            current.setdefault(package_id, set()).add(social_id)
+            if social_id not in wanted[package_id]:
+                stale.append(pk)
+        if stale:
+            through.objects.filter(pk__in=stale).delete()
+        through.objects.bulk_create(
+            [
+                through(package_id=package_id, packagesocial_id=social_id)
+                for package_id, social_ids in wanted.items()
+                for social_id in social_ids - current.get(package_id, set())
+            ],
+            ignore_conflicts=True,
+        )
+
+    def ingest_batch(self, rows):
+        """
+        Upsert one batch of ``(line, row)`` pairs in its own transaction
+        """
+        started = time.perf_counter()
+        rows, skipped = clean_rows(rows)
+        result = IngestResult(rows=len(rows), skipped=skipped)
+        if rows:
+            with transaction.atomic():
+                registries = self.get_registries({row["registry"] for row in rows})
+                pairs = dict.fromkeys(
+                    pair for row in rows for pair in row.get("socials", ())
+                )
+                socials = self.get_socials(list(pairs)) if pairs else {}
+                packages, result.created = self.upsert_packages(rows, registries)
+                self.set_socials(packages, rows, socials)
+                version_service.record_versions(packages)
+            result.updated = result.rows - result.created
+            invalidate_responses(Package)
+        result.seconds = time.perf_counter() - started
+        return result
+
+
+def ingest_packages(lines, batch_size=1000, progress=None):
+    """
+    Upsert packages from the lines of a JSON lines feed, ``batch_size`` rows
+    at a time
+
+    Every batch is written in its own transaction; ``progress`` is called with
+    the result of each batch and the running result.
+    """
+    result = IngestResult()
+    ingestion = Ingestion()
+    for batch in chunked(read_feed(lines), batch_size):
+        batch_result = ingestion.ingest_batch(batch)
+        result.update(batch_result)
+        if progress is not None:
+            progress(batch_result, result)
+    return result
@@ -0,0 +1,58 @@
+from django.db.models import OuterRef, Subquery
+
+from src.core.utils.versions import get_version_key
+from src.packages.models import Package, PackageVersion
+
+
+def get_versions(package, min_version=None, max_version=None):
+    """
+    Releases of ``package`` between ``min_version`` and ``max_version``
+    (both included), an index range on ``version_key``
+    """
+    versions = PackageVersion.objects.filter(package=package)
+    if min_version is not None:
+        versions = versions.filter(version_key__gte=get_version_key(min_version))
+    if max_version is not None:
+        versions = versions.filter(version_key__lte=get_version_key(max_version))
+    return versions
+
+
+def record_versions(packages):
+    """
+    Add the current ``version`` of each package to its history and point
+    ``latest_version`` at the highest one, with two queries
+    """
+    PackageVersion.objects.bulk_create(
+        [
+            PackageVersion(
+                package_id=package.pk,
+                version=package.version,
+                version_key=get_version_key(package.version),
+            )
+            for package in packages
+        ],
+        ignore_conflicts=True,
+    )
+    return refresh_latest_versions([package.pk for package in packages])
+
+
+def refresh_latest_versions(package_ids=None):
+    """
+    Point ``latest_version`` of the given packages (all packages by default)
+    at their highest release with one UPDATE
+
+    Reads only ever join the pointer; this is the one place looking for the
+    highest release, the last entry of each package in the version index.
+    """
+    packages = (
+        Package.objects.all()
+        if package_ids is None
+        else Package.objects.filter(pk__in=package_ids)
+    )
+    return packages.update(
+        latest_version=Subquery(
+            PackageVersion.objects.filter(package=OuterRef("pk"))
+            .order_by("-version_key", "-id")
+            .values("pk")[:1]
+        )
+    )
@@ -0,0 +1,119 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from src.core.utils.media import release_instance_files, release_replaced_files
+from src.core.utils.renditions import queue_renditions, release_renditions
+from src.core.utils.response_cache import invalidate_responses
+from src.packages.models import Package, PackageSocial, Registry
+from src.packages.services import version_service
+
+PACKAGE_IMAGES = ("image", "cover_image")
+
+
+def touch_packages(packages):
+    """
+    Bump ``updated_at`` of packages whose representation changed through a
+    related object and drop their cached responses
+    """
+    pks = list(packages.values_list("pk", flat=True))
+    if pks:
+        Package.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+        invalidate_responses(Package, pks)
+
+
+@receiver(post_save, sender=Package)
+@receiver(post_delete, sender=Package)
+def invalidate_package(sender, instance, **kwargs):
+    """
+    Drop the cached responses of a saved or deleted package
+    """
+    invalidate_responses(Package, [instance.pk])
+
+
+@receiver(post_save, sender=Package)
+def record_package_version(sender, instance, update_fields=None, **kwargs):
+    """
+    Keep the version history and latest version of a saved package
+    """
+    if update_fields is None or "version" in update_fields:
+        version_service.record_versions([instance])
+
+
+@receiver(pre_save, sender=Package)
+def release_replaced_package_images(sender, instance, **kwargs):
+    """
+    Images replaced by new uploads
+    """
+    release_replaced_files(instance, PACKAGE_IMAGES)
+
+
+@receiver(post_delete, sender=Package)
+def release_package_images(sender, instance, **kwargs):
+    """
+    Images and renditions of a deleted package
+    """
+    release_instance_files(instance, PACKAGE_IMAGES)
+    release_renditions(instance, PACKAGE_IMAGES)
+
+
+@receiver(pre_save, sender=Registry)
+def release_replaced_registry_logo(sender, instance, **kwargs):
+    """
+    Logo replaced by a new upload
+    """
+    release_replaced_files(instance, ("logo",))
+
+
+@receiver(post_delete, sender=Registry)
+def release_registry_logo(sender, instance, **kwargs):
+    """
+    Logo of a deleted registry
+    """
+    release_instance_files(instance, ("logo",))
+
+
+@receiver(post_save, sender=Package)
+def queue_package_renditions(sender, instance, update_fields=None, **kwargs):
+    """
+    Render new package and cover images off the request
+    """
+    queue_renditions(instance, PACKAGE_IMAGES, update_fields)
+
+
+@receiver(m2m_changed, sender=Package.socials.through)
+def touch_package_socials(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Socials added to or removed from packages
+    """
+    if reverse:
+        if action == "pre_clear":
+            touch_packages(Package.objects.filter(socials=instance))
+        elif action in ("post_add", "post_remove"):
+            touch_packages(Package.objects.filter(pk__in=pk_set))
+    elif action in ("post_add", "post_remove", "post_clear"):
+        touch_packages(Package.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=PackageSocial)
+@receiver(pre_delete, sender=PackageSocial)
+def touch_social_packages(sender, instance, **kwargs):
+    """
+    Social link of packages edited or deleted
+    """
+    touch_packages(Package.objects.filter(socials=instance))
+
+
+@receiver(post_save, sender=Registry)
+@receiver(pre_delete, sender=Registry)
+def touch_registry_packages(sender, instance, **kwargs):
+    """
+    Registry of packages edited or deleted
+    """
+    touch_packages(Package.objects.filter(registry=instance))
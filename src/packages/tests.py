@@ -1,3 +1,499 @@
-from django.test import TestCase
+import io
+import json
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from packaging.version import Version
+from PIL import Image
+
+from src.core.compiled import CompiledSerializer
+from src.core.models import ImageRendition, ImageRenditionStatus, StoredFile
+from src.core.utils import renditions
+from src.core.utils.versions import get_version_key
+
+from src.user.models import User
+
+from .models import Package, PackageSocial, Registry
+from .serializers import PackageSerializer
+from .services.ingest_service import ingest_packages
+
+
+class PackageAPISetQueryTestCase(TestCase):
+    """
+    Query count of the Package endpoints
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        registries = [Registry.objects.create(title=f"registry-{i}") for i in range(3)]
+        for i in range(20):
+            package = Package.objects.create(
+                title=f"package-{i}", version="1.0.0", registry=registries[i % 3]
+            )
+            package.socials.add(
+                PackageSocial.objects.create(link=f"https://github.com/{i}"),
+                PackageSocial.objects.create(link=f"https://{i}.example.com"),
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()
+
+    def test_list_query_count_is_flat(self):
+        small, data = self.count_queries("/api/v1/packages/?page_size=2")
+        self.assertEqual(len(data["results"]), 2)
+        large, data = self.count_queries("/api/v1/packages/?page_size=20")
+        self.assertEqual(len(data["results"]), 20)
+        self.assertEqual(small, large)
+        self.assertEqual(len(data["results"][0]["socials"]), 2)
+        self.assertIsNotNone(data["results"][0]["registry"]["title"])
+
+    def test_compiled_list_matches_serializer(self):
+        Package.objects.create(
+            title="no-registry", version="1.0.0", image="package_images/a.png"
+        )
+        queryset = Package.objects.order_by("id")
+        serializer = PackageSerializer(
+            queryset.select_related("registry", "latest_version").prefetch_related(
+                "socials"
+            ),
+            many=True,
+        )
+        compiled = CompiledSerializer.compile(PackageSerializer())
+        # Registries and latest versions are joined, socials prefetched
+        with self.assertNumQueries(2):
+            data = compiled.represent(compiled.get_queryset(queryset))
+        self.assertEqual(data, [dict(item) for item in serializer.data])
+
+    def test_retrieve_query_count(self):
+        package = Package.objects.first()
+        queries, data = self.count_queries(f"/api/v1/packages/{package.pk}/")
+        self.assertEqual(queries, 2)
+        self.assertEqual(data["registry"]["id"], package.registry_id)
+
+    def test_create_without_title_or_registry(self):
+        registry = Registry.objects.first()
+        for item in ({}, {"title": "untitled"}, {"registry": registry.pk}):
+            response = self.client.post(
+                "/api/v1/packages/",
+                {"version": "1.0", "socials": [], **item},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 201, response.json())
+
+    def test_duplicate_title_in_registry(self):
+        package = Package.objects.first()
+        item = {"version": "1.0", "socials": [], "title": package.title}
+        response = self.client.post(
+            "/api/v1/packages/",
+            {**item, "registry": package.registry_id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("title", response.json())
+
+        other = Registry.objects.exclude(pk=package.registry_id).first()
+        response = self.client.post(
+            "/api/v1/packages/", {**item, "registry": other.pk}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        response = self.client.patch(
+            f"/api/v1/packages/{package.pk}/",
+            {"description": "Same title"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_create_many_max_size(self):
+        items = [
+            {"title": f"new-{i}", "version": "1.0", "socials": []} for i in range(3)
+        ]
+        with self.settings(API_BULK_MAX_SIZE=2):
+            response = self.client.post("/api/v1/packages/", items, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Package.objects.filter(title__startswith="new-").exists())
+
+    def test_create_resolves_repeated_registries_once(self):
+        registries = list(Registry.objects.order_by("pk")[:2])
+        items = [
+            {
+                "title": f"new-{i}",
+                "version": "1.0.0",
+                "registry": registries[i % 2].pk,
+                "socials": [],
+            }
+            for i in range(6)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post("/api/v1/packages/", items, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [item["registry"]["id"] for item in response.json()],
+            [registry.pk for registry in registries] * 3,
+        )
+        registry_selects = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith('SELECT "packages_registry"')
+        ]
+        self.assertEqual(len(registry_selects), 1)
+
+    def test_cached_responses_are_invalidated(self):
+        package = Package.objects.first()
+        url = f"/api/v1/packages/{package.pk}/"
+        self.count_queries("/api/v1/packages/")
+        self.count_queries(url)
+        self.assertEqual(self.count_queries("/api/v1/packages/")[0], 0)
+        self.assertEqual(self.count_queries(url)[0], 0)
+
+        social = package.socials.first()
+        social.link = "https://example.org"
+        social.save()
+        queries, data = self.count_queries(url)
+        self.assertEqual(queries, 2)
+        self.assertIn("https://example.org", [item["link"] for item in data["socials"]])
+        self.assertNotEqual(self.count_queries("/api/v1/packages/")[0], 0)
+
+    def test_padded_lookup_is_invalidated(self):
+        package = Package.objects.first()
+        padded_url = f"/api/v1/packages/0{package.pk}/"
+        self.assertIsNone(self.count_queries(padded_url)[1]["description"])
+        package.description = "Updated"
+        package.save()
+        self.assertEqual(self.count_queries(padded_url)[1]["description"], "Updated")
+        response = self.client.get("/api/v1/packages/abc/")
+        self.assertEqual(response.status_code, 404)
+
+
+class IngestPackagesTestCase(TestCase):
+    """
+    Package ingestion from registry feeds
+    """
+
+    def feed(self, *rows):
+        return [json.dumps(row) for row in rows]
+
+    def test_upsert(self):
+        github = {"social": "github", "link": "https://github.com/django/django"}
+        site = {"link": "https://djangoproject.com"}
+        rows = [
+            {
+                "registry": "pypi",
+                "title": "django",
+                "version": "5.0",
+                "socials": [github],
+            },
+            {
+                "registry": "pypi",
+                "title": "flask",
+                "version": "3.0",
+                "socials": [github, site],
+            },
+        ]
+        # Registries, socials (lookup and insert), existing packages, slugs,
+        # upsert, existing and new links, versions and latest versions
+        with self.assertNumQueries(15):
+            result = ingest_packages(self.feed(*rows))
+        self.assertEqual((result.created, result.updated), (2, 0))
+        self.assertEqual(PackageSocial.objects.count(), 2)
+
+        rows[0].update(version="5.1", socials=[site])
+        result = ingest_packages(self.feed(rows[0], {"registry": "pypi"}, "nope"))
+        self.assertEqual((result.created, result.updated), (0, 1))
+        self.assertEqual(
+            result.skipped, [(2, "missing title"), (3, "not a JSON object")]
+        )
+
+        django = Package.objects.get(title="django")
+        self.assertEqual((django.version, django.slug), ("5.1", "django"))
+        self.assertEqual(
+            list(django.socials.values_list("link", flat=True)), [site["link"]]
+        )
+        self.assertEqual(Registry.objects.count(), 1)
+        self.assertEqual(PackageSocial.objects.count(), 2)
+
+    def test_api(self):
+        client = APIClient()
+        client.force_authenticate(
+            User.objects.create_user(email="a@example.com", is_staff=True)
+        )
+        body = "\n".join(
+            self.feed({"registry": "npm", "title": "react", "version": "18"})
+        )
+        response = client.post(
+            "/api/v1/packages/ingest/", body, content_type="application/x-ndjson"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["created"], 1)
+        self.assertEqual(len(response.json()["batches"]), 1)
+        self.assertTrue(
+            Package.objects.filter(registry__title="npm", title="react").exists()
+        )
+
+
+class PackageVersionTestCase(TestCase):
+    """
+    Version history and latest version of packages
+    """
+
+    def test_version_key_order(self):
+        versions = [
+            "1.0.dev1",
+            "1.0a1",
+            "1.0b2",
+            "1.0rc1",
+            "1.0",
+            "1.0.post1",
+            "1.0.1",
+            "1.2",
+            "1.10",
+            "2024.1",
+            "1!0.1",
+        ]
+        shuffled = versions[::-1]
+        self.assertEqual(
+            sorted(shuffled, key=get_version_key), sorted(shuffled, key=Version)
+        )
+        self.assertEqual(get_version_key("1.0"), get_version_key("1.0.0"))
+        self.assertEqual(get_version_key("not a version"), "")
+
+    def test_latest_version(self):
+        package = Package.objects.create(title="django", version="5.0")
+        for version in ("5.1", "4.2", "5.1rc1"):
+            package.version = version
+            package.save()
+        package.refresh_from_db()
+        self.assertEqual(package.latest_version.version, "5.1")
+        self.assertEqual(package.versions.count(), 4)
+
+        client = APIClient()
+        # List validators, packages joined with registries and latest versions,
+        # socials
+        with self.assertNumQueries(3):
+            data = client.get("/api/v1/packages/").json()["results"]
+        self.assertEqual(data[0]["latest_version"]["version"], "5.1")
+
+        response = client.get(
+            f"/api/v1/packages/{package.pk}/versions/",
+            {"min_version": "4.2.1", "max_version": "5.1"},
+        )
+        self.assertEqual(
+            [item["version"] for item in response.json()["results"]],
+            ["5.1", "5.1rc1", "5.0"],
+        )
+        response = client.get(
+            f"/api/v1/packages/{package.pk}/versions/", {"min_version": "x"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+def make_image(size=(800, 600), color="teal"):
+    """
+    PNG upload of a plain image
+    """
+    buffer = io.BytesIO()
+    Image.new("RGBA", size, color).save(buffer, "PNG")
+    return ContentFile(buffer.getvalue(), name="logo.png")
+
+
+class ImageRenditionTestCase(TestCase):
+    """
+    Renditions of package images made by the worker
+    """
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        cache.clear()
+
+    def test_new_image_is_rendered_off_the_request(self):
+        package = Package.objects.create(
+            title="pillow", version="1", image=make_image()
+        )
+        self.assertEqual(
+            package.image_renditions, {"source": package.image.name, "files": {}}
+        )
+        self.assertEqual(ImageRendition.objects.get().source, package.image.name)
+
+        self.assertEqual(renditions.drain(), (1, 1))
+        package.refresh_from_db()
+        files = package.image_renditions["files"]
+        self.assertEqual(set(files), {"thumbnail", "small", "large"})
+        self.assertTrue(files["small"]["webp"].startswith("objects/"))
+        with default_storage.open(files["thumbnail"]["webp"]) as stream:
+            self.assertEqual(Image.open(stream).size, (160, 160))
+        with default_storage.open(files["small"]["jpeg"]) as stream:
+            self.assertEqual(Image.open(stream).size, (480, 360))
+        with default_storage.open(files["large"]["jpeg"]) as stream:
+            self.assertEqual(Image.open(stream).size, (800, 600))
+
+        # Saving a rendered image queues nothing
+        package.description = "Imaging"
+        package.save()
+        self.assertEqual(renditions.drain(), (0, 0))
+        # Identical uploads share their renditions
+        other = Package.objects.create(
+            title="other", version="1", cover_image=make_image()
+        )
+        self.assertEqual(renditions.drain(), (1, 1))
+        other.refresh_from_db()
+        self.assertEqual(other.cover_image.name, package.image.name)
+        self.assertEqual(other.cover_image_renditions["files"], files)
+
+    def test_api_serves_rendition_urls(self):
+        package = Package.objects.create(
+            title="pillow", version="1", image=make_image()
+        )
+        client = APIClient()
+        data = client.get("/api/v1/packages/").json()["results"][0]
+        self.assertEqual(data["image_renditions"], {})
+
+        renditions.drain()
+        for data in (
+            client.get("/api/v1/packages/").json()["results"][0],
+            client.get(f"/api/v1/packages/{package.pk}/").json(),
+        ):
+            url = data["image_renditions"]["thumbnail"]["webp"]
+            self.assertTrue(url.startswith("http://testserver/media/objects/"))
+            self.assertEqual(data["cover_image_renditions"], {})
+
+    def test_replaced_and_removed_images(self):
+        package = Package.objects.create(
+            title="pillow", version="1", image=make_image()
+        )
+        package.image = make_image(color="red")
+        package.save()
+        self.assertEqual(renditions.drain(), (1, 1))
+        package.refresh_from_db()
+        self.assertEqual(package.image_renditions["source"], package.image.name)
+
+        package.image = None
+        package.save()
+        self.assertEqual(Package.objects.get().image_renditions, {})
+        job = ImageRendition.objects.get()
+        job.status = ImageRenditionStatus.PENDING
+        job.save()
+        self.assertEqual(renditions.drain(), (0, 1))
+        self.assertEqual(
+            ImageRendition.objects.get().status, ImageRenditionStatus.SKIPPED
+        )
+
+    def get_references(self, names):
+        references = dict(StoredFile.objects.values_list("name", "references"))
+        return {references.get(name, 0) for name in names}
+
+    def test_rendering_twice_keeps_one_reference(self):
+        package = Package.objects.create(
+            title="pillow", version="1", image=make_image()
+        )
+        other = Package.objects.create(title="other", version="1", image=make_image())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(renditions.drain(), (2, 2))
+        package.refresh_from_db()
+        names = renditions.get_rendition_names(package.image_renditions)
+        self.assertEqual(len(names), 6)
+        # Each rendition is referenced by both packages
+        self.assertEqual(self.get_references(names), {2})
+
+        # Rendering the same image again releases the previous renditions
+        ImageRendition.objects.filter(object_id=package.pk).update(
+            status=ImageRenditionStatus.PENDING
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(renditions.drain(), (1, 1))
+        self.assertEqual(self.get_references(names), {2})
+
+        # Renditions of an image replaced while rendering are released
+        ImageRendition.objects.filter(object_id=package.pk).update(
+            status=ImageRenditionStatus.PENDING
+        )
+        render_source = renditions.render_source
+
+        def render_replaced(source, storage):
+            files = render_source(source, storage)
+            Package.objects.filter(pk=package.pk).update(image="package_images/new.png")
+            return files
+
+        with mock.patch.object(renditions, "render_source", render_replaced):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(renditions.drain(), (0, 1))
+        self.assertEqual(self.get_references(names), {2})
+        self.assertEqual(
+            ImageRendition.objects.get(object_id=package.pk).status,
+            ImageRenditionStatus.SKIPPED,
+        )
+
+        other.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertEqual(self.get_references(names), {1})
+
+    def test_invalid_image_fails_once(self):
+        Package.objects.create(
+            title="broken",
+            version="1",
+            image=ContentFile(b"not an image", name="a.png"),
+        )
+        self.assertEqual(renditions.drain(), (0, 1))
+        job = ImageRendition.objects.get()
+        self.assertEqual(job.status, ImageRenditionStatus.FAILED)
+        self.assertIn("UnidentifiedImageError", job.last_error)
+
+
+class RegistryTitleMigrationTestCase(TransactionTestCase):
+    """
+    Packages sharing a title within a registry before the unique constraint
+    """
+
+    before = [("packages", "0006_package_slug")]
+    after = [("packages", "0007_package_registry_title_uniq")]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_duplicate_titles_are_renamed(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        apps = executor.loader.project_state(self.before).apps
+        OldRegistry = apps.get_model("packages", "Registry")
+        OldPackage = apps.get_model("packages", "Package")
+        registry = OldRegistry.objects.create(title="pypi")
+        ids = [
+            OldPackage.objects.create(
+                title="django", slug=f"django-{i}", version="1", registry=registry
+            ).pk
+            for i in range(3)
+        ]
+        OldPackage.objects.create(title="django", slug="django", version="1")
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+        apps = executor.loader.project_state(self.after).apps
+        titles = dict(
+            apps.get_model("packages", "Package").objects.values_list("pk", "title")
+        )
+        self.assertEqual(
+            [titles[pk] for pk in ids],
+            ["django", f"django #{ids[1]}", f"django #{ids[2]}"],
+        )
+        self.assertEqual(len(titles), 4)
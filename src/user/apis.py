@@ -1,13 +1,10 @@
 import base64
-from smtplib import SMTPException
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.sites.shortcuts import get_current_site
-from django.core.mail import send_mail
 from django.db.models.query_utils import Q
-from django.http import BadHeaderError
 from django.template.loader import render_to_string
 from django.utils.encoding import force_bytes, force_str
 from rest_framework import generics, status, viewsets
@@ -16,10 +13,22 @@ from rest_framework.filters import SearchFilter
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from src.core.mixins import SparseFieldsMixin
+from src.core.utils.outbox import enqueue_email
+from src.core.utils.streaming import (
+    CHUNK_SIZE,
+    get_output_format,
+    get_serializer_fields,
+    streaming_response,
+)
+from src.user.authentication import revoke_token
 from src.user.models import Profile, User
 
-from .serializers import (PasswordResetRequestSerializer,
+from .serializers import (LogoutSerializer, PasswordResetRequestSerializer,
                           PasswordResetSerializer, ProfileSerializer,
                           RegisterUserSerializer, UserSerializer)
 
@@ -63,32 +72,11 @@ class PasswordResetRequestView(APIView):
                 "protocol": "http",
             }
             email = render_to_string(email_template_name, context)
-
-            try:
-                send_mail(
-                    subject,
-                    email,
-                    settings.EMAIL_HOST_USER,
-                    [user.email],
-                    fail_silently=False,
-                )
-                return Response(
-                    {"message": "Email sent successfully."},
-                    status=status.HTTP_200_OK,
-                )
-
-            except BadHeaderError:
-                print("Invalid header found.")
-            except SMTPException:
-                return Response(
-                    {"message": "Failed to sent email."},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                )
-            except Exception:
-                return Response(
-                    {"message": "Failed to sent email."},
-                    status=status.HTTP_412_PRECONDITION_FAILED,
-                )
+            enqueue_email(subject, email, [user.email], settings.EMAIL_HOST_USER)
+            return Response(
+                {"message": "Email sent successfully."},
+                status=status.HTTP_200_OK,
+            )
 
         else:
             return Response(
@@ -146,7 +134,7 @@ def password_reset_confirm(request, uidb64, token):
     return Response({"message": "Token Invalid"}, status=status.HTTP_403_FORBIDDEN)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     """
     Model View Set for User Model
     """
@@ -225,16 +213,28 @@ class ProfileViewSet(viewsets.ModelViewSet):
 
 class GetAllUser(generics.ListAPIView):
     """
-    Get All User
+    Get All User, streamed as a JSON array, NDJSON or CSV (``?output=``)
     """
 
     pagination_class = None
     http_method_names = ("get",)
     serializer_class = UserSerializer
-    queryset = User.objects.all()
+    queryset = User.objects.select_related("profile")
     lookup_field = "username"
     permission_classes = [IsAuthenticated, IsAdminUser]
 
+    def list(self, request, *args, **kwargs):
+        output = get_output_format(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        rows = (
+            serializer.to_representation(user)
+            for user in queryset.iterator(chunk_size=CHUNK_SIZE)
+        )
+        return streaming_response(
+            rows, output, filename="users", fields=get_serializer_fields(serializer)
+        )
+
 
 class RegisterUser(generics.CreateAPIView):
 
@@ -243,3 +243,30 @@ class RegisterUser(generics.CreateAPIView):
 
     def post(self, request, *args, **kwargs):
         return super().post(request, *args, **kwargs)
+
+
+class LogoutApi(generics.GenericAPIView):
+    """
+    Revoke the access token of the request and the given refresh token
+    """
+
+    serializer_class = LogoutSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """
+        Post Method
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        refresh = serializer.validated_data.get("refresh")
+        if refresh:
+            try:
+                revoke_token(RefreshToken(refresh))
+            except TokenError as exc:
+                return Response(
+                    {"refresh": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST
+                )
+        if request.auth is not None and api_settings.JTI_CLAIM in request.auth:
+            revoke_token(request.auth)
+        return Response({"message": "Logged out."}, status=status.HTTP_200_OK)
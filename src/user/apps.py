@@ -6,3 +6,7 @@ class AccountConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "src.user"
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel,unused-import
+        from src.user import signals  # noqa: F401
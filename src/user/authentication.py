@@ -0,0 +1,197 @@
+import time
+
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from src.user.models import User
+from src.user.services import permission_service
+
+PERM_VERSION_CLAIM = "perm_version"
+REVOKED_TOKEN_KEY = "revoked-token:{}"
+
+
+def add_user_claims(token, user):
+    """
+    Embed what the stateless authentication needs to know about ``user``
+    """
+    token["username"] = user.username
+    token["is_active"] = user.is_active
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+    token[PERM_VERSION_CLAIM] = permission_service.get_user_version(user.pk)
+    return token
+
+
+def revoke_token(token):
+    """
+    Reject ``token`` until it expires
+    """
+    timeout = max(int(token["exp"] - time.time()), 1)
+    cache.set(REVOKED_TOKEN_KEY.format(token[api_settings.JTI_CLAIM]), True, timeout)
+
+
+def is_token_revoked(token):
+    """
+    Whether ``token`` has been revoked
+    """
+    jti = token.get(api_settings.JTI_CLAIM)
+    return jti is not None and cache.get(REVOKED_TOKEN_KEY.format(jti)) is not None
+
+
+class LazyTokenUser(TokenUser):
+    """
+    User backed by the claims of an access token
+
+    The ``User`` row is only loaded (as ``instance``) the first time a view
+    reads something the token doesn't carry; permission checks read the
+    cached permission snapshot.
+    """
+
+    def __init__(self, token, instance=None):
+        super().__init__(token)
+        if instance is not None:
+            self.__dict__["instance"] = instance
+
+    @cached_property
+    def instance(self):
+        """
+        ``User`` of the token
+        """
+        try:
+            return User.objects.get(pk=self.pk)
+        except User.DoesNotExist as exc:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            ) from exc
+
+    def get_claim(self, name, default):
+        """
+        Claim of the token, or the loaded user's attribute once loaded
+        """
+        if "instance" in self.__dict__:
+            return getattr(self.instance, name)
+        return self.token.get(name, default)
+
+    @property
+    def username(self):
+        return self.get_claim("username", "")
+
+    @property
+    def is_active(self):
+        return self.get_claim("is_active", True)
+
+    @property
+    def is_staff(self):
+        return self.get_claim("is_staff", False)
+
+    @property
+    def is_superuser(self):
+        return self.get_claim("is_superuser", False)
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.instance, attr)
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenUser, User)):
+            return str(self.pk) == str(other.pk)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self.pk))
+
+    def __str__(self):
+        return str(self.instance)
+
+    @property
+    def groups(self):
+        return self.instance.groups
+
+    @property
+    def user_permissions(self):
+        return self.instance.user_permissions
+
+    def save(self, *args, **kwargs):
+        return self.instance.save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self.instance.delete(*args, **kwargs)
+
+    def set_password(self, raw_password):
+        return self.instance.set_password(raw_password)
+
+    def check_password(self, raw_password):
+        return self.instance.check_password(raw_password)
+
+    def get_all_permissions(self, obj=None):
+        if obj is not None:
+            return self.instance.get_all_permissions(obj)
+        if not self.is_active:
+            return set()
+        return set(permission_service.get_snapshot(self).perms)
+
+    def has_perm(self, perm, obj=None):
+        if obj is not None:
+            return self.instance.has_perm(perm, obj)
+        return permission_service.has_perm(self, perm)
+
+    def has_perms(self, perm_list, obj=None):
+        return all(self.has_perm(perm, obj) for perm in perm_list)
+
+    def has_module_perms(self, module):
+        if not self.is_active:
+            return False
+        if self.is_superuser:
+            return True
+        prefix = f"{module}."
+        return any(
+            perm.startswith(prefix)
+            for perm in permission_service.get_snapshot(self).perms
+        )
+
+
+class RevocableJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` rejecting revoked (logged out) tokens
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_token_revoked(validated_token):
+            raise InvalidToken(_("Token has been revoked"))
+        return validated_token
+
+
+class StatelessJWTAuthentication(RevocableJWTAuthentication):
+    """
+    JWT authentication without the per-request user lookup
+
+    Authenticated users are ``LazyTokenUser`` built from the token's claims.
+    Tokens issued before the user's permission version changed (flags edited,
+    groups or permissions changed) fall back to loading the user, which is
+    then checked like ``JWTAuthentication`` does. Revoked tokens are rejected.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from exc
+
+        perm_version = permission_service.get_user_version(user_id)
+        if validated_token.get(PERM_VERSION_CLAIM) == perm_version:
+            return LazyTokenUser(validated_token)
+
+        # The claims may be stale: check the user like JWTAuthentication does.
+        instance = super().get_user(validated_token)
+        if not api_settings.USER_AUTHENTICATION_RULE(instance):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return LazyTokenUser(validated_token, instance)
@@ -0,0 +1,83 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from src.user.models import User
+from src.user.services.import_service import import_users
+
+
+class Rollback(Exception):
+    """
+    Discard the benchmark's rows
+    """
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the bulk user import
+    """
+
+    help = (
+        "Time import_users on generated rows against create_user on a sample, "
+        "rolling everything back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument(
+            "--baseline-rows",
+            type=int,
+            default=200,
+            help=(
+                "Rows created one at a time with create_user, extrapolated to --rows "
+                "(create_user always hashes a password, even a generated one)"
+            ),
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument(
+            "--passwords", action="store_true", help="Give every row a password to hash"
+        )
+
+    def get_rows(self, count, prefix, passwords):
+        for i in range(count):
+            yield {
+                "email": f"{prefix}-{i}@benchmark.invalid",
+                "password": f"password-{i}" if passwords else "",
+                "full_name": f"User {i}",
+            }
+
+    def measure(self, function):
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                function()
+                raise Rollback
+        except Rollback:
+            pass
+        return time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        rows, baseline_rows = options["rows"], options["baseline_rows"]
+
+        def baseline():
+            for row in self.get_rows(baseline_rows, "baseline", options["passwords"]):
+                User.objects.create_user(row["email"], row["password"] or None)
+
+        def bulk():
+            import_users(
+                self.get_rows(rows, "bulk", options["passwords"]),
+                chunk_size=options["chunk_size"],
+                workers=options["workers"],
+            )
+
+        baseline_time = self.measure(baseline) * rows / max(baseline_rows, 1)
+        bulk_time = self.measure(bulk)
+        self.stdout.write(f"create_user (extrapolated): {baseline_time:.1f}s")
+        self.stdout.write(
+            f"import_users: {bulk_time:.1f}s ({rows / bulk_time:.0f} users/s)"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Speedup: {baseline_time / bulk_time:.1f}x")
+        )
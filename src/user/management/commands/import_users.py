@@ -0,0 +1,56 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from src.user.services.import_service import import_users, open_rows
+
+
+class Command(BaseCommand):
+    """
+    Bulk import users
+    """
+
+    help = (
+        "Create users and profiles from a CSV or JSON lines file (columns: email, "
+        "username, password, is_staff, is_active and the profile fields)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON lines file")
+        parser.add_argument(
+            "--format", choices=("csv", "jsonl"), help="Defaults to the file extension"
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000, help="Rows inserted per transaction"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processes hashing passwords",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        def progress(result):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{result.created} users created, {len(result.skipped)} skipped "
+                f"({result.created / elapsed:.0f} users/s)"
+            )
+
+        result = import_users(
+            open_rows(options["path"], options["format"]),
+            chunk_size=options["chunk_size"],
+            workers=options["workers"],
+            progress=progress,
+        )
+        for email, reason in result.skipped:
+            self.stderr.write(f"Skipped {email or '<no email>'}: {reason}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.created} users in {time.perf_counter() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-18 15:06
+
+from django.db import migrations, models
+
+from src.core.utils.renditions import queue_existing_images
+
+
+def queue_avatars(apps, schema_editor):
+    queue_existing_images(apps, "user", "profile", ("avatar",))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0005_remove_profile_professions_delete_profession"),
+        ("core", "0003_image_renditions"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="avatar_renditions",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(queue_avatars, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,15 @@
 import secrets
 import string
+from functools import partial
 
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from safedelete.models import SafeDeleteModel
 
+from src.core.utils.unique_slugify import generate_unique_values, save_unique
 from src.user.manager import CustomAccountManager
+from src.user.services import permission_service
 
 
 def generate_random_username(length=8):
@@ -48,16 +51,30 @@ class User(AbstractBaseUser, SafeDeleteModel, PermissionsMixin):
 
         ordering = ["created_on"]
 
+    def has_perm(self, perm, obj=None):
+        """
+        Model level permissions are read from the cached permission snapshot
+        """
+        if obj is None:
+            return permission_service.has_perm(self, perm)
+        return super().has_perm(perm, obj)
+
     def save(self, keep_deleted=False, **kwargs):
-        if not self.username:
-            self.username = self.generate_unique_username()
-        return super().save(keep_deleted, **kwargs)
-    
+        save = partial(super().save, keep_deleted, **kwargs)
+        if self.username:
+            return save()
+        return save_unique(save, self.set_unique_username)
+
+    def set_unique_username(self):
+        """
+        Set a random username no user has
+        """
+        self.username = self.generate_unique_username()
+
     def generate_unique_username(self):
-        username = generate_random_username()
-        while self.__class__.objects.filter(username=username).exists():
-            username = generate_random_username()
-        return username
+        return generate_unique_values(
+            generate_random_username, self.__class__.all_objects.all(), "username"
+        )[0]
 
 
 class GenderChoices(models.TextChoices):
@@ -93,6 +110,8 @@ class Profile(models.Model):
     avatar = models.ImageField(
         upload_to=get_upload_path_for_avatar, null=True, blank=True
     )
+    # Made off the request by the ``render_images`` worker
+    avatar_renditions = models.JSONField(default=dict, blank=True, editable=False)
     created_on = models.DateTimeField(auto_now_add=True)
     modified_on = models.DateTimeField(auto_now=True)
     is_staff = models.BooleanField(default=False)
@@ -3,9 +3,21 @@ import copy
 from django.contrib.auth.models import Group, Permission
 from drf_writable_nested import WritableNestedModelSerializer
 from rest_framework import serializers
-
-from src.core.fields import ModelIdField
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from src.core.fields import ModelIdField, RenditionsField
+from src.user.authentication import (
+    PERM_VERSION_CLAIM,
+    add_user_claims,
+    is_token_revoked,
+)
 from src.user.models import Profile, User
+from src.user.services import permission_service
 
 
 class PermissionListSerializer(serializers.Serializer):
@@ -25,6 +37,53 @@ class UserPermissionSerializer(serializers.Serializer):
     user = ModelIdField(model_field=User)
 
 
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Serializer for Token Pair carrying the claims of the stateless authentication
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Serializer for Token Refresh rejecting revoked refresh tokens
+
+    Access tokens refreshed after the user's permission version changed get
+    fresh claims.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if is_token_revoked(refresh):
+            raise InvalidToken("Token has been revoked")
+
+        data = super().validate(attrs)
+        user_id = refresh.get(api_settings.USER_ID_CLAIM)
+        if refresh.get(PERM_VERSION_CLAIM) != permission_service.get_user_version(
+            user_id
+        ):
+            user = User.objects.filter(pk=user_id).first()
+            if (
+                user is None
+                or not user.is_active
+                or not api_settings.USER_AUTHENTICATION_RULE(user)
+            ):
+                raise AuthenticationFailed("User is inactive", code="user_inactive")
+            data["access"] = str(add_user_claims(refresh.access_token, user))
+        return data
+
+
+class LogoutSerializer(serializers.Serializer):
+    """
+    Serializer for Logout
+    """
+
+    refresh = serializers.CharField(required=False)
+
+
 class PasswordResetRequestSerializer(serializers.Serializer):
     """
     Serializer for Password Reset Request
@@ -52,6 +111,8 @@ class ProfileSerializer(serializers.ModelSerializer):
     Serializer for Profile
     """
 
+    avatar_renditions = RenditionsField(image_field="avatar")
+
     class Meta:
         """
         Meta Class
@@ -0,0 +1,268 @@
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from src.core.utils.bulk import chunked
+from src.core.utils.unique_slugify import generate_unique_values
+from src.user.models import GenderChoices, Profile, User, generate_random_username
+
+PROFILE_FIELDS = (
+    "full_name",
+    "phone",
+    "secondary_email",
+    "mobile",
+    "address",
+    "gender",
+    "birth_date",
+)
+TRUE_VALUES = ("1", "true", "yes", "y", "t")
+# Passwords sent to a hashing process at a time
+HASH_CHUNK_SIZE = 16
+
+
+@dataclass
+class ImportResult:
+    """
+    Outcome of an import
+    """
+
+    created: int = 0
+    skipped: list = field(default_factory=list)
+
+    def update(self, other):
+        """
+        Add the outcome of one chunk
+        """
+        self.created += other.created
+        self.skipped.extend(other.skipped)
+
+
+def read_rows(stream, fmt):
+    """
+    Stream rows (dicts) of a CSV or JSON lines file
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def open_rows(path, fmt=None):
+    """
+    Open ``path`` and stream its rows, guessing the format from the extension
+    """
+    fmt = fmt or ("csv" if path.endswith(".csv") else "jsonl")
+    with open(path, encoding="utf-8", newline="") as stream:
+        yield from read_rows(stream, fmt)
+
+
+def to_bool(value, default=False):
+    """
+    Boolean of a CSV or JSON value
+    """
+    if value in (None, ""):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def hash_password(password):
+    """
+    Hash one password (unusable when empty)
+    """
+    return make_password(password or None)
+
+
+def get_pool(workers):
+    """
+    Process pool hashing passwords, ``None`` to hash in this process
+    """
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, initializer=django.setup)
+
+
+def hash_passwords(passwords, pool=None):
+    """
+    Hash ``passwords`` in order, across ``pool`` when given
+
+    Empty passwords are cheap to make unusable and stay in this process.
+    """
+    hashed = [hash_password(None) if not password else None for password in passwords]
+    indexes = [i for i, password in enumerate(passwords) if password]
+    values = [passwords[i] for i in indexes]
+    if pool is None:
+        values = map(hash_password, values)
+    else:
+        values = pool.map(hash_password, values, chunksize=HASH_CHUNK_SIZE)
+    for i, value in zip(indexes, values):
+        hashed[i] = value
+    return hashed
+
+
+def is_valid_email(email):
+    """
+    Whether ``email`` is a valid email address
+    """
+    try:
+        validate_email(email)
+    except ValidationError:
+        return False
+    return True
+
+
+def clean_profile(row):
+    """
+    Profile values of a row, or the reason they can't be imported
+    """
+    values = {name: row.get(name) or None for name in PROFILE_FIELDS}
+    values["full_name"] = values["full_name"] or ""
+    for name, value in values.items():
+        max_length = Profile._meta.get_field(name).max_length
+        if isinstance(value, str) and max_length and len(value) > max_length:
+            return f"{name} too long"
+    if values["secondary_email"] and not is_valid_email(values["secondary_email"]):
+        return "invalid secondary_email"
+    if values["gender"] and values["gender"] not in GenderChoices.values:
+        return "invalid gender"
+    if values["birth_date"]:
+        try:
+            values["birth_date"] = parse_date(str(values["birth_date"]))
+        except ValueError:
+            values["birth_date"] = None
+        if values["birth_date"] is None:
+            return "invalid birth_date"
+    return values
+
+
+def clean_rows(rows, seen_emails, seen_usernames):
+    """
+    Normalize and validate ``rows``, skipping invalid ones and duplicates of
+    earlier rows or of existing users
+
+    Returns the kept rows (with their profile values under ``"profile"``) and
+    the skipped ``(email, reason)`` pairs.
+    """
+    username_length = User._meta.get_field("username").max_length
+    kept, skipped = [], []
+    for row in rows:
+        email = User.objects.normalize_email((row.get("email") or "").strip())
+        username = (row.get("username") or "").strip()
+        profile = clean_profile(row)
+        if not email:
+            skipped.append((email, "missing email"))
+        elif not is_valid_email(email):
+            skipped.append((email, "invalid email"))
+        elif len(username) > username_length:
+            skipped.append((email, "username too long"))
+        elif isinstance(profile, str):
+            skipped.append((email, profile))
+        elif email in seen_emails:
+            skipped.append((email, "duplicate email"))
+        elif username and username in seen_usernames:
+            skipped.append((email, "duplicate username"))
+        else:
+            seen_emails.add(email)
+            if username:
+                seen_usernames.add(username)
+            kept.append(
+                {**row, "email": email, "username": username, "profile": profile}
+            )
+
+    existing_emails = set(
+        User.all_objects.filter(email__in=[row["email"] for row in kept]).values_list(
+            "email", flat=True
+        )
+    )
+    existing_usernames = set(
+        User.all_objects.filter(
+            username__in=[row["username"] for row in kept if row["username"]]
+        ).values_list("username", flat=True)
+    )
+    rows, kept = kept, []
+    for row in rows:
+        if row["email"] in existing_emails:
+            skipped.append((row["email"], "email exists"))
+        elif row["username"] in existing_usernames:
+            skipped.append((row["email"], "username exists"))
+        else:
+            kept.append(row)
+    return kept, skipped
+
+
+def build_profile(row):
+    """
+    Unsaved ``Profile`` of a cleaned row
+    """
+    return Profile(**row["profile"])
+
+
+def import_chunk(rows, pool=None, seen_emails=None, seen_usernames=None):
+    """
+    Create the users (and profiles) of one chunk of rows
+
+    Runs a handful of queries per chunk whatever its size: existing emails and
+    usernames, generated usernames, and one insert each for profiles and users.
+    """
+    seen_emails = set() if seen_emails is None else seen_emails
+    seen_usernames = set() if seen_usernames is None else seen_usernames
+    rows, skipped = clean_rows(rows, seen_emails, seen_usernames)
+    passwords = hash_passwords([row.get("password") or "" for row in rows], pool)
+    usernames = iter(
+        generate_unique_values(
+            generate_random_username,
+            User.all_objects.all(),
+            "username",
+            count=sum(1 for row in rows if not row["username"]),
+            taken=seen_usernames,
+        )
+    )
+
+    with transaction.atomic():
+        profiles = Profile.objects.bulk_create([build_profile(row) for row in rows])
+        User.objects.bulk_create(
+            [
+                User(
+                    email=row["email"],
+                    username=row["username"] or next(usernames),
+                    password=password,
+                    is_staff=to_bool(row.get("is_staff")),
+                    is_active=to_bool(row.get("is_active"), default=True),
+                    profile=profile,
+                )
+                for row, password, profile in zip(rows, passwords, profiles)
+            ]
+        )
+    return ImportResult(created=len(rows), skipped=skipped)
+
+
+def import_users(rows, chunk_size=1000, workers=1, progress=None):
+    """
+    Create users from an iterable of rows, ``chunk_size`` rows at a time
+
+    Every chunk is inserted in its own transaction; ``progress`` is called
+    with the running result after each one.
+    """
+    result = ImportResult()
+    seen_emails, seen_usernames = set(), set()
+    pool = get_pool(workers)
+    try:
+        for chunk in chunked(rows, chunk_size):
+            result.update(import_chunk(chunk, pool, seen_emails, seen_usernames))
+            if progress is not None:
+                progress(result)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return result
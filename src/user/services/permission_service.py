@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db.models import Q
+
+from src.core.utils.response_cache import bump_versions, get_versions
+
+PERMISSIONS_VERSION = "permissions"
+SNAPSHOT_KEY = "permissions:{}:{}"
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+
+@dataclass(frozen=True)
+class PermissionSnapshot:
+    """
+    Permissions of a user (own and through groups) at a given version
+    """
+
+    versions: tuple
+    perms: frozenset
+    entries: tuple
+
+
+def get_user_version_key(user_pk):
+    """
+    Version key of the permissions of one user
+    """
+    return f"{PERMISSIONS_VERSION}:{user_pk}"
+
+
+def get_user_version(user_pk):
+    """
+    Current version of the permissions of one user
+    """
+    return get_versions(get_user_version_key(user_pk))[0]
+
+
+def build_snapshot(user, versions=()):
+    """
+    Load the permissions of ``user`` with one query
+    """
+    rows = (
+        Permission.objects.filter(Q(user=user) | Q(group__user=user))
+        .values_list("id", "content_type__app_label", "codename")
+        .distinct()
+        .order_by("id")
+    )
+    rows = list(rows)
+    return PermissionSnapshot(
+        versions=tuple(versions),
+        perms=frozenset(f"{app_label}.{codename}" for _, app_label, codename in rows),
+        entries=tuple((pk, codename) for pk, _, codename in rows),
+    )
+
+
+def get_snapshot(user):
+    """
+    Permission snapshot of ``user``
+
+    Snapshots are cached under the global and per-user permission versions
+    and kept on the user instance for the rest of the request.
+    """
+    versions = tuple(get_versions(PERMISSIONS_VERSION, get_user_version_key(user.pk)))
+    snapshot = getattr(user, "_permission_snapshot", None)
+    if snapshot is not None and snapshot.versions == versions:
+        return snapshot
+
+    key = SNAPSHOT_KEY.format(user.pk, ".".join(map(str, versions)))
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_snapshot(user, versions)
+        cache.set(key, snapshot, SNAPSHOT_TIMEOUT)
+    user._permission_snapshot = snapshot
+    return snapshot
+
+
+def has_perm(user, perm):
+    """
+    Whether ``user`` has the model level permission ``perm``
+    (``"<app_label>.<codename>"``), as ``ModelBackend`` decides it
+    """
+    if not user.is_active:
+        return False
+    if user.is_superuser:
+        return True
+    return perm in get_snapshot(user).perms
+
+
+def invalidate_users(user_pks):
+    """
+    Drop the snapshots of the given users
+    """
+    bump_versions(*(get_user_version_key(pk) for pk in user_pks))
+
+
+def invalidate_all():
+    """
+    Drop every snapshot
+    """
+    bump_versions(PERMISSIONS_VERSION)
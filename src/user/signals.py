@@ -0,0 +1,78 @@
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from src.core.utils.media import release_instance_files, release_replaced_files
+from src.core.utils.renditions import queue_renditions, release_renditions
+from src.user.models import Profile, User
+from src.user.services import permission_service
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_user_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Groups or permissions of users changed
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        permission_service.invalidate_users([instance.pk])
+    elif action == "post_clear":
+        # The cleared users aren't known any more.
+        permission_service.invalidate_all()
+    else:
+        permission_service.invalidate_users(pk_set)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_group_permissions(sender, action, **kwargs):
+    """
+    Permissions of groups changed
+    """
+    if action in ("post_add", "post_remove", "post_clear"):
+        permission_service.invalidate_all()
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def invalidate_deleted_permissions(sender, **kwargs):
+    """
+    Groups or permissions deleted along with their assignments
+    """
+    permission_service.invalidate_all()
+
+
+@receiver(post_save, sender=User)
+def invalidate_saved_user(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Flags of a user embedded in their tokens possibly changed
+    """
+    if created or (update_fields is not None and set(update_fields) <= {"last_login"}):
+        return
+    permission_service.invalidate_users([instance.pk])
+
+
+@receiver(post_save, sender=Profile)
+def queue_avatar_renditions(sender, instance, update_fields=None, **kwargs):
+    """
+    Render new avatars off the request
+    """
+    queue_renditions(instance, ("avatar",), update_fields)
+
+
+@receiver(pre_save, sender=Profile)
+def release_replaced_avatar(sender, instance, **kwargs):
+    """
+    Avatar replaced by a new upload
+    """
+    release_replaced_files(instance, ("avatar",))
+
+
+@receiver(post_delete, sender=Profile)
+def release_avatar(sender, instance, **kwargs):
+    """
+    Avatar and renditions of a deleted profile
+    """
+    release_instance_files(instance, ("avatar",))
+    release_renditions(instance, ("avatar",))
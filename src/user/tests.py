@@ -1,3 +1,246 @@
-from django.test import TestCase
+import csv
+import io
+import json
 
-# Create your tests here.
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from src.core.mixins import PermissionPolicyMixin
+
+from src.user.models import Profile, User
+from src.user.services.import_service import import_users
+
+
+class PermissionSnapshotTestCase(TestCase):
+    """
+    Cached permission snapshots
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="user@example.com", username="user", password="password"
+        )
+        cls.group = Group.objects.create(name="editors")
+        cls.permission = Permission.objects.get(codename="change_package")
+
+    def setUp(self):
+        cache.clear()
+
+    def get_user(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_warm_checks_run_no_query(self):
+        self.get_user().has_perm("packages.change_package")
+        user = self.get_user()
+        with self.assertNumQueries(0):
+            self.assertFalse(user.has_perm("packages.change_package"))
+            self.assertFalse(user.has_perm("packages.delete_package"))
+
+    def test_group_changes_invalidate_snapshot(self):
+        self.assertFalse(self.get_user().has_perm("packages.change_package"))
+        self.user.groups.add(self.group)
+        self.group.permissions.add(self.permission)
+        self.assertTrue(self.get_user().has_perm("packages.change_package"))
+        self.group.permissions.remove(self.permission)
+        self.assertFalse(self.get_user().has_perm("packages.change_package"))
+
+    def test_policy_mixin_loads_snapshot(self):
+        class PolicyView(PermissionPolicyMixin, APIView):
+            permission_classes = []
+            permission_classes_per_method = {}
+
+        user = self.get_user()
+        request = Request(RequestFactory().get("/"))
+        request.user = user
+        PolicyView().check_permissions(request)
+        with self.assertNumQueries(0):
+            self.assertFalse(user.has_perm("packages.change_package"))
+
+        cache.clear()
+        request.user = self.get_user()
+        with override_settings(PERMISSION_SNAPSHOT_LOADER=None):
+            with self.assertNumQueries(0):
+                PolicyView().check_permissions(request)
+
+    def test_user_permissions_api(self):
+        self.user.user_permissions.add(self.permission)
+        client = APIClient()
+        client.force_authenticate(self.get_user())
+        response = client.get("/api/v1/user-permissions")
+        self.assertEqual(
+            response.json(), [{"id": self.permission.pk, "codename": "change_package"}]
+        )
+        self.assertFalse(self.user.groups.exists())
+
+
+class StatelessJWTAuthenticationTestCase(TestCase):
+    """
+    Token claims authentication
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="user@example.com", username="user", password="password"
+        )
+        self.client = APIClient()
+        response = self.client.post(
+            "/api/v1/auth/login/", {"email": "user@example.com", "password": "password"}
+        )
+        self.tokens = response.json()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/v1/posts/")
+        return response.status_code, [
+            query for query in context.captured_queries if "user_user" in query["sql"]
+        ]
+
+    def test_user_is_not_loaded(self):
+        self.assertEqual(self.user_queries(), (200, []))
+
+    def test_stale_claims_are_checked(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.user_queries()[0], 401)
+
+    def test_logout_revokes_tokens(self):
+        response = self.client.post(
+            "/api/v1/auth/logout/", {"refresh": self.tokens["refresh"]}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.user_queries()[0], 401)
+        response = self.client.post(
+            "/api/v1/auth/refresh/", {"refresh": self.tokens["refresh"]}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_revoked_token_is_rejected_by_default_authentication(self):
+        self.assertEqual(self.client.get("/api/v1/user-permissions").status_code, 200)
+        response = self.client.post(
+            "/api/v1/auth/logout/", {"refresh": self.tokens["refresh"]}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get("/api/v1/user-permissions").status_code, 401)
+        response = self.client.post(
+            "/api/v1/auth/logout/", {"refresh": self.tokens["refresh"]}
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+class ImportUsersTestCase(TestCase):
+    """
+    Bulk user import
+    """
+
+    def test_import(self):
+        User.objects.create_user(email="taken@example.com", username="taken")
+        rows = [
+            {
+                "email": "a@example.com",
+                "username": "alice",
+                "password": "secret",
+                "is_staff": "yes",
+            },
+            {"email": "b@example.com", "full_name": "Bob"},
+            {"email": "b@example.com"},
+            {"email": "taken@example.com"},
+            {"email": "c@example.com", "username": "taken"},
+            {"email": ""},
+        ] + [{"email": f"user{i}@example.com"} for i in range(20)]
+
+        with self.assertNumQueries(7):
+            result = import_users(rows, chunk_size=len(rows))
+
+        self.assertEqual(result.created, 22)
+        self.assertEqual(
+            [reason for _, reason in result.skipped],
+            ["duplicate email", "missing email", "email exists", "username exists"],
+        )
+        alice = User.objects.get(username="alice")
+        self.assertTrue(alice.check_password("secret"))
+        self.assertTrue(alice.is_staff)
+        bob = User.objects.select_related("profile").get(email="b@example.com")
+        self.assertEqual(bob.profile.full_name, "Bob")
+        self.assertEqual(len(bob.username), 8)
+        self.assertFalse(bob.has_usable_password())
+
+    def test_invalid_rows_are_skipped(self):
+        rows = [
+            {"email": "a@example.com", "birth_date": "1990-02-01", "gender": "FEMALE"},
+            {"email": "b@example.com", "birth_date": "not-a-date"},
+            {"email": "c@example.com", "birth_date": "1990-02-31"},
+            {"email": "d@example.com", "gender": "robot"},
+            {"email": "not an email"},
+            {"email": "e@example.com", "secondary_email": "nope"},
+            {"email": "f@example.com", "phone": "1" * 21},
+        ]
+        result = import_users(rows)
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual(
+            result.skipped,
+            [
+                ("b@example.com", "invalid birth_date"),
+                ("c@example.com", "invalid birth_date"),
+                ("d@example.com", "invalid gender"),
+                ("not an email", "invalid email"),
+                ("e@example.com", "invalid secondary_email"),
+                ("f@example.com", "phone too long"),
+            ],
+        )
+        profile = User.objects.select_related("profile").get().profile
+        self.assertEqual(str(profile.birth_date), "1990-02-01")
+
+
+class GetAllUserTestCase(TestCase):
+    """
+    Streamed user export
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_superuser(
+                email="admin@example.com", username="admin", password="password"
+            )
+        )
+        for i in range(3):
+            User.objects.create_user(
+                email=f"user{i}@example.com",
+                username=f"user{i}",
+                profile=Profile.objects.create(full_name=f"User {i}"),
+            )
+
+    def export(self, output):
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/v1/accounts/all?output={output}")
+            content = b"".join(response.streaming_content).decode()
+        return response, content
+
+    def test_json(self):
+        response, content = self.export("json")
+        self.assertEqual(response["Content-Type"], "application/json; charset=utf-8")
+        data = json.loads(content)
+        self.assertEqual(len(data), 4)
+        self.assertEqual(data[1]["profile"]["full_name"], "User 0")
+
+    def test_ndjson(self):
+        _, content = self.export("ndjson")
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row["email"] for row in rows][-1], "user2@example.com")
+
+    def test_csv(self):
+        _, content = self.export("csv")
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]["profile.full_name"], "")
+        self.assertEqual(rows[1]["profile.full_name"], "User 0")
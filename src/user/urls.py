@@ -14,6 +14,7 @@ auth_urlpatterns = [
     path("login/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("refresh/", jwt_views.TokenRefreshView.as_view(), name="token_refresh"),
     path("register/", apis.RegisterUser.as_view(), name="register_user"),
+    path("logout/", apis.LogoutApi.as_view(), name="logout"),
 ]
 
 urlpatterns = [